@@ -0,0 +1,10 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: benchmarks
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Performance benchmarks for `evenz`.  Run a benchmark module directly from the
+project root, for example ``python -m benchmarks.bench_observable``.
+"""
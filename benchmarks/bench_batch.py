@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: benchmarks.bench_batch
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Compare delivering many triggers to handlers one at a time with delivering
+them to batch handlers.
+"""
+
+from evenz.events import Event
+from .harness import measure, report
+
+TRIGGERS = 10000  #: the number of triggers per run
+HANDLERS = 3  #: the number of handlers
+
+
+def main():
+    rows = [(row,) for row in range(TRIGGERS)]
+
+    def make_handler():
+        received = []
+
+        def on_row(sender, row: int):
+            received.append(row)
+        return on_row
+
+    def make_batch_handler():
+        received = []
+
+        def on_rows(sender, batch):
+            received.extend(batch)
+        return on_rows
+
+    individual = Event(f=lambda row: None, sender=object())
+    batched = Event(f=lambda row: None, sender=object())
+    for _ in range(HANDLERS):
+        individual += make_handler()
+        batched.subscribe(make_batch_handler(), batch=True)
+
+    def trigger_individually():
+        for row, in rows:
+            individual.trigger(row)
+
+    def trigger_batched():
+        with batched.batch():
+            for row, in rows:
+                batched.trigger(row)
+
+    def extend_batched():
+        with batched.batch() as batch:
+            batch.extend(rows)
+
+    label = f'{HANDLERS} handlers, {TRIGGERS} triggers'
+    report(
+        f'individual handlers ({label})',
+        measure(trigger_individually, number=20)
+    )
+    report(
+        f'batch handlers ({label})',
+        measure(trigger_batched, number=20)
+    )
+    report(
+        f'batch handlers, extend ({label})',
+        measure(extend_batched, number=20)
+    )
+
+
+if __name__ == '__main__':
+    main()
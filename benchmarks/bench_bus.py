@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: benchmarks.bench_bus
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Measure the cost of publishing on a bus with many subscription patterns, and
+compare it with matching the topic against every pattern.
+"""
+
+import fnmatch
+
+from evenz.bus import Bus
+from .harness import measure, report
+
+
+def main():
+    def handler(*args):
+        pass
+
+    for count in (10, 1000, 10000):
+        bus = Bus()
+        patterns = [f'kennel.dog{i}.*' for i in range(count)]
+        for pattern in patterns:
+            bus.subscribe(pattern, handler)
+        topic = f'kennel.dog{count // 2}.barked'
+        report(
+            f'publish (patterns={count}, cached)',
+            measure(lambda: bus.publish(topic, 1))
+        )
+        report(
+            f'publish (patterns={count}, uncached)',
+            measure(lambda: bus._resolve(topic), number=1000)
+        )
+        report(
+            f'scan every pattern (patterns={count})',
+            measure(
+                lambda: [
+                    handler(1) for p in patterns if fnmatch.fnmatch(topic, p)
+                ],
+                number=10
+            )
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: benchmarks.bench_class
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Compare observing an event on every instance of a class by subscribing to
+each instance with subscribing once to the class.
+"""
+
+import time
+
+from evenz.events import event, observable
+
+
+def make_class():
+    """
+    Create a new observable class.
+    """
+    @observable
+    class Dog(object):
+        @event
+        def barked(self, count: int):
+            """
+            This event is raised when the dog barks.
+            """
+    return Dog
+
+
+def main():
+    def on_bark(sender, count: int):
+        pass
+
+    for count in (1000, 100000):
+        cls = make_class()
+        dogs = [cls() for _ in range(count)]
+        # Make sure every dog has its event (and has compiled it).
+        for dog in dogs:
+            dog.barked(1)
+        start = time.perf_counter()
+        for dog in dogs:
+            dog.barked += on_bark
+        per_instance = time.perf_counter() - start
+        # The class' first handler tells the instances' compiled events to
+        # compile again...
+        start = time.perf_counter()
+        cls.barked += on_bark
+        first = time.perf_counter() - start
+        cls.barked -= on_bark
+        # ...but after that, subscribing to the class doesn't touch them.
+        start = time.perf_counter()
+        cls.barked += on_bark
+        later = time.perf_counter() - start
+        print(
+            f'subscribe (instances={count})'.ljust(32),
+            f'each instance: {per_instance * 1e3:>9.3f} ms',
+            f'class (first): {first * 1e3:>7.3f} ms',
+            f'class (later): {later * 1e3:>7.3f} ms'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: benchmarks.bench_errors
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Measure the cost of error policies when no handler fails (and when one
+does), and compare it with wrapping each handler in its own ``try``.
+"""
+
+import logging
+from functools import wraps
+
+from evenz.errors import COLLECT, LOG, PROPAGATE, CircuitBreaker
+from evenz.events import Event
+
+from .bench_subscribe import make_handlers
+from .harness import measure, report
+
+HANDLERS = 10
+
+
+def guarded(handler):
+    """
+    Wrap a handler in its own ``try`` (the way you would without error
+    policies).
+    """
+    @wraps(handler)
+    def guard(*args, **kwargs):
+        try:
+            return handler(*args, **kwargs)
+        except Exception:  # pylint: disable=broad-except
+            logging.getLogger('evenz').exception('The handler failed.')
+            return None
+    return guard
+
+
+def fail(*args):
+    """
+    This handler always fails.
+    """
+    raise ValueError(args)
+
+
+def main():
+    # Keep the logged failures out of the way.
+    logging.getLogger('evenz').disabled = True
+    # Each handler wrapped in its own try...
+    e = Event(f=lambda *args: None)
+    for h in make_handlers(HANDLERS):
+        e.subscribe(guarded(h))
+    report(
+        f'per-handler try (handlers={HANDLERS})',
+        measure(lambda: e.trigger(1, 2), number=10000)
+    )
+    # ...and the policies.
+    for errors in (PROPAGATE, COLLECT, LOG, CircuitBreaker(failures=10**9)):
+        name_ = errors if isinstance(errors, str) else type(errors).__name__
+        e = Event(f=lambda *args: None, errors=errors)
+        for h in make_handlers(HANDLERS):
+            e.subscribe(h)
+        report(
+            f'errors={name_} (handlers={HANDLERS})',
+            measure(lambda e=e: e.trigger(1, 2), number=10000)
+        )
+        if errors in (PROPAGATE, COLLECT):
+            continue
+        # When a handler in the middle fails, the rest are still called.
+        e.subscribe(fail, priority=-HANDLERS // 2)
+        report(
+            f'errors={name_} (handlers={HANDLERS}, one fails)',
+            measure(lambda e=e: e.trigger(1, 2), number=10000)
+        )
+
+
+if __name__ == '__main__':
+    main()
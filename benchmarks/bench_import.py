@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: benchmarks.bench_import
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Measure the time it takes to import a module that defines 1,000 events, and
+compare it with a module of plain functions and with the decorator
+:py:func:`evenz.events.event` used to be.
+"""
+
+import importlib
+import inspect
+import sys
+import tempfile
+import time
+from functools import wraps
+from pathlib import Path
+
+from evenz.events import Event
+
+EVENTS = 1000
+
+
+def plain(f):
+    """
+    Don't decorate a function at all.  (This is the baseline.)
+    """
+    return f
+
+
+def legacy_event(f):
+    """
+    Decorate a function the way :py:func:`evenz.events.event` used to.  (This
+    is the old decorator's code, as it was.  It looked for the function among
+    the members of the module's *name*, which never has any, so it never
+    actually rewrote the module's documentation.)
+    """
+    e = Event(f=f)
+
+    @wraps(f)
+    def _f(*args, **kwargs):
+        e.trigger(*args, **kwargs)
+    _f.__doc__ = f'⚡ :py:class:`evenz.events.Event`\n{f.__doc__}'
+    setattr(_f, 'event', e)
+    setattr(_f, '__is_event__', True)
+    setattr(_f, '__func__', f)
+    if f in [_ for _ in inspect.getmembers(f.__module__, inspect.isfunction)]:
+        module_ = sys.modules[f.__module__]
+        doc_parts = [
+            module_.__doc__,
+            f'⚡ :py:class:`evenz.events.Event` :py:func:`{ f.__name__ }`',
+        ]
+        doc_parts = filter(lambda p: p is not None, doc_parts)
+        module_.__doc__ = '\n'.join(doc_parts)
+    return _f
+
+
+def write_module(directory: Path, name: str, decorator: str) -> None:
+    """
+    Write a module that defines many events.
+
+    :param directory: the directory for the module
+    :param name: the name of the module
+    :param decorator: the (fully-qualified) name of the decorator
+    """
+    module_, _, function = decorator.rpartition('.')
+    lines = [
+        '"""This module has a lot of events."""',
+        f'from {module_} import {function}',
+    ]
+    for i in range(EVENTS):
+        lines.extend([
+            '',
+            f'@{function}',
+            f'def changed_{i}(count: int):',
+            '    """This event is raised now and then."""',
+        ])
+    (directory / f'{name}.py').write_text('\n'.join(lines) + '\n')
+
+
+def import_time(directory: Path, name: str) -> float:
+    """
+    Import a module and measure how long it takes.
+
+    :param directory: the directory that contains the module
+    :param name: the name of the module
+    :return: the time (in seconds)
+    """
+    sys.path.insert(0, str(directory))
+    try:
+        importlib.invalidate_caches()
+        # Compile the module first, so we only measure executing it.
+        importlib.import_module(name)
+        del sys.modules[name]
+        start = time.perf_counter()
+        importlib.import_module(name)
+        return time.perf_counter() - start
+    finally:
+        sys.path.remove(str(directory))
+        sys.modules.pop(name, None)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        write_module(directory, 'many_events', 'evenz.events.event')
+        write_module(
+            directory, 'many_legacy_events',
+            'benchmarks.bench_import.legacy_event'
+        )
+        write_module(
+            directory, 'many_functions', 'benchmarks.bench_import.plain'
+        )
+        for label, name in (('no events', 'many_functions'),
+                            ('legacy @event', 'many_legacy_events'),
+                            ('@event', 'many_events')):
+            print(
+                f'import ({label}, events={EVENTS})'.ljust(48),
+                f'{import_time(directory, name) * 1e3:>12.1f} ms'
+            )
+
+
+if __name__ == '__main__':
+    main()
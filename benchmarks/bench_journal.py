@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: benchmarks.bench_journal
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Measure how fast a journal records (and replays) a million triggers, and
+compare it with a handler that writes each trigger to a file as JSON.
+"""
+
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from evenz.events import Event
+from evenz.journal import GROUP, NEVER, Journal, StructCodec
+
+EVENTS = 1000000
+
+
+def rate(name: str, count: int, seconds: float):
+    """
+    Print a throughput.
+    """
+    print(f'{name:<48} {count / seconds / 1e6:>8.2f} M events/s')
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        # The handler that writes JSON...
+        e = Event(f=lambda x, y: None)
+        with open(Path(tmp) / 'events.json', 'w') as f:
+            def dump(x: float, y: float):
+                f.write(json.dumps({'x': x, 'y': y}))
+                f.write('\n')
+            e += dump
+            e.snapshot()  # (This compiles the event's dispatch function.)
+            trigger = e.trigger
+            start = time.perf_counter()
+            for _ in range(EVENTS):
+                trigger(1.0, 2.0)
+            rate('json.dumps handler', EVENTS, time.perf_counter() - start)
+        # ...and the journals.
+        for label, codec, sync in (
+                ('journal (pickle, sync=group)', None, GROUP),
+                ('journal (struct, sync=group)', StructCodec('dd'), GROUP),
+                ('journal (struct, sync=never)', StructCodec('dd'), NEVER)):
+            directory = Path(tmp) / label
+            e = Event(f=lambda x, y: None)
+            with Journal(directory, sync=sync, group_size=65536) as journal:
+                journal.attach(e, name='moved', codec=codec)
+                e.snapshot()
+                trigger = e.trigger
+                start = time.perf_counter()
+                for _ in range(EVENTS):
+                    trigger(1.0, 2.0)
+                journal.commit()
+                rate(label, EVENTS, time.perf_counter() - start)
+                start = time.perf_counter()
+                count = sum(1 for _ in journal.records())
+                rate(
+                    f'{label} read back', count, time.perf_counter() - start
+                )
+
+
+if __name__ == '__main__':
+    main()
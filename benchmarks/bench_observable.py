@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: benchmarks.bench_observable
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Measure the cost of constructing :py:func:`evenz.events.observable` instances.
+The cost of construction should depend on the number of events a class
+declares, not on the number of other attributes it has.
+"""
+
+import tracemalloc
+
+from evenz.events import event, observable
+from .harness import measure, report
+
+
+def make_class(events: int, attributes: int):
+    """
+    Create an observable class with a given number of events and other
+    (non-event) attributes.
+
+    :param events: the number of events
+    :param attributes: the number of non-event attributes (half of which are
+        properties)
+    :return: the class
+    """
+    namespace = {'__init__': lambda self: None}
+    for i in range(events):
+        namespace[f'event_{i}'] = event(lambda self: None)
+    for i in range(attributes):
+        if i % 2:
+            namespace[f'prop_{i}'] = property(lambda self: 0)
+        else:
+            namespace[f'method_{i}'] = lambda self: None
+    return observable(type(f'C{events}x{attributes}', (object,), namespace))
+
+
+def bytes_per_instance(cls, count: int = 10000) -> float:
+    """
+    Measure the memory held by each (idle) instance of a class.
+
+    :param cls: the class
+    :param count: the number of instances to create
+    :return: the average number of bytes per instance
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        instances = [cls() for _ in range(count)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del instances
+    return (after - before) / count
+
+
+def main():
+    for events in (0, 5):
+        for attributes in (0, 50, 500):
+            cls = make_class(events, attributes)
+            report(
+                f'construct (events={events}, attributes={attributes})',
+                measure(cls, number=2000)
+            )
+    for events in (0, 5, 50):
+        print(
+            f'idle instance memory (events={events})'.ljust(48),
+            f'{bytes_per_instance(make_class(events, 0)):>12.1f} bytes'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: benchmarks.bench_payloads
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Compare the cost of the arguments for a million triggers: named tuples,
+slotted records, pooled records, and numeric batches kept in rows or in
+columns.  We report the time, and the number (and size) of the objects
+allocated to hold the arguments.
+"""
+
+import gc
+import sys
+import time
+from typing import Callable, NamedTuple
+
+from evenz.events import Event, batch_handler
+from evenz.payloads import Pool, record
+
+FIRES = 1000000
+
+
+class MovedTuple(NamedTuple):
+    """
+    These are the arguments as a named tuple.
+    """
+    x: float
+    y: float
+
+
+Moved = record('Moved', 'x', 'y')
+
+
+def count(cls: type) -> type:
+    """
+    Create a subclass of an argument class that counts its instances.
+    """
+    def __new__(subcls, *args, **kwargs):
+        subcls.created += 1
+        if cls.__new__ is object.__new__:
+            return object.__new__(subcls)
+        return cls.__new__(subcls, *args, **kwargs)
+    return type(cls.__name__, (cls,), {
+        '__slots__': (), '__new__': __new__, 'created': 0
+    })
+
+
+def run(name: str, fire: Callable[[type], None], cls: type):
+    """
+    Fire a million triggers and report what it cost.
+
+    :param name: the name of the benchmark
+    :param fire: the function that fires the triggers using a class for the
+        arguments
+    :param cls: the class for the arguments
+    """
+    start = time.perf_counter()
+    fire(cls)
+    elapsed = time.perf_counter() - start
+    # Now do it again to count the allocations.
+    counted = count(cls)
+    fire(counted)
+    size = sys.getsizeof(cls(1.0, 2.0))
+    print(
+        f'{name:<20}',
+        f'{elapsed * 1e3:>9.1f} ms',
+        f'{counted.created:>9} allocations',
+        f'({size} bytes each) per million triggers'
+    )
+
+
+def main():
+    e = Event(f=lambda args: None)
+    e += lambda args: None
+    trigger = e.trigger
+
+    def created(cls: type):
+        for _ in range(FIRES):
+            trigger(cls(1.0, 2.0))
+
+    def pooled(cls: type):
+        fire = Pool(cls).fire
+        for _ in range(FIRES):
+            fire(trigger, 1.0, 2.0)
+
+    run('named tuples', created, MovedTuple)
+    run('records', created, Moved)
+    run('pooled records', pooled, Moved)
+
+    kept = 0
+
+    @batch_handler
+    def on_batch(batch_):
+        # Count the triggers' arguments the batch holds on to as tuples.
+        nonlocal kept
+        kept += sum(r == (1.0, 2.0) for r in gc.get_referents(batch_))
+
+    e = Event(f=lambda x, y: None)
+    e += on_batch
+    for name, columns in (('batch (rows)', None), ('batch (columns)', {
+        'x': 'd', 'y': 'd'
+    })):
+        kept = 0
+        start = time.perf_counter()
+        with e.batch(max_size=1000, columns=columns) as batcher:
+            record_ = batcher.record
+            for _ in range(FIRES):
+                record_(1.0, 2.0)
+        elapsed = time.perf_counter() - start
+        # Rows keep a tuple for each trigger; columns keep the numbers in
+        # arrays (and allocate a few objects for each batch).
+        print(
+            f'{name:<20}',
+            f'{elapsed * 1e3:>9.1f} ms',
+            f'{kept:>9} tuples kept'
+        )
+
+if __name__ == '__main__':
+    main()
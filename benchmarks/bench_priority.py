@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: benchmarks.bench_priority
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Compare calling every handler with letting a high-priority handler answer
+first and stop the rest.
+"""
+
+from evenz.events import Event, STOP
+from .harness import measure, report
+
+
+def main():
+    def answer(key: str):
+        return STOP
+
+    for count in (10, 100):
+        e = Event(f=lambda key: None)
+        for _ in range(count):
+            e.subscribe(lambda key: None)
+        report(
+            f'every handler (handlers={count})',
+            measure(lambda: e.trigger('fido'))
+        )
+        e.subscribe(answer, priority=1)
+        report(
+            f'first handler stops (handlers={count + 1})',
+            measure(lambda: e.trigger('fido'))
+        )
+
+
+if __name__ == '__main__':
+    main()
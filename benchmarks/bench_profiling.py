@@ -0,0 +1,28 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: benchmarks.bench_profiling
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Measure what a profiler adds to a trigger while it's watching (and show that
+it adds nothing once it stops).
+"""
+
+from evenz.events import Event
+from evenz.profiling import Profiler
+from .harness import measure, report
+
+
+def main():
+    e = Event(f=lambda count: None)
+    for _ in range(3):
+        e.subscribe(lambda count: None)
+    report('trigger (not watched)', measure(lambda: e.trigger(1)))
+    with Profiler(e):
+        report('trigger (watched)', measure(lambda: e.trigger(1)))
+    report('trigger (no longer watched)', measure(lambda: e.trigger(1)))
+
+
+if __name__ == '__main__':
+    main()
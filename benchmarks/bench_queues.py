@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: benchmarks.bench_queues
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Measure how fast an event puts bursts of triggers in front of a slow
+consumer, and how much memory the triggers waiting for it take, with bounded
+queued subscriptions and with an unbounded :py:class:`queue.SimpleQueue`.
+"""
+
+import queue
+import threading
+import time
+import tracemalloc
+
+from evenz.events import Event
+from evenz.queues import COALESCE, DROP_NEWEST, DROP_OLDEST
+
+BURSTS = 20
+BURST = 50000
+CAPACITY = 1024
+
+
+def slow(x: int, y: int):
+    """
+    This handler takes a while.
+    """
+    time.sleep(0.0001)
+
+
+def measure(label: str, subscribe):
+    """
+    Trigger bursts of events and report the throughput and the peak memory.
+
+    :param label: the label
+    :param subscribe: a function that subscribes the slow handler to an
+        event, and returns a function that stops the consumer
+    """
+    results = []
+    # Time the triggers first, then trace the memory (which slows them down).
+    for traced in (False, True):
+        e = Event(f=lambda x, y: None)
+        if traced:
+            tracemalloc.start()
+        stop = subscribe(e)
+        e.snapshot()  # (This compiles the event's dispatch function.)
+        trigger = e.trigger
+        start = time.perf_counter()
+        for _ in range(BURSTS):
+            for i in range(BURST):
+                trigger(i, i)
+            time.sleep(0.01)  # (There's a lull between the bursts.)
+        results.append(time.perf_counter() - start)
+        if traced:
+            results.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        stop()
+    elapsed, _, peak = results
+    print(
+        f'{label:<48} {BURSTS * BURST / elapsed / 1e6:>8.2f} M events/s'
+        f' {peak / 1e6:>10.1f} MB peak'
+    )
+
+
+def unbounded(e: Event):
+    """
+    Subscribe the slow handler through an unbounded queue (and a thread).
+    """
+    q = queue.SimpleQueue()
+    e.subscribe(lambda x, y: q.put((x, y)))
+    done = object()
+
+    def consume():
+        while True:
+            item = q.get()
+            if item is done:
+                return
+            slow(*item)
+    thread = threading.Thread(target=consume, daemon=True)
+    thread.start()
+
+    def stop():
+        # (Discard the backlog rather than waiting for it.)
+        while not q.empty():
+            q.get_nowait()
+        q.put(done)
+        thread.join()
+    return stop
+
+
+def bounded(overflow: str, key=None):
+    """
+    Get a function that subscribes the slow handler through a queued
+    subscription.
+    """
+    def subscribe(e: Event):
+        queued = e.queued(
+            slow, capacity=CAPACITY, overflow=overflow, key=key
+        ).start()
+        return lambda: queued.close(drain=False)
+    return subscribe
+
+
+def main():
+    measure('unbounded queue.SimpleQueue', unbounded)
+    measure(f'queued (drop-oldest, capacity={CAPACITY})', bounded(DROP_OLDEST))
+    measure(f'queued (drop-newest, capacity={CAPACITY})', bounded(DROP_NEWEST))
+    measure(
+        f'queued (coalesce by x % 100, capacity={CAPACITY})',
+        bounded(COALESCE, key=lambda x, y: x % 100)
+    )
+
+
+if __name__ == '__main__':
+    main()
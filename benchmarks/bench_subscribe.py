@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: benchmarks.bench_subscribe
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Measure subscription churn: subscribing many short-lived handlers to an event
+and unsubscribing them again in an arbitrary order.
+"""
+
+import random
+import time
+
+from evenz.events import Event
+
+
+def make_handlers(count: int):
+    """
+    Create some distinct handlers.
+
+    :param count: the number of handlers
+    :return: the handlers
+    """
+    return [(lambda *args: None) for _ in range(count)]
+
+
+def churn(count: int, seed: int = 0) -> float:
+    """
+    Subscribe handlers to an event, then unsubscribe them in random order.
+
+    :param count: the number of handlers
+    :param seed: the random seed
+    :return: the average time per subscribe/unsubscribe pair (in seconds)
+    """
+    e = Event(f=lambda *args: None)
+    handlers = make_handlers(count)
+    order = list(handlers)
+    random.Random(seed).shuffle(order)
+    start = time.perf_counter()
+    for h in handlers:
+        e.subscribe(h)
+    # Trigger once along the way so the snapshot is built.
+    e.trigger()
+    for h in order:
+        e.unsubscribe(h)
+    return (time.perf_counter() - start) / count
+
+
+def legacy_churn(count: int, seed: int = 0) -> float:
+    """
+    Do the same thing as :py:func:`churn` with a list of handlers (which is
+    how :py:class:`Event` used to keep them).
+
+    :param count: the number of handlers
+    :param seed: the random seed
+    :return: the average time per subscribe/unsubscribe pair (in seconds)
+    """
+    handlers = make_handlers(count)
+    order = list(handlers)
+    random.Random(seed).shuffle(order)
+    subscribed = []
+    start = time.perf_counter()
+    for h in handlers:
+        subscribed.append(h)
+    for h in order:
+        subscribed.remove(h)
+    return (time.perf_counter() - start) / count
+
+
+def set_operations(count: int) -> float:
+    """
+    Measure the ``&`` and ``|`` operators on an event with many handlers.
+
+    :param count: the number of handlers
+    :return: the time for one ``|`` and one ``&`` (in seconds)
+    """
+    e = Event(f=lambda *args: None)
+    handlers = make_handlers(count)
+    for h in handlers[:count // 2]:
+        e.subscribe(h)
+    start = time.perf_counter()
+    e | handlers
+    e & handlers[count // 4:]
+    return time.perf_counter() - start
+
+
+def main():
+    for count in (10000, 100000):
+        print(
+            f'legacy list churn (handlers={count})'.ljust(48),
+            f'{legacy_churn(count) * 1e9:>12.1f} ns/pair'
+        )
+        print(
+            f'churn (handlers={count})'.ljust(48),
+            f'{churn(count) * 1e9:>12.1f} ns/pair'
+        )
+        print(
+            f'& and | (handlers={count})'.ljust(48),
+            f'{set_operations(count) * 1e3:>12.1f} ms'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: benchmarks.bench_threads
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Measure the throughput of a thread-safe event triggered from several threads
+at once (with and without another thread subscribing and unsubscribing
+handlers the whole time).
+
+.. note::
+
+    Triggers don't take a lock, so on a build of Python without the global
+    interpreter lock the throughput grows with the number of threads.  With
+    the GIL, expect it to stay flat (but not to fall).
+"""
+
+import sys
+import threading
+import time
+
+from evenz.events import Event
+
+FIRES = 1000000
+
+
+def throughput(threads: int, churn: bool) -> float:
+    """
+    Trigger an event from several threads.
+
+    :param threads: the number of threads
+    :param churn: ``True`` to subscribe and unsubscribe a handler the whole
+        time
+    :return: the triggers per second (across all the threads)
+    """
+    e = Event(f=lambda n: None, threadsafe=True)
+    for _ in range(3):
+        e.subscribe(lambda n: None)
+    done = threading.Event()
+
+    def churner():
+        while not done.is_set():
+            h = (lambda n: None)
+            e.subscribe(h)
+            e.unsubscribe(h)
+            time.sleep(0.001)
+
+    def emit():
+        trigger = e.trigger
+        for n in range(FIRES // threads):
+            # (The compiled trigger changes when the handlers do.)
+            if churn:
+                trigger = e.trigger
+            trigger(n)
+
+    workers = [threading.Thread(target=emit) for _ in range(threads)]
+    background = threading.Thread(target=churner) if churn else None
+    if background is not None:
+        background.start()
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    if background is not None:
+        background.join()
+    return FIRES / elapsed
+
+
+def main():
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print(f'(the GIL is {"enabled" if gil else "disabled"})')
+    for churn in (False, True):
+        for threads in (1, 2, 4, 8):
+            print(
+                f'trigger (threads={threads}, churn={churn})'.ljust(48),
+                f'{throughput(threads, churn) / 1e6:>12.2f} M/s'
+            )
+
+
+if __name__ == '__main__':
+    main()
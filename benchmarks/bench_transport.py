@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: benchmarks.bench_transport
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Measure how fast triggers reach a subscriber in another process through the
+shared-memory ring and through Unix-domain sockets (one at a time and in
+batches), and compare them with a :py:class:`multiprocessing.Queue`.
+"""
+
+import multiprocessing
+import os
+import time
+
+from evenz.events import Event
+from evenz.journal import StructCodec
+from evenz.transport import Publisher, Subscriber, SHARED_MEMORY, SOCKET
+
+EVENTS = 200000
+BATCH = 1000
+
+
+def rate(name: str, count: int, seconds: float):
+    """
+    Print a throughput.
+    """
+    print(f'{name:<48} {count / seconds / 1e6:>8.2f} M events/s')
+
+
+def listen(name: str, transport: str, ready, done):
+    """
+    Count the triggers that arrive (in another process).
+    """
+    with Subscriber(name, transport=transport) as subscriber:
+        received = [0]
+
+        def count(x: float, y: float):
+            received[0] += 1
+        subscriber.event('moved', codec=StructCodec('dd')).subscribe(count)
+        ready.set()
+        while received[0] < EVENTS:
+            subscriber.poll(timeout=0.1)
+    done.set()
+
+
+def queue_listen(queue, ready, done):
+    """
+    Count the messages that arrive on a queue (in another process).
+    """
+    ready.set()
+    for _ in range(EVENTS):
+        queue.get()
+    done.set()
+
+
+def measure(name: str, transport: str, batch: int) -> float:
+    """
+    Measure the time it takes for the triggers to reach a subscriber.
+
+    :param name: the name of the publisher
+    :param transport: the transport
+    :param batch: the number of triggers in each batch
+    :return: the time (in seconds)
+    """
+    context = multiprocessing.get_context()
+    ready, done = context.Event(), context.Event()
+    e = Event(f=lambda x, y: None)
+    with Publisher(name, transport=transport, size=1 << 26) as publisher:
+        publisher.attach(e, name='moved', codec=StructCodec('dd'))
+        e.snapshot()  # (This compiles the event's dispatch function.)
+        trigger = e.trigger
+        listener = context.Process(
+            target=listen, args=(name, transport, ready, done)
+        )
+        listener.start()
+        ready.wait()
+        start = time.perf_counter()
+        for _ in range(EVENTS // batch):
+            with publisher.batch():
+                for _ in range(batch):
+                    trigger(1.0, 2.0)
+        done.wait()
+        elapsed = time.perf_counter() - start
+        listener.join()
+    return elapsed
+
+
+def main():
+    name = f'evenz-bench-{os.getpid()}'
+    context = multiprocessing.get_context()
+    queue = context.Queue()
+    ready, done = context.Event(), context.Event()
+    listener = context.Process(target=queue_listen, args=(queue, ready, done))
+    listener.start()
+    ready.wait()
+    start = time.perf_counter()
+    for _ in range(EVENTS):
+        queue.put((1.0, 2.0))
+    done.wait()
+    rate('multiprocessing.Queue', EVENTS, time.perf_counter() - start)
+    listener.join()
+    for transport in (SHARED_MEMORY, SOCKET):
+        for batch in (1, BATCH):
+            rate(
+                f'{transport} (batch={batch})', EVENTS,
+                measure(name, transport, batch)
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: benchmarks.bench_trigger
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Compare :py:meth:`evenz.events.Event.trigger` with the original loop, which
+checked for a sender inside the loop on every call.
+"""
+
+from evenz.events import Event
+from .harness import measure, report
+
+
+def make_handler():
+    """
+    Create a new handler that does nothing.
+    """
+    def handler(*args, **kwargs):
+        pass
+    return handler
+
+
+class LegacyEvent(object):
+    """
+    This is the original implementation of :py:meth:`Event.trigger`.
+    """
+    def __init__(self, handlers, sender):
+        self._handlers = list(handlers)
+        self._sender = sender
+
+    def trigger(self, *args, **kwargs):
+        for h in self._handlers:
+            if self._sender is not None:
+                h(self._sender, *args, **kwargs)
+            else:
+                h(*args, **kwargs)
+
+
+def main():
+    for sender in (None, object()):
+        for count in (0, 1, 2, 10):
+            e = Event(f=make_handler(), sender=sender)
+            handlers = [make_handler() for _ in range(count)]
+            for h in handlers:
+                e.subscribe(h)
+            legacy = LegacyEvent(handlers, sender)
+            label = f'handlers={count}, sender={sender is not None}'
+            report(
+                f'legacy trigger ({label})',
+                measure(lambda: legacy.trigger(1, 2))
+            )
+            report(
+                f'trigger ({label})',
+                measure(lambda: e.trigger(1, 2))
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: benchmarks.bench_weak
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Subscribe millions of short-lived listeners to an event (without ever
+unsubscribing them) and watch how much memory the process holds.  Weak
+subscriptions should keep memory flat; strong ones grow without bound.
+"""
+
+import resource
+import time
+
+from evenz.events import Event
+
+
+class Listener(object):
+    """
+    This object listens for an event.
+    """
+    def on_event(self, *args):
+        pass
+
+
+def max_rss() -> int:
+    """
+    Get the process' peak resident set size.
+
+    :return: the peak resident set size (in kilobytes)
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def cycles(count: int, weak: bool):
+    """
+    Subscribe a new listener to an event and drop it, over and over again.
+
+    :param count: the number of cycles
+    :param weak: ``True`` to subscribe the listeners weakly
+    """
+    e = Event(f=lambda: None)
+    before = max_rss()
+    start = time.perf_counter()
+    for i in range(count):
+        e.subscribe(Listener().on_event, weak=weak)
+        if i % 10000 == 0:
+            e.trigger()
+    elapsed = time.perf_counter() - start
+    subscribed = len(list(e.handlers))
+    print(
+        f'subscribe/drop (weak={weak}, cycles={count})'.ljust(48),
+        f'{elapsed / count * 1e9:>8.1f} ns/cycle',
+        f'{subscribed:>9} live handlers',
+        f'{max_rss() - before:>9} KB peak growth'
+    )
+
+
+def main():
+    # Run the weak case first (the strong case leaves a lot of memory behind).
+    cycles(1000000, weak=True)
+    cycles(1000000, weak=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: benchmarks.bench_where
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Compare handlers that filter their own arguments with handlers subscribed
+with a filter (which the event indexes).
+"""
+
+from typing import NamedTuple
+
+from evenz.events import Event
+from .harness import measure, report
+
+
+class Change(NamedTuple):
+    """
+    These are the arguments for a change.
+    """
+    kind: str
+
+
+def make_handler(kind: str):
+    """
+    Create a handler that checks the kind of change itself.
+    """
+    def handler(args: Change):
+        if args.kind != kind:
+            return
+    return handler
+
+
+def main():
+    args = Change('kind0')
+    for count in (10, 100, 1000):
+        checking = Event(f=lambda args: None)
+        filtered = Event(f=lambda args: None)
+        for i in range(count):
+            checking.subscribe(make_handler(f'kind{i}'))
+            filtered.subscribe(
+                lambda args: None, where={'kind': f'kind{i}'}
+            )
+        report(
+            f'handlers check (handlers={count})',
+            measure(lambda: checking.trigger(args), number=1000)
+        )
+        report(
+            f'subscribed with filters (handlers={count})',
+            measure(lambda: filtered.trigger(args), number=1000)
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: benchmarks.harness
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+A few small helpers shared by the benchmark modules.
+"""
+
+import timeit
+from typing import Callable
+
+
+def measure(stmt: Callable, number: int = 10000, repeat: int = 5) -> float:
+    """
+    Measure the best-case cost of a single call to a function.
+
+    :param stmt: the function to call (with no arguments)
+    :param number: the number of calls per timing run
+    :param repeat: the number of timing runs
+    :return: the best observed time per call (in seconds)
+    """
+    timings = timeit.repeat(stmt, number=number, repeat=repeat)
+    return min(timings) / number
+
+
+def report(name: str, seconds: float):
+    """
+    Print a single benchmark result.
+
+    :param name: the name of the benchmark
+    :param seconds: the time per call (in seconds)
+    """
+    print(f'{name:<48} {seconds * 1e9:>12.1f} ns/call')
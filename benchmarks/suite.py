@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: benchmarks.suite
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Run the standard set of benchmarks for :py:mod:`evenz.events`, write the
+results as JSON, and (optionally) compare them with an earlier run.
+
+.. code-block:: bash
+
+    python -m benchmarks.suite --output baseline.json
+    # ...change something...
+    python -m benchmarks.suite --compare baseline.json
+
+When comparing, the suite exits with a non-zero status if any benchmark got
+slower than the tolerance allows.
+"""
+
+import argparse
+import json
+import platform
+import sys
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from evenz.errors import COLLECT, LOG, PROPAGATE, CircuitBreaker
+from evenz.events import Event, event
+from .bench_observable import make_class
+from .bench_subscribe import make_handlers
+from .harness import measure, report
+
+#: a benchmark: its name, the function to time, and the number of calls per
+#: timing run
+Case = Tuple[str, Callable[[], None], int]
+
+
+def construction() -> Iterator[Case]:
+    """
+    Construct instances of observable classes with different numbers of
+    events.
+    """
+    for events in (0, 5, 50):
+        yield f'construct (events={events})', make_class(events, 0), 10000
+
+
+def triggers() -> Iterator[Case]:
+    """
+    Trigger events with different numbers of handlers, with and without a
+    sender.
+    """
+    for sender in (None, object()):
+        for count in (0, 1, 10, 1000):
+            e = Event(f=lambda *args: None, sender=sender)
+            for h in make_handlers(count):
+                e.subscribe(h)
+            yield (
+                f'trigger (handlers={count}, sender={sender is not None})',
+                lambda e=e: e.trigger(1, 2),
+                10 if count >= 1000 else 10000
+            )
+
+
+def error_policies() -> Iterator[Case]:
+    """
+    Trigger events whose handlers don't raise exceptions, with each error
+    policy.  (They should all cost the same as the default.)
+    """
+    for errors in (PROPAGATE, COLLECT, LOG, CircuitBreaker()):
+        e = Event(f=lambda *args: None, errors=errors)
+        for h in make_handlers(10):
+            e.subscribe(h)
+        name_ = errors if isinstance(errors, str) else type(errors).__name__
+        yield (
+            f'trigger (handlers=10, errors={name_})',
+            lambda e=e: e.trigger(1, 2),
+            10000
+        )
+
+
+def subscriptions() -> Iterator[Case]:
+    """
+    Subscribe and unsubscribe handlers on an event that has many of them, and
+    combine events' handlers with ``&`` and ``|``.
+    """
+    e = Event(f=lambda *args: None)
+    for h in make_handlers(1000):
+        e.subscribe(h)
+    handler, = make_handlers(1)
+
+    def churn():
+        e.subscribe(handler)
+        e.unsubscribe(handler)
+
+    yield 'subscribe/unsubscribe (handlers=1000)', churn, 10000
+    handlers = make_handlers(1000)
+    target = Event(f=lambda *args: None)
+
+    def set_operations():
+        target | handlers
+        target & handlers[:500]
+        target & ()
+
+    yield '| and & (handlers=1000)', set_operations, 10
+
+
+def decoration() -> Iterator[Case]:
+    """
+    Decorate a module-level function with :py:func:`evenz.events.event`.
+    """
+    def f():
+        """
+        This is an event.
+        """
+    yield '@event (module-level function)', lambda: event(f), 10000
+
+
+#: the groups of benchmarks in the suite
+GROUPS = (
+    construction, triggers, error_policies, subscriptions, decoration
+)
+
+
+def run(repeat: int = 5) -> Dict[str, float]:
+    """
+    Run the suite.
+
+    :param repeat: the number of timing runs for each benchmark
+    :return: the best time per call for each benchmark (in seconds)
+    """
+    results: Dict[str, float] = {}
+    for group in GROUPS:
+        for name, stmt, number in group():
+            results[name] = measure(stmt, number=number, repeat=repeat)
+            report(name, results[name])
+    return results
+
+
+def compare(
+        results: Dict[str, float],
+        baseline: Dict[str, float],
+        tolerance: float
+) -> List[str]:
+    """
+    Compare results with a baseline.
+
+    :param results: the results
+    :param baseline: the baseline results
+    :param tolerance: how much slower (as a fraction of the baseline) a
+        benchmark may get before it counts as a regression
+    :return: the names of the benchmarks that regressed
+    """
+    regressions = []
+    print()
+    for name, seconds in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f'{name:<48} {"(new)":>12}')
+            continue
+        change = (seconds - before) / before
+        regressed = change > tolerance
+        if regressed:
+            regressions.append(name)
+        print(
+            f'{name:<48} {change * 100:>+11.1f}%',
+            'REGRESSION' if regressed else ''
+        )
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument(
+        '--output', help='write the results to this JSON file'
+    )
+    parser.add_argument(
+        '--compare', help='compare the results with this JSON file'
+    )
+    parser.add_argument(
+        '--tolerance', type=float, default=0.2,
+        help='the slowdown (as a fraction) that counts as a regression'
+    )
+    parser.add_argument(
+        '--repeat', type=int, default=5,
+        help='the number of timing runs for each benchmark'
+    )
+    args = parser.parse_args(argv)
+    results = run(repeat=args.repeat)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'results': results
+            }, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: evenz.batches
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+An event can collect its triggers into batches (see
+:py:meth:`evenz.events.Event.batch`) and hand each batch to its batch
+handlers in a single call.
+
+.. code-block:: python
+
+    @batch_handler
+    def on_barks(batch: Batch):
+        print(f'{len(batch)} barks')
+
+    dog.barked += on_barks
+    with dog.barked.batch():
+        for i in range(0, 1000):
+            dog.bark(i)
+"""
+
+import time
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+from .payloads import Columns
+
+
+class Batch(list):
+    """
+    A batch handler receives one of these: a list of the positional arguments
+    from each trigger in the batch.
+    """
+    def columns(self) -> Tuple[Tuple[Any, ...], ...]:
+        """
+        Get the arguments as columns (the first arguments from every trigger,
+        then the second arguments, and so on).
+
+        :return: the columns
+        """
+        return tuple(zip(*self))
+
+
+def batch_handler(handler: Callable) -> Callable:
+    """
+    Decorate a handler that accepts a :py:class:`Batch` of triggers instead of
+    individual calls.
+
+    :param handler: the handler
+    :return: the handler
+    """
+    handler.__evenz_batch__ = True
+    return handler
+
+
+class _BatchHandler(object):
+    """
+    This marks a handler that was subscribed as a batch handler.
+    """
+    __slots__ = ('handler',)
+
+    def __init__(self, handler: Callable):
+        """
+
+        :param handler: the handler
+        """
+        self.handler = handler
+
+
+def _single(handler: Callable) -> Callable:
+    """
+    Wrap a batch handler so that it can be called for a single trigger.
+
+    :param handler: the batch handler
+    :return: the wrapped handler
+    """
+    def single(*args):
+        return handler(Batch((args,)))
+    return single
+
+
+class Batcher(object):
+    """
+    A batcher collects an event's triggers while it's active and delivers them
+    in batches: batch handlers get each batch in a single call, and the other
+    handlers are called once for each trigger in the batch.
+
+    .. note::
+
+        While a batch is active, triggers may only supply positional
+        arguments.  When a batch is delivered, the individual calls happen
+        first, then the batch handlers are called.
+    """
+    def __init__(
+            self,
+            event_: Any,
+            max_size: int = None,
+            max_latency: float = None,
+            columns: Dict[str, str] = None
+    ):
+        """
+
+        :param event_: the :py:class:`evenz.events.Event`
+        :param max_size: deliver the batch whenever it has this many triggers
+        :param max_latency: deliver the batch when a trigger arrives this long
+            (in seconds) after the first trigger in the batch
+        :param columns: if the triggers' arguments are numbers, the names of
+            the arguments mapped to their :py:mod:`array` type codes; batch
+            handlers then receive :py:class:`evenz.payloads.Columns`
+        """
+        self._event = event_
+        self._max_size = max_size
+        self._max_latency = max_latency
+        # This creates the collections that hold the triggers.
+        self._new: Callable = (
+            Batch if columns is None else partial(Columns, columns)
+        )
+        self._items = self._new()
+        self._started = 0.0
+        # (These are `None` until the event compiles its handlers, or if it
+        # doesn't have any of that kind.)
+        self._deliver: Optional[Callable] = None
+        self._deliver_batch: Optional[Callable] = None
+        # Pick the simplest function to record triggers.
+        self.record: Callable = (
+            self._record if max_size is None and max_latency is None
+            else self._record_limited
+        )
+
+    def compiled(
+            self,
+            deliver: Optional[Callable],
+            deliver_batch: Optional[Callable]
+    ):
+        """
+        The event calls this when it compiles its handlers.
+
+        :param deliver: the function that delivers a single trigger to the
+            individual handlers (or ``None`` if there aren't any)
+        :param deliver_batch: the function that delivers a batch to the batch
+            handlers (or ``None`` if there aren't any)
+        """
+        self._deliver = deliver
+        self._deliver_batch = deliver_batch
+
+    def _record(self, *args):
+        self._items.append(args)
+
+    def _record_limited(self, *args):
+        items = self._items
+        if not items:
+            self._started = time.monotonic()
+        items.append(args)
+        if (self._max_size is not None and len(items) >= self._max_size) or (
+                self._max_latency is not None
+                and time.monotonic() - self._started >= self._max_latency):
+            self.flush()
+
+    def extend(self, items: Iterable[Tuple[Any, ...]]):
+        """
+        Add many triggers to the batch at once.  (This is the cheapest way for
+        a bulk producer to trigger an event.)
+
+        :param items: the positional arguments for each trigger
+        """
+        self._items.extend(items)
+        if self._max_size is not None and len(self._items) >= self._max_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Deliver the triggers collected so far.
+        """
+        items, self._items = self._items, self._new()
+        if not items:
+            return
+        # Make sure the delivery functions are up to date.
+        if 'trigger' not in self._event.__dict__:
+            self._event._compile()  # pylint: disable=protected-access
+        deliver = self._deliver
+        if deliver is not None:
+            for args in items:
+                deliver(*args)
+        if self._deliver_batch is not None:
+            self._deliver_batch(items)
+
+    def __enter__(self):
+        self._event._start_batch(self)  # pylint: disable=protected-access
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            self.flush()
+        finally:
+            self._event._stop_batch()  # pylint: disable=protected-access
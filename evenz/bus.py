@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: evenz.bus
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+A bus routes messages published under hierarchical, dot-separated topics
+(like ``kennel.fido.barked``) to the handlers subscribed to matching
+patterns.  In a pattern, ``*`` matches exactly one segment and ``**``
+matches any number of segments (including none).
+
+.. code-block:: python
+
+    bus = Bus()
+    bus.subscribe('kennel.*.barked', on_bark)
+    bus.publish('kennel.fido.barked', fido, 3)
+
+Patterns are kept in a trie, so routing a topic costs time in proportion to
+the topic's depth (not the number of subscriptions), and the handlers for
+each topic are cached until the subscriptions change.
+
+You can also :py:meth:`Bus.attach` an :py:func:`evenz.events.observable`
+class so that its instances' events are published automatically.
+"""
+
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+STAR = '*'  #: matches exactly one segment of a topic
+GLOBSTAR = '**'  #: matches any number of segments of a topic
+
+
+class _Node(object):
+    """
+    This is a node in the trie of subscription patterns.
+    """
+    __slots__ = ('children', 'handlers', 'globstar')
+
+    def __init__(self, globstar: bool = False):
+        self.children: Dict[str, _Node] = {}  #: the next segments
+        self.handlers: Dict[Callable, int] = {}  #: handlers -> sequence
+        self.globstar = globstar  #: Can this node swallow segments?
+
+    def empty(self) -> bool:
+        """
+        Is there nothing left in this node?
+
+        :return: ``True`` if the node has no handlers and no children
+        """
+        return not self.handlers and not self.children
+
+
+class Bus(object):
+    """
+    A bus routes messages published under topics to the handlers subscribed
+    to matching patterns.
+    """
+    def __init__(self, cache_size: int = 4096):
+        """
+
+        :param cache_size: the maximum number of topics for which the bus
+            remembers the handlers
+        """
+        self._root = _Node()
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._cache: Dict[str, Tuple[Callable, ...]] = {}
+        self._cache_size = cache_size
+
+    def subscribe(self, pattern: str, handler: Callable) -> 'Bus':
+        """
+        Subscribe a handler to the topics that match a pattern.
+
+        :param pattern: the pattern
+        :param handler: the handler
+        :return: the bus
+
+        .. note::
+
+            A handler is called once for each message even if it's subscribed
+            to more than one matching pattern.
+        """
+        if not callable(handler):
+            raise ValueError(f'{type(handler)} is not callable.')
+        with self._lock:
+            node = self._root
+            for segment in pattern.split('.'):
+                child = node.children.get(segment)
+                if child is None:
+                    child = _Node(globstar=segment == GLOBSTAR)
+                    node.children[segment] = child
+                node = child
+            if handler not in node.handlers:
+                self._sequence += 1
+                node.handlers[handler] = self._sequence
+            self._cache = {}
+        return self
+
+    def unsubscribe(self, pattern: str, handler: Callable) -> 'Bus':
+        """
+        Unsubscribe a handler from a pattern.
+
+        :param pattern: the pattern
+        :param handler: the handler
+        :return: the bus
+        """
+        with self._lock:
+            path: List[Tuple[_Node, str]] = []
+            node = self._root
+            for segment in pattern.split('.'):
+                path.append((node, segment))
+                node = node.children.get(segment)
+                if node is None:
+                    break
+            if node is None or handler not in node.handlers:
+                raise ValueError(f'{handler} is not subscribed to {pattern}.')
+            del node.handlers[handler]
+            # Prune the branches we no longer need.
+            for parent, segment in reversed(path):
+                if not parent.children[segment].empty():
+                    break
+                del parent.children[segment]
+            self._cache = {}
+        return self
+
+    def route(self, topic: str) -> Tuple[Callable, ...]:
+        """
+        Get the handlers for a topic.
+
+        :param topic: the topic
+        :return: the handlers (in the order in which they subscribed)
+        """
+        # If the subscriptions change while we're resolving the route, the
+        # bus gets a new cache (so we won't put a stale route in it).
+        cache = self._cache
+        handlers = cache.get(topic)
+        if handlers is None:
+            handlers = self._resolve(topic)
+            # Don't let the cache grow without bound.
+            if len(cache) >= self._cache_size:
+                cache.clear()
+            cache[topic] = handlers
+        return handlers
+
+    def _resolve(self, topic: str) -> Tuple[Callable, ...]:
+        """
+        Find the handlers for a topic in the trie.
+
+        :param topic: the topic
+        :return: the handlers (in the order in which they subscribed)
+        """
+        matches: Dict[Callable, int] = {}
+        # These are the nodes that match the topic so far.
+        nodes = _expand([self._root])
+        for segment in topic.split('.'):
+            following: List[_Node] = []
+            for node in nodes:
+                child = node.children.get(segment)
+                if child is not None:
+                    following.append(child)
+                child = node.children.get(STAR)
+                if child is not None:
+                    following.append(child)
+                # A globstar can swallow this segment and keep going.
+                if node.globstar:
+                    following.append(node)
+            nodes = _expand(following)
+            if not nodes:
+                return ()
+        for node in nodes:
+            for handler, sequence in node.handlers.items():
+                if sequence < matches.get(handler, sequence + 1):
+                    matches[handler] = sequence
+        return tuple(sorted(matches, key=matches.__getitem__))
+
+    def publish(self, topic: str, *args, **kwargs):
+        """
+        Publish a message.
+
+        :param topic: the message's topic
+        :param args: the positional arguments for the handlers
+        :param kwargs: the keyword arguments for the handlers
+        """
+        for handler in self.route(topic):
+            handler(*args, **kwargs)
+
+    def attach(
+            self,
+            cls: type,
+            topic: Optional[Callable[[Any, str], str]] = None
+    ) -> type:
+        """
+        Publish every event of an :py:func:`evenz.events.observable` class on
+        this bus.
+
+        :param cls: the observable class
+        :param topic: a function that takes the sender and the name of the
+            event and returns the topic; by default the topic is the class'
+            name followed by the event's name (for example, ``Dog.barked``)
+        :return: the class
+
+        .. note::
+
+            The bus subscribes to the class-level events, so attaching a
+            class costs nothing per instance.  The handlers receive the sender
+            followed by the event's arguments.
+        """
+        # pylint: disable=import-outside-toplevel
+        from .observables import _event_table
+        for name_, _ in _event_table(cls):
+            getattr(cls, name_).subscribe(self._publisher(cls, name_, topic))
+        return cls
+
+    def _publisher(
+            self,
+            cls: type,
+            name: str,
+            topic: Optional[Callable[[Any, str], str]]
+    ) -> Callable:
+        """
+        Create the handler that publishes one of a class' events.
+
+        :param cls: the class
+        :param name: the name of the event
+        :param topic: a function that computes the topic (or ``None`` for the
+            default)
+        :return: the handler
+        """
+        publish = self.publish
+        if topic is None:
+            fixed = f'{cls.__name__}.{name}'
+
+            def publisher(sender, *args, **kwargs):
+                publish(fixed, sender, *args, **kwargs)
+        else:
+            def publisher(sender, *args, **kwargs):
+                publish(topic(sender, name), sender, *args, **kwargs)
+        return publisher
+
+
+def _expand(nodes: List[_Node]) -> List[_Node]:
+    """
+    Add the globstar children of a set of nodes (since a globstar can match
+    zero segments).
+    """
+    # We use a dictionary (rather than a set) to keep the order stable.
+    expanded: Dict[_Node, None] = {}
+    for node in nodes:
+        expanded[node] = None
+        child = node.children.get(GLOBSTAR)
+        if child is not None:
+            expanded[child] = None
+    return list(expanded)
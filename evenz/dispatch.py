@@ -0,0 +1,596 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: evenz.dispatch
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+An event compiles its handlers into a *dispatch function* that calls them
+(see :py:meth:`evenz.events.Event.trigger`).  This module builds those
+functions, picking the simplest one that will do for the handlers the event
+has: whether they're filtered, whether there's an error policy, whether the
+class-level handlers have to be called too, and so on.
+"""
+
+import asyncio
+import inspect
+import weakref
+from concurrent.futures import Future
+from functools import partial
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+)
+from . import executors
+from .batches import _BatchHandler, _single
+from .errors import HandlerErrors
+from .filters import _MISSING, _Filter, _segments
+
+# The dispatch functions work with the internals of the events they're built
+# for.
+# pylint: disable=protected-access
+
+
+class _Stop(object):
+    """
+    This is the type of the :py:data:`STOP` sentinel.
+    """
+    __slots__ = ()
+
+    def __repr__(self):
+        return 'STOP'
+
+
+#: A handler returns this to stop the event's other handlers from being
+#: called.
+STOP = _Stop()
+
+
+def _noop(*args, **kwargs):  # pylint: disable=unused-argument
+    """
+    This is the dispatch function for an event that has no handlers.
+    """
+
+
+def _ref(handler: Callable, callback: Callable = None) -> weakref.ref:
+    """
+    Create a weak reference to a handler.
+
+    :param handler: the handler
+    :param callback: the function to call when the handler is finalized
+    :return: the weak reference
+
+    .. note::
+
+        Bound methods are created on demand (so a plain weak reference to one
+        would die immediately) which is why we use a
+        :py:class:`weakref.WeakMethod` for them.
+    """
+    if inspect.ismethod(handler):
+        return weakref.WeakMethod(handler, callback)
+    return weakref.ref(handler, callback)
+
+
+class _WeakHandler(object):
+    """
+    This callable stands in for a handler that was subscribed weakly.
+    """
+    __slots__ = ('ref',)
+
+    def __init__(self, ref: weakref.ref):
+        """
+
+        :param ref: the weak reference to the handler
+        """
+        self.ref = ref
+
+    def __call__(self, *args, **kwargs):
+        # If the handler is still alive, call it.  (If it isn't, its finalizer
+        # will remove it from the event shortly.)
+        handler = self.ref()
+        if handler is not None:
+            return handler(*args, **kwargs)
+        return None
+
+
+def _scheduled(handler: Callable) -> Callable:
+    """
+    Wrap an ``async`` handler so that calling it schedules it as a task on the
+    running event loop.  (This is how a synchronous trigger calls ``async``
+    handlers.)
+
+    :param handler: the handler
+    :return: the wrapped handler
+    """
+    def schedule(*args, **kwargs):
+        # Get the loop first.  (If there isn't one running, this raises a
+        # RuntimeError before we create a coroutine nobody will await.)
+        loop = asyncio.get_running_loop()
+        coroutine = handler(*args, **kwargs)
+        # (A weakly-subscribed handler that's gone doesn't return one.)
+        if coroutine is None:
+            return None
+        return loop.create_task(coroutine)
+    return schedule
+
+
+def _is_async(handler: Callable) -> bool:
+    """
+    Is a (bound) handler an ``async`` function?
+
+    :param handler: the handler (with the sender bound, if there is one)
+    :return: ``True`` if calling the handler returns a coroutine
+    """
+    # Look past the sender that's bound to the handler and the weak reference
+    # that may be standing in for it.
+    while isinstance(handler, partial):
+        handler = handler.func
+    if isinstance(handler, _WeakHandler):
+        handler = handler.ref()
+    return inspect.iscoroutinefunction(handler)
+
+
+def _report(event_: Any, handler: Callable, future: Future):
+    """
+    Hand the exception a handler raised on an executor (if it raised one) to
+    the event's error policy.
+
+    :param event_: the event
+    :param handler: the handler (as it was subscribed)
+    :param future: the future for the handler's call
+    """
+    if not future.cancelled() and future.exception() is not None:
+        event_._errors.handle(event_, handler, future.exception(), [])
+
+
+def _results(
+        segments: Iterable[Tuple[Tuple[Callable, ...], Tuple[Any, ...]]],
+        kwargs: Dict[str, Any]
+) -> Iterator[Any]:
+    """
+    Call handlers one at a time and yield their results.
+
+    :param segments: the (bound) handlers, each with the positional arguments
+        they take
+    :param kwargs: the keyword arguments
+    :return: a generator of the results
+    """
+    for handlers, args in segments:
+        for h in handlers:
+            # Filtered handlers that don't match have no results.
+            if isinstance(h, _Filter) and not h.matches(args):
+                continue
+            result = h(*args, **kwargs)
+            if result is STOP:
+                return
+            yield result
+
+
+def _unwrap(handler: Callable) -> Optional[Callable]:
+    """
+    Get the handler that was originally subscribed.
+
+    :param handler: the handler as it's stored by the event
+    :return: the original handler (or ``None`` if it was subscribed weakly and
+        is gone)
+    """
+    if isinstance(handler, (_BatchHandler, _Filter)):
+        handler = handler.handler
+    if isinstance(handler, _WeakHandler):
+        handler = handler.ref()
+    return handler
+
+
+def _bind(
+        values: Iterable[Callable],
+        sender: Any
+) -> Tuple[List[Callable], List[Callable], List[Callable]]:
+    """
+    Prepare the handlers (as an event stores them) to be called.
+
+    :param values: the handlers as the event stores them
+    :param sender: the sender that's passed to each handler (if there is one)
+    :return: all the handlers, the handlers that take individual calls, and
+        the batch handlers
+    """
+    handlers: List[Callable] = []
+    individual: List[Callable] = []
+    batch_handlers: List[Callable] = []
+    for h in values:
+        if isinstance(h, _BatchHandler):
+            h = h.handler if sender is None else partial(h.handler, sender)
+            batch_handlers.append(h)
+            # If the event is triggered outside of a batch, the handler gets a
+            # batch of one.
+            handlers.append(_single(h))
+        elif isinstance(h, _Filter):
+            h = h if sender is None else _Filter(
+                partial(h.handler, sender), h.where, h.at
+            )
+            individual.append(h)
+            handlers.append(h)
+        else:
+            h = h if sender is None else partial(h, sender)
+            individual.append(h)
+            handlers.append(h)
+    return handlers, individual, batch_handlers
+
+
+def _build(
+        e: Any,
+        handlers: Iterable[Callable],
+        inherit: bool = False,
+        originals: Tuple[Callable, ...] = None
+) -> Callable:
+    """
+    Build a function that calls a set of (bound) handlers.
+
+    :param e: the event
+    :param handlers: the handlers
+    :param inherit: ``True`` if the function should also call the
+        class-level handlers
+    :param originals: the handlers as they were subscribed (if the event
+        has an error policy)
+    :return: the function
+    """
+    handlers = tuple(handlers)
+    parent = e._parent if inherit else None
+    sender = e._sender
+    # If the handlers run on an executor, each call just submits them.
+    executor = e._executor
+    if executor is not None:
+        # (The error policy hears about the handlers' exceptions as they
+        # finish.)
+        def submit(event_, handlers_, originals_, args, kwargs):
+            futures = [
+                executor.submit(h, *args, **kwargs) for h in handlers_
+            ]
+            if event_._errors is not None:
+                for future, h in zip(futures, originals_):
+                    future.add_done_callback(
+                        partial(_report, event_, h)
+                    )
+            return futures
+
+        def dispatch_submitted(*args, **kwargs):
+            futures = submit(e, handlers, originals, args, kwargs)
+            if parent is not None:
+                futures.extend(
+                    submit(
+                        parent, *parent._guarded_snapshot(),
+                        (sender,) + args, kwargs
+                    )
+                )
+            return executors.Dispatch(futures)
+        return dispatch_submitted
+    # When the handlers are called synchronously, async handlers are just
+    # scheduled on the event loop.
+    handlers = tuple(
+        _Filter(_scheduled(h.handler), h.where, h.at)
+        if isinstance(h, _Filter) and _is_async(h.handler) else
+        _scheduled(h) if _is_async(h) else h
+        for h in handlers
+    )
+    # If there's an error policy, the handlers are called by a function
+    # that can pick up where it left off when one of them fails.
+    if originals is not None:
+        return _build_guarded(e, handlers, originals, parent)
+    # If some of the handlers are filtered, we look them up in the index.
+    if any(isinstance(h, _Filter) for h in handlers):
+        return _build_indexed(e, handlers, parent)
+    # If the class-level handlers have to be called, too, we hand them the
+    # sender in the same pass.  (The class-level event's trigger is looked
+    # up on each call because it changes when its handlers do.)  Whenever
+    # a handler returns STOP, we stop (and return it).
+    if parent is not None:
+        if not handlers:
+            def dispatch_parent(*args, **kwargs):
+                return parent.trigger(sender, *args, **kwargs)
+            return dispatch_parent
+        if len(handlers) == 1:
+            first, = handlers
+
+            def dispatch_one_parent(*args, **kwargs):
+                if first(*args, **kwargs) is STOP:
+                    return STOP
+                return parent.trigger(sender, *args, **kwargs)
+            return dispatch_one_parent
+
+        def dispatch_n_parent(*args, **kwargs):
+            for h in handlers:
+                if h(*args, **kwargs) is STOP:
+                    return STOP
+            return parent.trigger(sender, *args, **kwargs)
+        return dispatch_n_parent
+    # Pick the simplest function that will call all the handlers.  (Like
+    # the others, it returns STOP if a handler did, and otherwise None, so
+    # the handlers' own return values don't leak out of the trigger.)
+    if not handlers:
+        return _noop
+    if len(handlers) == 1:
+        first, = handlers
+
+        def dispatch_one(*args, **kwargs):
+            return STOP if first(*args, **kwargs) is STOP else None
+        return dispatch_one
+    if len(handlers) == 2:
+        first, second = handlers
+
+        def dispatch_two(*args, **kwargs):
+            if first(*args, **kwargs) is STOP:
+                return STOP
+            return STOP if second(*args, **kwargs) is STOP else None
+        return dispatch_two
+
+    def dispatch_n(*args, **kwargs):
+        for h in handlers:
+            if h(*args, **kwargs) is STOP:
+                return STOP
+        return None
+    return dispatch_n
+
+def _build_guarded(
+        e: Any,
+        handlers: Tuple[Callable, ...],
+        originals: Tuple[Callable, ...],
+        parent: Optional[Any]
+) -> Callable:
+    """
+    Build a function that calls a set of (bound) handlers and hands their
+    exceptions to the event's error policy.
+
+    :param e: the event
+    :param handlers: the handlers
+    :param originals: the handlers as they were subscribed
+    :param parent: the class-level event whose handlers the function
+        should also call (if any)
+    :return: the function
+    """
+    # If some of the handlers are filtered, we look them up in the index.
+    if any(isinstance(h, _Filter) for h in handlers):
+        return _build_guarded_indexed(e, handlers, originals, parent)
+    # (The handlers are already in the order in which they're called.)
+    count = len(handlers)
+    policy = e._errors
+    sender = e._sender
+
+    def resume(
+            i: int,
+            error: Exception,
+            args: Tuple[Any, ...],
+            kwargs: Dict[str, Any]
+    ) -> Tuple[bool, List[Exception]]:
+        # A handler failed: let the policy handle it, then carry on with
+        # the next handler (and so on, until we reach the end).
+        errors: List[Exception] = []
+        while True:
+            policy.handle(e, originals[i], error, errors)
+            try:
+                for i in range(i + 1, count):
+                    if handlers[i](*args, **kwargs) is STOP:
+                        return True, errors
+                return False, errors
+            except Exception as ex:  # pylint: disable=broad-except
+                error = ex
+
+    def dispatch(*args, **kwargs):
+        # This is the same loop as usual.  (Only a failure costs extra.)
+        try:
+            for h in handlers:
+                if h(*args, **kwargs) is STOP:
+                    return STOP
+        except Exception as ex:  # pylint: disable=broad-except
+            # pylint: disable=undefined-loop-variable
+            stopped, errors = resume(handlers.index(h), ex, args, kwargs)
+            if not stopped and parent is not None:
+                parent.trigger(sender, *args, **kwargs)
+            policy.done(errors)
+            return STOP if stopped else None
+        if parent is not None:
+            return parent.trigger(sender, *args, **kwargs)
+        return None
+    return dispatch
+
+def _build_guarded_indexed(
+        e: Any,
+        handlers: Tuple[Callable, ...],
+        originals: Tuple[Callable, ...],
+        parent: Optional[Any]
+) -> Callable:
+    """
+    Build a function that calls a set of (bound) handlers, some of which
+    are filtered, and hands their exceptions to the event's error policy.
+
+    :param e: the event
+    :param handlers: the handlers
+    :param originals: the handlers as they were subscribed
+    :param parent: the class-level event whose handlers the function
+        should also call (if any)
+    :return: the function
+    """
+    segments = _segments(handlers, originals)
+    at = e._where_at
+    policy = e._errors
+    sender = e._sender
+
+    def calls(args: Tuple[Any, ...]) -> Iterator[Tuple[Callable, Any]]:
+        # These are the handlers the trigger calls (paired with their
+        # originals), the filtered ones looked up in the index.
+        arg = args[at] if len(args) > at else _MISSING
+        for plain, index in segments:
+            yield from plain
+            if arg is _MISSING:
+                continue
+            for field, table in index:
+                try:
+                    yield from table.get(getattr(arg, field, _MISSING), ())
+                except TypeError:  # (The value can't be hashed.)
+                    continue
+
+    def resume(
+            pending: Iterator[Tuple[Callable, Any]],
+            original: Callable,
+            error: Exception,
+            args: Tuple[Any, ...],
+            kwargs: Dict[str, Any]
+    ) -> Tuple[bool, List[Exception]]:
+        # A handler failed: let the policy handle it, then carry on with
+        # the handlers the trigger hasn't called yet.
+        errors: List[Exception] = []
+        while True:
+            policy.handle(e, original, error, errors)
+            try:
+                for h, original in pending:
+                    if h(*args, **kwargs) is STOP:
+                        return True, errors
+                return False, errors
+            except Exception as ex:  # pylint: disable=broad-except
+                error = ex
+
+    def dispatch(*args, **kwargs):
+        pending = calls(args)
+        try:
+            for h, original in pending:
+                if h(*args, **kwargs) is STOP:
+                    return STOP
+        except Exception as ex:  # pylint: disable=broad-except
+            # pylint: disable=undefined-loop-variable,used-before-assignment
+            stopped, errors = resume(pending, original, ex, args, kwargs)
+            if not stopped and parent is not None:
+                parent.trigger(sender, *args, **kwargs)
+            policy.done(errors)
+            return STOP if stopped else None
+        if parent is not None:
+            return parent.trigger(sender, *args, **kwargs)
+        return None
+    return dispatch
+
+
+def _build_indexed(
+        e: Any,
+        handlers: Tuple[Callable, ...],
+        parent: Optional[Any]
+) -> Callable:
+    """
+    Build a function that calls a set of (bound) handlers, some of which
+    are filtered.
+
+    :param e: the event
+    :param handlers: the handlers
+    :param parent: the class-level event whose handlers the function
+        should also call (if any)
+    :return: the function
+    """
+    segments = _segments(handlers)
+    at = e._where_at
+    sender = e._sender
+    # Usually there's just one run.
+    if len(segments) == 1:
+        plain, index = segments[0]
+
+        def dispatch_run(*args, **kwargs):
+            for h in plain:
+                if h(*args, **kwargs) is STOP:
+                    return STOP
+            if len(args) > at:
+                arg = args[at]
+                for field, table in index:
+                    # (A value that can't be hashed doesn't match.)
+                    try:
+                        found = table.get(getattr(arg, field, _MISSING), ())
+                    except TypeError:
+                        continue
+                    for h in found:
+                        if h(*args, **kwargs) is STOP:
+                            return STOP
+            if parent is not None:
+                return parent.trigger(sender, *args, **kwargs)
+            return None
+        return dispatch_run
+
+    def dispatch_runs(*args, **kwargs):
+        arg = args[at] if len(args) > at else _MISSING
+        for plain_, index_ in segments:
+            for h in plain_:
+                if h(*args, **kwargs) is STOP:
+                    return STOP
+            if arg is _MISSING:
+                continue
+            for field, table in index_:
+                # (A value that can't be hashed doesn't match.)
+                try:
+                    found = table.get(getattr(arg, field, _MISSING), ())
+                except TypeError:
+                    continue
+                for h in found:
+                    if h(*args, **kwargs) is STOP:
+                        return STOP
+        if parent is not None:
+            return parent.trigger(sender, *args, **kwargs)
+        return None
+    return dispatch_runs
+
+
+async def _gather(
+        e: Any,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any]
+):
+    """
+    Call an event's handlers (and its class-level handlers) and wait for the
+    ones that return awaitables.  (See
+    :py:meth:`evenz.events.Event.atrigger`.)
+
+    :param e: the event
+    :param args: the trigger's positional arguments
+    :param kwargs: the trigger's keyword arguments
+    :raises HandlerErrors: if any of the handlers raised exceptions that no
+        error policy handled
+    """
+    # Each handler goes with the event it came from (and the handler as it was
+    # subscribed) so that the right policy hears about its exceptions.
+    handlers, originals = e._guarded_snapshot()
+    calls = [(h, e, o) for h, o in zip(handlers, originals)]
+    if e._parent is not None:
+        handlers, originals = e._parent._guarded_snapshot()
+        calls.extend(
+            (partial(h, e._sender), e._parent, o)
+            for h, o in zip(handlers, originals)
+        )
+    errors: List[BaseException] = []
+    handled: Dict[Any, List[Exception]] = {}
+
+    def fail(event_: Any, handler: Callable, error: BaseException):
+        if event_._errors is None:
+            errors.append(error)
+        else:
+            event_._errors.handle(
+                event_, handler, error, handled.setdefault(event_, [])
+            )
+
+    pending = []
+    for h, event_, original in calls:
+        try:
+            result = h(*args, **kwargs)
+        except Exception as ex:  # pylint: disable=broad-except
+            fail(event_, original, ex)
+            continue
+        if result is STOP:
+            break
+        if inspect.isawaitable(result):
+            pending.append((result, event_, original))
+    # Wait for all the async handlers at once (so they overlap).
+    if pending:
+        results = await asyncio.gather(
+            *(p[0] for p in pending), return_exceptions=True
+        )
+        for result, (_, event_, original) in zip(results, pending):
+            if isinstance(result, BaseException):
+                fail(event_, original, result)
+    for event_, collected in handled.items():
+        try:
+            event_._errors.done(collected)
+        except HandlerErrors as ex:
+            errors.extend(ex.errors)
+    if errors:
+        raise HandlerErrors(errors)
+    return None
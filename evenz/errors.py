@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: evenz.errors
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+These are the exceptions `evenz` raises, and the error policies that decide
+what happens when an event's handler raises one.
+
+.. code-block:: python
+
+    @event(errors=CircuitBreaker(failures=3))
+    def changed(count: int):
+        \"\"\"
+        This event is raised when the count changes.  (A handler that fails
+        three times is unsubscribed.)
+        \"\"\"
+
+By default (:py:data:`PROPAGATE`), the exception propagates to whoever
+triggered the event and the handlers after the one that raised it aren't
+called.  With any other policy, the rest of the handlers are still called.
+
+:py:meth:`evenz.events.Event.atrigger` always calls the rest of the handlers;
+the policy (if there is one) handles the exceptions.  When the handlers run on
+an executor, the policy handles each exception as its handler finishes, and
+:py:meth:`evenz.executors.Dispatch.result` still raises them all together.
+
+.. note::
+
+    The policy only comes into play once a handler raises an exception, so
+    triggers that don't run into one cost the same as they would without it.
+"""
+
+import logging
+import threading
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Union
+
+PROPAGATE = 'propagate'  #: let the exception propagate (the default)
+COLLECT = 'collect'  #: call the other handlers, then raise them all together
+LOG = 'log'  #: log the exception and call the other handlers
+
+
+class HandlerErrors(Exception):
+    """
+    This exception is raised when one or more of an event's handlers raised
+    exceptions.
+    """
+    def __init__(self, errors: List[BaseException]):
+        """
+
+        :param errors: the exceptions raised by the handlers
+        """
+        super().__init__(
+            f'{len(errors)} handler(s) raised exceptions: '
+            f'{", ".join(repr(e) for e in errors)}'
+        )
+        self.errors: List[BaseException] = errors  #: the handlers' exceptions
+
+
+class ErrorPolicy(object):
+    """
+    This is the base class for error policies.
+    """
+    def handle(
+            self,
+            event_: Any,
+            handler: Callable,
+            error: Exception,
+            errors: List[Exception]
+    ):
+        """
+        An event calls this when one of its handlers raises an exception.
+
+        :param event_: the event
+        :param handler: the handler (as it was subscribed)
+        :param error: the exception
+        :param errors: the exceptions raised by the trigger's handlers so far
+            (the policy may add this one)
+        """
+        raise NotImplementedError
+
+    def done(self, errors: List[Exception]):
+        """
+        An event calls this after it has called all the handlers of a trigger
+        in which a handler raised an exception.
+
+        :param errors: the exceptions the policy collected
+        """
+
+
+class Collect(ErrorPolicy):
+    """
+    Call all the handlers, then raise a :py:class:`HandlerErrors` with the
+    exceptions they raised.
+    """
+    def handle(
+            self,
+            event_: Any,
+            handler: Callable,
+            error: Exception,
+            errors: List[Exception]
+    ):
+        errors.append(error)
+
+    def done(self, errors: List[Exception]):
+        if errors:
+            raise HandlerErrors(errors)
+
+
+class Log(ErrorPolicy):
+    """
+    Log the exceptions and keep going.
+    """
+    def __init__(self, logger: logging.Logger = None):
+        """
+
+        :param logger: the logger (by default, the ``evenz`` logger)
+        """
+        self.logger = logger or logging.getLogger('evenz')  #: the logger
+
+    def handle(
+            self,
+            event_: Any,
+            handler: Callable,
+            error: Exception,
+            errors: List[Exception]
+    ):
+        self.logger.error(
+            'The handler %r of %r raised an exception.', handler, event_,
+            exc_info=error
+        )
+
+
+class CircuitBreaker(ErrorPolicy):
+    """
+    Unsubscribe a handler from an event once it has raised a number of
+    exceptions.  (The exceptions themselves are handled by another policy.)
+    """
+    def __init__(
+            self,
+            failures: int = 3,
+            then: Union[str, ErrorPolicy] = LOG,
+            on_trip: Callable[[Any, Callable], Any] = None
+    ):
+        """
+
+        :param failures: the number of exceptions after which a handler is
+            unsubscribed
+        :param then: the policy that handles the exceptions
+            (:py:data:`COLLECT`, :py:data:`LOG` or a policy)
+        :param on_trip: a function to call (with the event and the handler)
+            when a handler is unsubscribed
+        """
+        if failures < 1:
+            raise ValueError('The number of failures must be at least 1.')
+        self.failures = failures  #: the failures that trip the breaker
+        self._then = resolve(then) or Log()
+        self._on_trip = on_trip
+        # The failures of each event's handlers (for as long as the event is
+        # around).
+        self._counts: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def count(self, event_: Any, handler: Callable) -> int:
+        """
+        Get the number of exceptions a handler has raised.
+
+        :param event_: the event
+        :param handler: the handler
+        :return: the number of exceptions
+        """
+        return self._counts.get(event_, {}).get(handler, 0)
+
+    def handle(
+            self,
+            event_: Any,
+            handler: Callable,
+            error: Exception,
+            errors: List[Exception]
+    ):
+        with self._lock:
+            counts: Dict[Callable, int] = self._counts.setdefault(event_, {})
+            count = counts[handler] = counts.get(handler, 0) + 1
+        if count == self.failures:
+            # The event stops calling the handler from the next trigger on.
+            # (A class-level event calls the handlers subscribed to its base
+            # classes' events, so that's where we may find it.)
+            # pylint: disable=protected-access
+            subscribed_to = event_._subscribed_to(handler)
+            try:
+                if subscribed_to is not None:
+                    subscribed_to.unsubscribe(handler)
+            except ValueError:  # Somebody beat us to it.
+                pass
+            if self._on_trip is not None:
+                self._on_trip(event_, handler)
+        self._then.handle(event_, handler, error, errors)
+
+    def done(self, errors: List[Exception]):
+        self._then.done(errors)
+
+
+def resolve(errors: Union[str, ErrorPolicy, None]) -> Optional[ErrorPolicy]:
+    """
+    Get the policy described by an event's ``errors`` option.
+
+    :param errors: :py:data:`PROPAGATE` (or ``None``), :py:data:`COLLECT`,
+        :py:data:`LOG` or a policy
+    :return: the policy (or ``None`` if exceptions should propagate)
+    """
+    if errors is None or errors == PROPAGATE:
+        return None
+    if errors == COLLECT:
+        return Collect()
+    if errors == LOG:
+        return Log()
+    if isinstance(errors, ErrorPolicy):
+        return errors
+    raise ValueError(f'{errors!r} is not an error policy.')
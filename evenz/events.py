@@ -9,10 +9,36 @@
 Import this module to make event handling a little simpler.
 """
 
+import asyncio
+from contextlib import nullcontext
 import inspect
-from typing import Any, Callable, Iterable, List, NamedTuple, Tuple
+from concurrent.futures import Executor
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple,
+    Union
+)
 import sys
-from functools import partial, wraps
+import threading
+from types import ModuleType
+from functools import partial, reduce, wraps
+import weakref
+from . import executors
+from .batches import Batcher, _BatchHandler
+# (These are part of this module's interface, too.)
+# pylint: disable=unused-import
+from .batches import Batch, batch_handler  # noqa
+from .dispatch import STOP  # noqa
+from .errors import HandlerErrors  # noqa
+# pylint: enable=unused-import
+from .dispatch import (
+    _WeakHandler, _bind, _build, _gather, _noop, _ref, _results,
+    _unwrap
+)
+from .errors import ErrorPolicy, resolve as _error_policy
+from .filters import _MISSING, _Filter, _where
+from .queues import BLOCK, Queue
+from .streams import Stream
+from .policies import Policy
 
 
 class Args(NamedTuple):
@@ -23,20 +49,313 @@ class Args(NamedTuple):
     sender: Any  #: the originator of the event
 
 
+#: This stands in for the lock of an event that isn't thread-safe.
+_NO_LOCK = nullcontext()
+
+
 class Event(object):
     """
     An event object wraps a function and notifies a set of handlers when the
     function is called.
+
+    .. note::
+
+        The handlers are kept in an insertion-ordered dictionary, so
+        subscribing and unsubscribing take constant time.  A handler that is
+        already subscribed isn't subscribed again (it's still called once, in
+        its original position).  Triggers call the handlers from an immutable
+        snapshot (a tuple) that is taken the first time the event is triggered
+        after the handlers change.
+
+        Each trigger calls the handlers that were subscribed when it started:
+        a handler that subscribes or unsubscribes handlers (including itself)
+        while the event is being triggered affects the *next* trigger, not the
+        current one.
+
+        Handlers subscribed *weakly* don't keep their objects alive.  When a
+        weakly-subscribed handler is garbage-collected it's unsubscribed
+        automatically (by a finalizer callback, so triggers never have to look
+        for dead handlers).
     """
-    def __init__(self, f: Callable, sender: Any = None):
+    def __init__(
+            self,
+            f: Callable,
+            sender: Any = None,
+            weak: bool = False,
+            executor: Union[str, Executor, None] = None,
+            policy: Policy = None,
+            threadsafe: bool = False,
+            errors: Union[str, ErrorPolicy, None] = None
+    ):
         """
 
         :param f:  the function that triggers the event
         :param sender: the sender of the event
+        :param weak: ``True`` to subscribe handlers weakly unless they say
+            otherwise
+        :param executor: the executor that calls the handlers (see
+            :py:func:`evenz.executors.resolve`); by default the handlers are
+            called on the thread that triggers the event
+        :param policy: the policy that decides when triggers are delivered to
+            the handlers (see :py:mod:`evenz.policies`); by default they're
+            delivered immediately
+        :param threadsafe: ``True`` if handlers may be subscribed and
+            unsubscribed on other threads while the event is triggered
+        :param errors: the policy that decides what happens when a handler
+            raises an exception (see :py:mod:`evenz.errors`); by default the
+            exception propagates
+
+        .. note::
+
+            If the event has an executor, triggering it returns a
+            :py:class:`evenz.executors.Dispatch` you can use to wait for the
+            handlers.
+
+            A thread-safe event's subscribers take a lock, but triggers don't:
+            they call the handlers from an immutable snapshot, and a new
+            snapshot is only published if no subscriber changed the handlers
+            while it was being built.
         """
         self._f: Callable = f
-        self._handlers: List[Callable] = []
+        # The handlers are indexed by the handler (or, if the handler was
+        # subscribed weakly, by a weak reference to it).  The values are the
+        # functions the dispatch function actually calls.
+        self._handlers: Dict[Callable, Callable] = {}
+        # These are the priorities of the handlers that have them (indexed
+        # the same way).
+        self._priorities: Dict[Callable, int] = {}
+        # This is the snapshot of the (bound) handlers taken when the dispatch
+        # function was last compiled.
+        self._snapshot: Tuple[Callable, ...] = ()
+        # (If there's an error policy, these are the snapshot's handlers as
+        # they were subscribed.)
+        self._originals: Optional[Tuple[Callable, ...]] = None
         self._sender = sender
+        self._weak = weak
+        self._executor: Optional[Executor] = executors.resolve(executor)
+        self._has_weak = False
+        self._finalize: Optional[Callable] = None
+        self._batcher: Optional[Batcher] = None
+        # If this is an instance's event, this is the class-level event whose
+        # handlers are also called when the instance's event is triggered.
+        self._parent: Optional[Event] = None
+        # This is the dispatch function without the policy's gate.
+        self._target: Callable = _noop
+        self._gate = policy.gate(self._ungated) if policy is not None else None
+        # This is the position of the argument whose fields filtered handlers
+        # examine.
+        self._where_at = 0
+        # This is the profiler watching the event (see evenz.profiling).
+        self._profiler = None
+        # Subscribers (and whoever publishes a new dispatch function) hold
+        # the lock.  The version changes whenever the handlers do.
+        self._lock = threading.RLock() if threadsafe else _NO_LOCK
+        self._version = 0
+        # This is the policy for handlers' exceptions (or `None` if they
+        # propagate).
+        self._errors: Optional[ErrorPolicy] = _error_policy(errors)
+
+    def _start_batch(self, batcher: Batcher):
+        """
+        Start collecting triggers in a batch.
+
+        :param batcher: the batcher
+        """
+        if self._batcher is not None:
+            raise RuntimeError('The event is already collecting a batch.')
+        self._batcher = batcher
+        self._invalidate()
+
+    def _stop_batch(self):
+        """
+        Stop collecting triggers in a batch.
+        """
+        self._batcher = None
+        self._invalidate()
+
+    def _invalidate(self):
+        """
+        Discard the compiled dispatch function.  (It will be rebuilt the next
+        time the event is triggered.)
+        """
+        with self._lock:
+            self._version += 1
+            self.__dict__.pop('trigger', None)
+
+    def _compile(self) -> Callable:
+        """
+        Rebuild the function that calls the handlers.
+
+        :return: the dispatch function
+
+        .. note::
+
+            The compiled function is stored in the instance's ``trigger``
+            attribute where it hides the :py:meth:`trigger` method, so
+            triggering the event calls the handlers without any intermediate
+            steps.  The sender (if there is one) is bound to each handler here
+            so that triggering the event doesn't have to supply it on every
+            call.
+        """
+        while True:
+            # If the handlers change while we're compiling, we start again.
+            version = self._version
+            built = self._build_all()
+            with self._lock:
+                if self._version == version:
+                    (
+                        self._snapshot, self._originals, self._target,
+                        dispatch
+                    ) = built
+                    self.trigger = dispatch
+                    return dispatch
+
+    def _build_all(self) -> Tuple[
+            Tuple[Callable, ...], Optional[Tuple[Callable, ...]], Callable,
+            Callable
+    ]:
+        """
+        Build the dispatch function for the current handlers.
+
+        :return: the snapshot of the (bound) handlers, the handlers as they
+            were subscribed (if there's an error policy), the dispatch
+            function without the policy's gate, and the dispatch function
+        """
+        sender = self._sender
+        values = self._values()
+        # If handlers' exceptions are handled, the policy needs to know which
+        # handler (as it was subscribed) raised each one.
+        originals = individual_originals = None
+        if self._errors is not None:
+            originals = tuple(_unwrap(v) for v in values)
+            individual_originals = tuple(
+                o for o, v in zip(originals, values)
+                if not isinstance(v, _BatchHandler)
+            )
+        # If a profiler is watching, the handlers are timed.  (Otherwise the
+        # dispatch function is exactly what it would have been.)
+        profiler = self._profiling()
+        if profiler is not None:
+            values = profiler.instrument(self, values)
+        handlers, individual, batch_handlers = _bind(values, sender)
+        # If the event belongs to an instance of an observable class, the
+        # handlers subscribed to the class are called, too.  (If there aren't
+        # any yet, we don't bother; the class-level event will tell us when
+        # there are.)
+        parent = self._parent
+        inherit = False
+        # (The class-level event is an event, too.)
+        # pylint: disable=protected-access
+        if parent is not None:
+            inherit = bool(parent.snapshot())
+            if not inherit:
+                parent._dependents.add(self)
+                # If the class-level event got handlers before it knew about
+                # us, we need them after all.
+                inherit = bool(parent.snapshot())
+            # The class-level event also keeps track of the instances' events
+            # that are compiled (in case a profiler starts watching it).
+            parent._compiled.add(self)
+        dispatch = _build(self, handlers, inherit, originals)
+        if profiler is not None:
+            dispatch = profiler.counted(self, dispatch)
+        # If we're in the middle of a batch, triggers are just recorded (and
+        # the batch needs to know how to deliver them).
+        if self._batcher is not None:
+            deliver = _build(self, individual, inherit, individual_originals)
+            deliver_batch = _build(self, batch_handlers)
+            self._batcher.compiled(
+                None if deliver is _noop else deliver,
+                None if deliver_batch is _noop else deliver_batch
+            )
+            dispatch = self._batcher.record
+        # If there's a policy, triggers go through its gate.
+        target = dispatch
+        if self._gate is not None:
+            dispatch = self._gate.submit
+        return tuple(handlers), originals, target, dispatch
+
+    def _profiling(self):
+        """
+        Get the profiler that's watching this event (or the class-level event
+        to which it belongs).
+
+        :return: the :py:class:`evenz.profiling.Profiler` (or ``None``)
+        """
+        # pylint: disable=protected-access
+        if self._profiler is None and self._parent is not None:
+            return self._parent._profiling()
+        return self._profiler
+
+    def _values(self) -> Tuple[Callable, ...]:
+        """
+        Get a copy of the handlers as the event stores them.
+
+        :return: the handlers
+        """
+        # Take a copy of the handlers first.  (Finalizers for weakly-subscribed
+        # handlers may remove them while we're working.)
+        items = tuple(self._handlers.items())
+        priorities = self._priorities
+        if not priorities and not any(
+                isinstance(value, _Filter) for _, value in items
+        ):
+            return tuple(value for _, value in items)
+        # Handlers with higher priorities come first, and filtered handlers
+        # come after the others with the same priority.  (The sort is stable,
+        # so otherwise handlers stay in the order in which they subscribed.)
+        return tuple(
+            value for _, value in sorted(
+                items,
+                key=lambda item: (
+                    -priorities.get(item[0], 0), isinstance(item[1], _Filter)
+                )
+            )
+        )
+
+    def snapshot(self) -> Tuple[Callable, ...]:
+        """
+        Get the handlers the event calls when it's triggered.
+
+        :return: the handlers (with the sender bound, if there is one)
+        """
+        if 'trigger' not in self.__dict__:
+            self._compile()
+        return self._snapshot
+
+    def _guarded_snapshot(
+            self
+    ) -> Tuple[Tuple[Callable, ...], Tuple[Optional[Callable], ...]]:
+        """
+        Get the handlers the event calls when it's triggered, along with the
+        handlers as they were subscribed (which the error policy needs).
+
+        :return: the handlers and, if the event has an error policy, the
+            handlers as they were subscribed (otherwise ``None`` for each)
+        """
+        self.snapshot()
+        # (The two go together, so we take them together.)
+        with self._lock:
+            snapshot, originals = self._snapshot, self._originals
+        return snapshot, originals or (None,) * len(snapshot)
+
+    def _ungated(self) -> Callable:
+        """
+        Get the current dispatch function without the policy's gate.  (The gate
+        uses this to deliver triggers.)
+
+        :return: the dispatch function
+        """
+        if 'trigger' not in self.__dict__:
+            self._compile()
+        return self._target
+
+    def flush(self):
+        """
+        Deliver any trigger the event's policy is holding right away.
+        """
+        if self._gate is not None:
+            self._gate.flush()
 
     @property
     def handlers(self) -> Iterable[Callable]:
@@ -45,22 +364,142 @@ class Event(object):
 
         :return: an iteration of the handlers.
         """
-        return iter(self._handlers)
+        return iter([
+            h for h in (
+                _unwrap(v) for v in Event._values(self)
+            ) if h is not None
+        ])
+
+    def _key(self, handler: Callable) -> Optional[Callable]:
+        """
+        Find the key under which a handler is subscribed.
+
+        :param handler: the handler
+        :return: the key (or ``None`` if the handler isn't subscribed)
+        """
+        if handler in self._handlers:
+            return handler
+        # If the handler may have been subscribed weakly, look for a weak
+        # reference to it.  (Live weak references compare equal if they refer
+        # to the same object.)
+        if self._has_weak:
+            try:
+                ref = _ref(handler)
+            except TypeError:  # The handler can't be weakly referenced.
+                return None
+            if ref in self._handlers:
+                return ref
+        return None
+
+    def _subscribed_to(self, handler: Callable) -> Optional['Event']:
+        """
+        Find the event to which a handler is subscribed.
 
-    def subscribe(self, handler: Callable):
+        :param handler: the handler
+        :return: this event (or ``None`` if the handler isn't subscribed)
+        """
+        return self if self._key(handler) is not None else None
+
+    def _finalizer(self) -> Callable:
+        """
+        Get the callback that removes a weakly-subscribed handler from this
+        event when the handler is finalized.
+
+        :return: the callback
+        """
+        if self._finalize is not None:
+            return self._finalize
+        # The callback only refers to the event weakly, so it doesn't keep the
+        # event alive either.
+        event_ref = weakref.ref(self)
+
+        def finalize(ref: weakref.ref):
+            # pylint: disable=protected-access
+            e = event_ref()
+            if e is None:
+                return
+            with e._lock:
+                if e._handlers.pop(ref, None) is not None:
+                    e._priorities.pop(ref, None)
+                    e._invalidate()
+        self._finalize = finalize
+        return finalize
+
+    def subscribe(
+            self,
+            handler: Callable,
+            weak: bool = None,
+            batch: bool = None,
+            where: Dict[str, Any] = None,
+            priority: int = 0
+    ):
         """
         Subscribe a handler function to this event.
 
         :param handler: the handler
+        :param weak: ``True`` to hold only a weak reference to the handler, so
+            that subscribing doesn't keep the handler (or, for a bound method,
+            its object) alive; ``None`` to use the event's default
+        :param batch: ``True`` if the handler accepts a :py:class:`Batch` of
+            triggers instead of individual calls; ``None`` if the handler
+            says so itself (see :py:func:`batch_handler`)
+        :param where: call the handler only when the fields of the event's
+            first argument (typically an :py:class:`Args`) have these values;
+            each field maps to a (hashable) value, or to a set (or list) of
+            values
+        :param priority: handlers with higher priorities are called first
+            (handlers with the same priority are called in the order in which
+            they subscribed)
+
+        .. code-block:: python
+
+            changed.subscribe(on_insert, where={'kind': 'insert'})
+            changed.subscribe(on_write, where={'kind': {'insert', 'update'}})
 
         .. note::
 
             You can also use the += operator.
+
+            Filtered handlers are indexed by the values of their fields, so a
+            trigger only calls the ones that match (no matter how many there
+            are).  They're called after the handlers with the same priority that
+            aren't filtered.
+
+            A handler can return :py:data:`STOP` to keep the handlers after it
+            (including the class-level handlers) from being called.  (If the
+            event has an executor, the handlers run concurrently and can't
+            stop one another.)
         """
         # Sanity check:  The handler parameter should be a handler function.
-        if not isinstance(handler, Callable):
+        if not callable(handler):
             raise ValueError(f'{type(handler)} is not callable.')
-        self._handlers.append(handler)
+        # If the handler is already subscribed, there's nothing to do.
+        if self._key(handler) is not None:
+            return self
+        weak = self._weak if weak is None else weak
+        if weak:
+            key = _ref(handler, self._finalizer())
+            value = _WeakHandler(key)
+        else:
+            key = value = handler
+        if getattr(handler, '__evenz_batch__', False) if batch is None \
+                else batch:
+            if where is not None:
+                raise ValueError('Batch handlers may not be filtered.')
+            value = _BatchHandler(value)
+        elif where is not None:
+            value = _Filter(value, _where(where), self._where_at)
+        with self._lock:
+            # Somebody may have subscribed the handler while we weren't
+            # looking.
+            if self._key(handler) is not None:
+                return self
+            if weak:
+                self._has_weak = True
+            self._handlers[key] = value
+            if priority:
+                self._priorities[key] = priority
+            self._invalidate()
         return self
 
     def unsubscribe(self, handler: Callable):
@@ -73,7 +512,13 @@ class Event(object):
 
             You can also use the -= operator.
         """
-        self._handlers.remove(handler)
+        with self._lock:
+            key = self._key(handler)
+            if key is None:
+                raise ValueError(f'{handler} is not subscribed.')
+            del self._handlers[key]
+            self._priorities.pop(key, None)
+            self._invalidate()
         return self
 
     def __iadd__(self, other):
@@ -85,138 +530,451 @@ class Event(object):
         return self.unsubscribe(other)
 
     def __and__(self, other):
-        a = set(self._handlers)
-        b = set(other)
-        ab = a & b
-        self._handlers = [h for h in self._handlers if h in ab]
+        # Keep only the handlers that are also in the other collection.
+        other = set(other.handlers if isinstance(other, Event) else other)
+        with self._lock:
+            for h in [h for h in self.handlers if h not in other]:
+                key = self._key(h)
+                del self._handlers[key]
+                self._priorities.pop(key, None)
+            self._invalidate()
         return self
 
     def __or__(self, other):
-        a = set(self._handlers)
-        b = set(other)
-        ab = a | b
-        self._handlers = [h for h in self._handlers if h in ab]
+        # Add the handlers from the other collection that aren't already
+        # here.  (They go after the ones that are.)
+        for h in (other.handlers if isinstance(other, Event) else other):
+            self.subscribe(h)
         return self
 
-    def trigger(self, *args, **kwargs):
+    # The compiled dispatch function hides this method on purpose (see
+    # `_compile`).
+    def trigger(self, *args, **kwargs):  # pylint: disable=method-hidden
         """
         Trigger the event.
+
+        :return: a :py:class:`evenz.executors.Dispatch` if the event has an
+            executor; otherwise :py:data:`STOP` if a handler stopped the
+            others from being called (and otherwise ``None``)
+
+        .. note::
+
+            This method is only called if the handlers have changed since the
+            event was last triggered.  It compiles a new dispatch function
+            that takes its place until the handlers change again.  (So if you
+            keep a reference to ``event.trigger`` for speed, get it again
+            after the handlers change.)
+        """
+        # If the dispatch function is current (which means somebody held on to
+        # this method), just use it.  Otherwise compile a new one.
+        dispatch = self.__dict__.get('trigger')
+        if dispatch is None:
+            dispatch = self._compile()
+        return dispatch(*args, **kwargs)
+
+    def results(self, *args, **kwargs) -> Iterator[Any]:
         """
-        # Just call all the handlers.
-        for h in self._handlers:
-            if self._sender is not None:
-                h(self._sender, *args, **kwargs)
-            else:
-                h(*args, **kwargs)
+        Trigger the event and get the handlers' results.
+
+        :return: a generator that calls each handler (in order) as you ask for
+            its result
+
+        .. code-block:: python
+
+            for result in dog.asked.results('sit'):
+                ...
+
+        .. note::
+
+            The handlers are called lazily: if you stop asking for results,
+            the remaining handlers aren't called.  If a handler returns
+            :py:data:`STOP`, the results end there.
+
+            The handlers are called right away on the calling thread (even if
+            the event has an executor, a policy or an active batch).
+        """
+        # Take the snapshot now (so the handlers are the ones subscribed when
+        # the trigger started, even if the results are consumed later).
+        segments = [(self.snapshot(), args)]
+        if self._parent is not None:
+            segments.append(
+                (self._parent.snapshot(), (self._sender,) + args)
+            )
+        return _results(segments, kwargs)
+
+    def first(self, *args, **kwargs) -> Any:
+        """
+        Trigger the event until a handler returns a result.
+
+        :return: the first result that isn't ``None`` (or ``None`` if there
+            isn't one)
+
+        .. note::
+
+            The handlers after the one that returns the result aren't called.
+        """
+        for result in self.results(*args, **kwargs):
+            if result is not None:
+                return result
+        return None
+
+    def reduce(self, reducer: Callable[[Any, Any], Any], *args, **kwargs):
+        """
+        Trigger the event and combine the handlers' results.
+
+        :param reducer: the function that combines two results (for example,
+            :py:func:`operator.add`)
+        :return: the combined result (or ``None`` if there are no results)
+        """
+        results = self.results(*args, **kwargs)
+        first = next(results, _MISSING)
+        if first is _MISSING:
+            return None
+        return reduce(reducer, results, first)
+
+    def batch(
+            self,
+            max_size: int = None,
+            max_latency: float = None,
+            columns: Dict[str, str] = None
+    ):
+        """
+        Collect the event's triggers into batches.
+
+        :param max_size: deliver the batch whenever it has this many triggers
+        :param max_latency: deliver the batch when a trigger arrives this long
+            (in seconds) after the first trigger in the batch
+        :param columns: if the triggers' arguments are numbers, the names of
+            the arguments mapped to their :py:mod:`array` type codes (so that
+            the batch keeps them in arrays; see
+            :py:class:`evenz.payloads.Columns`)
+        :return: a :py:class:`Batcher` (use it as a context manager)
+
+        .. code-block:: python
+
+            with dog.barked.batch():
+                for i in range(0, 1000):
+                    dog.bark(i)
+
+        .. seealso::
+
+            :py:class:`Batcher`
+        """
+        return Batcher(
+            self, max_size=max_size, max_latency=max_latency, columns=columns
+        )
+
+    def stream(self) -> Stream:
+        """
+        Get a stream of the event's triggers (to which you can apply
+        operators like :py:meth:`evenz.streams.Stream.map` and
+        :py:meth:`evenz.streams.Stream.window`).  If the event has a sender,
+        the stream's values leave it out.
+
+        :return: the :py:class:`evenz.streams.Stream`
+
+        .. code-block:: python
+
+            dog.barked.stream().filter(lambda n: n > 1).window(10).subscribe(
+                on_ten_barks
+            )
+        """
+        return Stream(self)
+
+    def queued(
+            self,
+            handler: Callable,
+            capacity: int = 1024,
+            overflow: str = BLOCK,
+            key: Callable[..., Any] = None,
+            on_error: Callable[[BaseException], Any] = None
+    ) -> Queue:
+        """
+        Subscribe a handler through a bounded queue, so that triggering the
+        event doesn't wait for the handler.
+
+        :param handler: the handler
+        :param capacity: the most triggers the queue holds
+        :param overflow: what to do with a trigger when the queue is full (see
+            :py:mod:`evenz.queues`)
+        :param key: for :py:data:`evenz.queues.COALESCE`, a function that
+            returns a trigger's key
+        :param on_error: a function to call with the exceptions the handler
+            raises
+        :return: the :py:class:`evenz.queues.Queue` (start a consumer with
+            :py:meth:`evenz.queues.Queue.start` or
+            :py:meth:`evenz.queues.Queue.consume`; closing it unsubscribes it)
+
+        .. code-block:: python
+
+            with dog.barked.queued(on_bark, overflow=DROP_OLDEST) as queue:
+                queue.start()
+                run_the_kennel()
+        """
+        queue = Queue(
+            handler, capacity=capacity, overflow=overflow, key=key,
+            on_error=on_error
+        )
+        self.subscribe(queue, weak=False)
+        # Closing the queue unsubscribes it.
+        # pylint: disable=protected-access
+        queue._detach = partial(self.unsubscribe, queue)
+        return queue
+
+    async def atrigger(self, *args, **kwargs):
+        """
+        Trigger the event and wait for the handlers.
+
+        Synchronous handlers are called one after another; ``async`` handlers
+        (and any other handlers that return awaitables) run concurrently.
+
+        :return: a :py:class:`evenz.executors.Dispatch` (once the handlers
+            have finished) if the event has an executor
+        :raises HandlerErrors: if any of the handlers raised exceptions (the
+            other handlers still run)
+
+        .. note::
+
+            If the event (or, for the class-level handlers, the class-level
+            event) has an error policy, the policy handles the exceptions.
+
+            If the event has a delivery policy (or is collecting a batch), the
+            trigger goes through it like any other, and the handlers are
+            called (and ``async`` handlers scheduled) when it's delivered.
+        """
+        # A policy (or a batch) decides when the trigger is delivered, so
+        # there's nothing to wait for here.
+        if self._gate is not None or self._batcher is not None:
+            return self.trigger(*args, **kwargs)
+        # If the handlers run on an executor, we wait for them there.
+        if self._executor is not None:
+            dispatch = self.trigger(*args, **kwargs)
+            if dispatch.futures:
+                await asyncio.wait(
+                    [asyncio.wrap_future(f) for f in dispatch.futures]
+                )
+            return dispatch
+        return await _gather(self, args, kwargs)
 
     def __call__(self, *args, **kwargs):
         # The `Event` is callable so that it can be called like a function.
         # When that happens it will first call the function for which it was
         # created...
         self._f(*args, **kwargs)
-        # ...then trigger all the handlers.
-        self.trigger(*args, **kwargs)
+        # ...then trigger all the handlers.  (If there aren't any, this does
+        # nothing.)
+        return self.trigger(*args, **kwargs)
+
+    def __reduce_ex__(self, protocol):
+        # An observable instance's event goes wherever the instance does (for
+        # example, to a process executor's workers).  Its handlers stay here,
+        # though: the copy is the instance's event as it would be created on
+        # first access, without any handlers.
+        if self._parent is not None:
+            return getattr, (self._sender, self._parent.name)
+        return super().__reduce_ex__(protocol)
+
+
+class AsyncEvent(Event):
+    """
+    This is an :py:class:`Event` that wraps an ``async`` function.  Calling it
+    returns a coroutine that awaits the function, then the handlers.
+    """
+    # (Calling an async event returns a coroutine, just as calling the async
+    # function would.)
+    # pylint: disable=invalid-overridden-method
+    async def __call__(self, *args, **kwargs):
+        await self._f(*args, **kwargs)
+        await self.atrigger(*args, **kwargs)
 
 
-def observable(cls):
+def _event_type(f: Callable) -> type:
+    """
+    Get the type of event that should wrap a function.
+
+    :param f: the function
+    :return: :py:class:`AsyncEvent` for ``async`` functions, otherwise
+        :py:class:`Event`
+    """
+    return AsyncEvent if inspect.iscoroutinefunction(f) else Event
+
+
+def observable(
+        cls: type = None,
+        weak: bool = None,
+        executor: Union[str, Executor, None] = None,
+        threadsafe: bool = None,
+        bus=None,
+        errors: Union[str, ErrorPolicy, None] = None
+):
     """
     Use this decorator to mark a class that exposes events.
 
     :param cls: the class
+    :param weak: ``True`` if the instances' events should subscribe handlers
+        weakly by default
+    :param executor: the executor the instances' events use to call their
+        handlers (see :py:func:`evenz.executors.resolve`)
+    :param threadsafe: ``True`` if handlers may be subscribed to the
+        instances' events on other threads while they're triggered
+    :param bus: a :py:class:`evenz.bus.Bus` on which the class' events are
+        published (see :py:meth:`evenz.bus.Bus.attach`)
+    :param errors: the policy for exceptions raised by the handlers of the
+        class' events (see :py:mod:`evenz.errors`)
     :return: the class
 
     .. seealso::
 
         If you are using this decorator, you probably also want to use
         :py:func:`event` on some of the methods.
+
+    .. note::
+
+        You can use this decorator with or without arguments (for example,
+        ``@observable`` or ``@observable(executor='thread')``).  The options
+        are inherited by subclasses.
+
+        An instance's events are created the first time they're accessed, so
+        instances whose events are never used don't pay for them.  If the
+        class defines ``__slots__`` (and so has no ``__dict__``), the class is
+        re-created with an additional slot for each event.
     """
-    # For starters, we need the class' original __init__ method.
-    cls_init = cls.__init__
-
-    @wraps(cls.__init__)
-    def init(self, *args, **kwargs):
-        """
-        This is the replacement for the class' initializer.
-        """
-        # Call the class' original __init__ method.
-        cls_init(self, *args, **kwargs)
-        # Retrieve all the methods marked as events.
-        event_members: List[Tuple[str, Event]] = [
-            member for member in inspect.getmembers(self)
-            if hasattr(member[1], '__is_event__')
-            and member[1].__is_event__
-        ]
-        for event_member in event_members:
-            # Get the attribute name and bound method.
-            name_, event_method = event_member
-            # If the method we found is a bound method...
-            if event_method.__self__ is not None:
-                # ...create a new event with a new function that passes this
-                # instance in as the first positional (i.e. the "self"
-                # parameter).
-                setattr(
-                    self,
-                    name_,
-                    Event(
-                        f=partial(event_method.__func__.__func__, self),
-                        sender=self
-                    )
-                )
-            else:
-                # Otherwise, we don't need to supply the 'self' parameter to
-                # the function wrapped by the Event object.
-                setattr(
-                    self,
-                    name_,
-                    Event(
-                        f=event_method.__func__.__func__,
-                        sender=cls
-                    )
-                )
-    # Replace the class' original __init__ method with our own.
-    cls.__init__ = init
-    # The caller gets back the original class.
+    # (The descriptors are events themselves, so their module imports this
+    # one.)
+    # pylint: disable=import-outside-toplevel
+    from .observables import _observe
+    # If we were called with options (but no class), we return a decorator.
+    if cls is None:
+        return partial(
+            observable,
+            weak=weak, executor=executor, threadsafe=threadsafe, bus=bus,
+            errors=errors
+        )
+    # Record the options for the instances' events.  (They're merged with the
+    # options inherited from the base classes.)
+    options = {
+        name_: value for name_, value in (
+            ('weak', weak), ('executor', executor),
+            ('threadsafe', threadsafe), ('errors', errors)
+        ) if value is not None
+    }
+    if options:
+        cls.__evenz_options__ = {
+            **getattr(cls, '__evenz_options__', {}), **options
+        }
+    # Give the class its events.
+    cls = _observe(cls, errors)
+    # If we were given a bus, the class' events are published on it.
+    if bus is not None:
+        bus.attach(cls)
+    # The caller gets back the class.
     return cls
 
 
-def event(f: Callable) -> Event:
+def event(
+        f: Callable = None,
+        policy: Policy = None,
+        threadsafe: bool = None,
+        errors: Union[str, ErrorPolicy, None] = None
+) -> Event:
     """
     Decorate a function or method to create an :py:class:`Event`.
 
     :param f: the function.
+    :param policy: the policy that decides when triggers are delivered to the
+        handlers (see :py:mod:`evenz.policies`)
+    :param threadsafe: ``True`` if handlers may be subscribed on other threads
+        while the event is triggered
+    :param errors: the policy for exceptions raised by the handlers (see
+        :py:mod:`evenz.errors`)
     :return: the event
 
     .. seealso::
 
         If you are decorating a method within a class, you'll need to use the
         :py:func:`observable` class decorator on the class as well.
+
+    .. note::
+
+        You can use this decorator with or without arguments (for example,
+        ``@event`` or ``@event(policy=Throttle(0.1))``).
+
+        The decorated function has the event's :py:meth:`Event.results`,
+        :py:meth:`Event.first`, :py:meth:`Event.reduce` and
+        :py:meth:`Event.stream` methods, too.
+
+        Decorating a function doesn't touch its module.  (If you'd like the
+        module's documentation to list its events, see :py:func:`document`.)
     """
+    # If we were called with options (but no function), we return a
+    # decorator.
+    if f is None:
+        return partial(
+            event, policy=policy, threadsafe=threadsafe, errors=errors
+        )
+    options = {
+        name_: value for name_, value in (
+            ('policy', policy), ('threadsafe', threadsafe), ('errors', errors)
+        ) if value is not None
+    }
     # Create an event object to wrap the function.
-    e = Event(f=f)
-
-    @wraps(f)
-    def _f(*args, **kwargs):
-        e.trigger(*args, **kwargs)
+    e = _event_type(f)(f=f, **options)
+
+    if isinstance(e, AsyncEvent):
+        @wraps(f)
+        async def _f(*args, **kwargs):
+            await e.atrigger(*args, **kwargs)
+    else:
+        @wraps(f)
+        def _f(*args, **kwargs):
+            return e.trigger(*args, **kwargs)
     # Inject some extra doc stuff into the docstring.
     _f.__doc__ = f'⚡ :py:class:`evenz.events.Event`\n{f.__doc__}'
     # Supply the function with some meta information. (This will mostly be used
     # by the @observable decorator.)
     setattr(_f, 'event', e)
+    # The function can also collect the handlers' results.
+    setattr(_f, 'results', e.results)
+    setattr(_f, 'first', e.first)
+    setattr(_f, 'reduce', e.reduce)
+    setattr(_f, 'stream', e.stream)
     setattr(_f, '__is_event__', True)
     setattr(_f, '__func__', f)
-
-    # If the function is defined directly within a module...
-    if f in [_ for _ in inspect.getmembers(f.__module__, inspect.isfunction)]:
-        # ...go get the module.
-        module_ = sys.modules[f.__module__]
-        # Construct some new documentation and append it to the module's
-        # documentation.
-        doc_parts = [
-            module_.__doc__,
-            f'⚡ :py:class:`evenz.events.Event` :py:func:`{ f.__name__ }`',
-        ]
-        doc_parts = filter(lambda p: p is not None, doc_parts)
-        module_.__doc__ = '\n'.join(doc_parts)
+    setattr(_f, '__evenz_options__', options)
 
     # Return the new function.
     return _f
+
+
+def document(module: Union[str, ModuleType]) -> str:
+    """
+    Append a list of a module's events to its documentation.
+
+    :param module: the module (or its name)
+    :return: the module's new documentation
+
+    .. code-block:: python
+
+        # At the bottom of a module (or in your Sphinx configuration)...
+        document(__name__)
+
+    .. note::
+
+        This looks through the module once, so call it after all the events
+        are defined.  Calling it again doesn't list the events twice.
+    """
+    module_ = sys.modules[module] if isinstance(module, str) else module
+    lines = [
+        f'⚡ :py:class:`evenz.events.Event` :py:func:`{name_}`'
+        for name_, member in vars(module_).items()
+        if getattr(member, '__is_event__', False)
+        and isinstance(getattr(member, 'event', None), Event)
+        and getattr(member, '__module__', None) == module_.__name__
+    ]
+    doc = module_.__doc__ or ''
+    missing = [line for line in lines if line not in doc]
+    if missing:
+        module_.__doc__ = '\n'.join(
+            part for part in (module_.__doc__, *missing) if part is not None
+        )
+    return module_.__doc__
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: evenz.executors
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Events can hand their handlers to an executor instead of calling them on the
+thread that triggered the event.  This module provides the shared executors
+and the handle a trigger returns when it uses one.
+"""
+
+import concurrent.futures
+from concurrent.futures import (
+    Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+)
+import threading
+from typing import Any, Iterable, List, Optional, Union
+from .errors import HandlerErrors
+
+_lock = threading.Lock()  #: guards the creation of the shared executors
+# (The shared executors are created when they're first needed, so they aren't
+# constants.)
+# pylint: disable=invalid-name
+_thread_pool: Optional[ThreadPoolExecutor] = None  #: the shared thread pool
+_process_pool: Optional[ProcessPoolExecutor] = None  #: the shared process pool
+# pylint: enable=invalid-name
+
+INLINE = 'inline'  #: call handlers on the triggering thread
+THREAD = 'thread'  #: call handlers on the shared thread pool
+PROCESS = 'process'  #: call handlers on the shared process pool
+
+
+def thread_pool() -> ThreadPoolExecutor:
+    """
+    Get the shared thread pool.  (Use this for handlers that are I/O-bound.)
+
+    :return: the shared thread pool
+    """
+    global _thread_pool  # pylint: disable=global-statement
+    with _lock:
+        if _thread_pool is None:
+            _thread_pool = ThreadPoolExecutor(thread_name_prefix='evenz')
+        return _thread_pool
+
+
+def process_pool() -> ProcessPoolExecutor:
+    """
+    Get the shared process pool.  (Use this for handlers that are CPU-bound.
+    The handlers, the sender and the arguments must all be picklable.)
+
+    :return: the shared process pool
+    """
+    global _process_pool  # pylint: disable=global-statement
+    with _lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor()
+        return _process_pool
+
+
+def resolve(executor: Union[str, Executor, None]) -> Optional[Executor]:
+    """
+    Get the executor described by an event's ``executor`` option.
+
+    :param executor: :py:data:`INLINE` (or ``None``), :py:data:`THREAD`,
+        :py:data:`PROCESS` or an executor
+    :return: the executor (or ``None`` if handlers should be called inline)
+    """
+    if executor is None or executor == INLINE:
+        return None
+    if executor == THREAD:
+        return thread_pool()
+    if executor == PROCESS:
+        return process_pool()
+    if isinstance(executor, Executor):
+        return executor
+    raise ValueError(f'{executor!r} is not an executor.')
+
+
+class Dispatch(object):
+    """
+    A trigger that hands its handlers to an executor returns one of these so
+    that the caller can wait for the handlers (or not).
+    """
+    __slots__ = ('futures',)
+
+    def __init__(self, futures: Iterable[Future]):
+        """
+
+        :param futures: the futures for the handler calls
+        """
+        self.futures: List[Future] = list(futures)  #: the handlers' futures
+
+    def done(self) -> bool:
+        """
+        Have all the handlers finished?
+
+        :return: ``True`` if all the handlers have finished
+        """
+        return all(f.done() for f in self.futures)
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Wait for the handlers to finish.
+
+        :param timeout: the maximum time to wait (in seconds)
+        :return: ``True`` if all the handlers finished
+        """
+        return not wait(self.futures, timeout=timeout).not_done
+
+    def result(self, timeout: float = None) -> List[Any]:
+        """
+        Wait for the handlers to finish and get their return values.
+
+        :param timeout: the maximum time to wait (in seconds)
+        :return: the handlers' return values (in the order the handlers were
+            called)
+        :raises HandlerErrors: if any of the handlers raised exceptions
+        :raises concurrent.futures.TimeoutError: if the handlers didn't finish
+            in time
+        """
+        if not self.wait(timeout):
+            raise concurrent.futures.TimeoutError(
+                'The handlers did not finish in time.'
+            )
+        errors = [
+            f.exception() for f in self.futures if f.exception() is not None
+        ]
+        if errors:
+            raise HandlerErrors(errors)
+        return [f.result() for f in self.futures]
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: evenz.filters
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Handlers subscribed with a filter (``where=``) are only called when the
+fields of the event's argument have the values they want.
+
+.. code-block:: python
+
+    changed.subscribe(on_insert, where={'kind': 'insert'})
+
+An event indexes its filtered handlers by the values they want, so a trigger
+looks up the ones that match instead of asking each of them.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+_MISSING = object()  #: stands in for an argument's missing field
+
+
+class _Filter(object):
+    """
+    This marks a handler that was subscribed with a filter (see
+    :py:meth:`evenz.events.Event.subscribe`).  Calling it calls the handler
+    only if the arguments match.
+    """
+    __slots__ = ('handler', 'where', 'at')
+
+    def __init__(
+            self,
+            handler: Callable,
+            where: Dict[str, frozenset],
+            at: int = 0
+    ):
+        """
+
+        :param handler: the handler
+        :param where: the values each field of the argument may have
+        :param at: the position of the argument the filter examines
+        """
+        self.handler = handler
+        self.where = where
+        self.at = at
+
+    def matches(self, args: Tuple[Any, ...]) -> bool:
+        """
+        Do the trigger's arguments match the filter?
+
+        :param args: the trigger's positional arguments
+        :return: ``True`` if they match
+        """
+        if len(args) <= self.at:
+            return False
+        arg = args[self.at]
+        try:
+            return all(
+                getattr(arg, field, _MISSING) in values
+                for field, values in self.where.items()
+            )
+        except TypeError:  # A value that can't be hashed doesn't match.
+            return False
+
+    def __call__(self, *args, **kwargs):
+        if self.matches(args):
+            return self.handler(*args, **kwargs)
+        return None
+
+
+def _where(where: Dict[str, Any]) -> Dict[str, frozenset]:
+    """
+    Normalize a filter so that each field maps to the set of values it may
+    have.
+
+    :param where: the filter (each field maps to a value, or to a set or list
+        of values)
+    :return: the normalized filter
+    """
+    if not where:
+        raise ValueError('The filter has no fields.')
+    return {
+        field: frozenset(
+            value if isinstance(value, (set, frozenset, list)) else (value,)
+        ) for field, value in where.items()
+    }
+
+
+def _index(
+        filters: Iterable[_Filter],
+        originals: Iterable[Callable] = None
+) -> Tuple[Tuple[str, Dict[Any, Tuple[Any, ...]]], ...]:
+    """
+    Index filtered handlers by the values of their arguments' fields.
+
+    :param filters: the filtered handlers
+    :param originals: the handlers as they were subscribed (if the event has
+        an error policy)
+    :return: a table for each field that maps the field's values to the
+        handlers to call (or, if there are originals, to the handlers paired
+        with their originals)
+    """
+    tables: Dict[str, Dict[Any, List[Any]]] = {}
+    pairs = (
+        ((f, None) for f in filters) if originals is None
+        else zip(filters, originals)
+    )
+    for f, original in pairs:
+        # Each handler is indexed by its first field.  If it's filtering on
+        # other fields, too, the index finds the filter (which checks them).
+        field, values = next(iter(f.where.items()))
+        h = f.handler if len(f.where) == 1 else f
+        entry = h if original is None else (h, original)
+        table = tables.setdefault(field, {})
+        for value in values:
+            table.setdefault(value, []).append(entry)
+    return tuple(
+        (field, {value: tuple(hs) for value, hs in table.items()})
+        for field, table in tables.items()
+    )
+
+
+def _segments(
+        handlers: Tuple[Callable, ...],
+        originals: Tuple[Callable, ...] = None
+) -> List[Tuple[Tuple[Any, ...], Tuple[Any, ...]]]:
+    """
+    Split (bound) handlers, some of which are filtered, into the runs in
+    which they're called.
+
+    :param handlers: the handlers (in the order in which they're called)
+    :param originals: the handlers as they were subscribed (if the event has
+        an error policy)
+    :return: a list of runs, each of which is a tuple of the unfiltered
+        handlers and the index of the filtered handlers that follow them (see
+        :py:func:`_index`); if there are originals, each handler is paired
+        with its original
+    """
+    # The handlers come in runs of unfiltered handlers followed by filtered
+    # ones (one for each priority that has both), so each run of filtered
+    # handlers is indexed where it falls.
+    guarded = originals is not None
+    originals = originals if guarded else (None,) * len(handlers)
+    segments = []
+    plain: List[Any] = []
+    filters: List[Tuple[_Filter, Optional[Callable]]] = []
+    for h, original in zip(handlers + (None,), originals + (None,)):
+        if isinstance(h, _Filter):
+            filters.append((h, original))
+            continue
+        if filters or h is None:
+            segments.append((
+                tuple(plain),
+                _index(
+                    (f for f, _ in filters),
+                    (o for _, o in filters) if guarded else None
+                )
+            ))
+            plain, filters = [], []
+        if h is not None:
+            plain.append((h, original) if guarded else h)
+    return segments
@@ -0,0 +1,663 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: evenz.journal
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+A journal records events' triggers in an append-only log on disk (for audit,
+or to recover after a crash) and can replay them through the events' handlers
+later.
+
+.. code-block:: python
+
+    with Journal('journal/', sync='group') as journal:
+        journal.attach(Dog, key=lambda dog: dog.name)
+        ...
+
+    # Later...
+    with Journal('journal/') as journal:
+        journal.replay(Dog, resolve=kennel.__getitem__)
+
+The log is split into fixed-size segment files that are memory-mapped, so
+recording a trigger is a copy into memory.  Each record has a checksum, so a
+record that was only partly written when the process died is ignored (along
+with anything after it).
+
+.. note::
+
+    Each attached event gets a *channel* in the journal.  The journal records
+    the name and the codec of each channel in the log itself, so a journal
+    can be read without knowing which events were attached.
+"""
+
+import mmap
+import os
+import pickle
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import (
+    Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+)
+
+from .events import Event
+from .observables import _EventMember, _event_table
+
+NEVER = 'never'  #: leave writing the log to disk to the operating system
+ALWAYS = 'always'  #: write each record to disk before the trigger continues
+GROUP = 'group'  #: write the records to disk in groups
+INTERVAL = 'interval'  #: write the records to disk every so often
+
+_MAGIC = b'EVZJ\x00\x01'  #: starts each segment (the format and its version)
+#: the length of the record (including this header), its checksum, and its
+#: channel
+_HEADER = struct.Struct('<IIH')
+_HEADER_SIZE = _HEADER.size
+_pack_header = _HEADER.pack_into
+_crc32 = zlib.crc32
+_DEFINITION = 0  #: the channel of the records that define the other channels
+_SEGMENT = '{:08d}.evz'  #: the names of the segment files
+
+
+class PickleCodec(object):
+    """
+    This codec pickles the arguments.  (It handles anything that can be
+    pickled, including keyword arguments.)
+    """
+    spec = 'pickle'  #: identifies the codec in the journal
+
+    @staticmethod
+    def encode(args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> bytes:
+        """
+        Encode a trigger's arguments.
+
+        :param args: the positional arguments
+        :param kwargs: the keyword arguments
+        :return: the encoded arguments
+        """
+        return pickle.dumps(
+            (args, kwargs) if kwargs else (args,), pickle.HIGHEST_PROTOCOL
+        )
+
+    @staticmethod
+    def decode(data: bytes) -> Tuple[Tuple[Any, ...], Dict[str, Any]]:
+        """
+        Decode a trigger's arguments.
+
+        :param data: the encoded arguments
+        :return: the positional arguments and the keyword arguments
+        """
+        value = pickle.loads(data)
+        return value[0], value[1] if len(value) > 1 else {}
+
+
+class StructCodec(object):
+    """
+    This codec packs arguments that are numbers (or short byte strings) with
+    :py:mod:`struct`, which is much more compact (and faster) than pickling
+    them.
+    """
+    def __init__(self, fmt: str):
+        """
+
+        :param fmt: the format of the arguments (see :py:mod:`struct`; for
+            example, ``'dd'`` for two floats)
+        """
+        self._struct = struct.Struct(f'<{fmt.lstrip("<>=!@")}')
+        self.spec = f'struct:{fmt}'  #: identifies the codec in the journal
+
+    def encode(self, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> bytes:
+        """
+        Encode a trigger's arguments.
+
+        :param args: the positional arguments
+        :param kwargs: the keyword arguments (which aren't supported)
+        :return: the encoded arguments
+        """
+        if kwargs:
+            raise TypeError('The struct codec takes positional arguments.')
+        return self._struct.pack(*args)
+
+    def decode(self, data: bytes) -> Tuple[Tuple[Any, ...], Dict[str, Any]]:
+        """
+        Decode a trigger's arguments.
+
+        :param data: the encoded arguments
+        :return: the positional arguments and the keyword arguments
+        """
+        return self._struct.unpack(data), {}
+
+
+def _codec(spec: str):
+    """
+    Create the codec a journal names.
+
+    :param spec: the codec's spec
+    :return: the codec
+    """
+    if spec == PickleCodec.spec:
+        return PickleCodec()
+    if spec.startswith('struct:'):
+        return StructCodec(spec[len('struct:'):])
+    raise ValueError(f'{spec!r} is not a codec.')
+
+
+class Record(NamedTuple):
+    """
+    This is a trigger read back from a journal.
+    """
+    channel: str  #: the name of the event's channel
+    key: Any  #: identifies the sender (if the channel records one)
+    args: Tuple[Any, ...]  #: the positional arguments
+    kwargs: Dict[str, Any]  #: the keyword arguments
+
+
+class _Segment(object):
+    """
+    This is a segment file, mapped into memory.
+    """
+    def __init__(self, path: Path, size: int = None):
+        """
+
+        :param path: the path to the file
+        :param size: the size of a new segment (or ``None`` to open an
+            existing segment to read)
+        """
+        self.path = path
+        if size is None:
+            self._file = open(path, 'rb')
+            self.map = mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        else:
+            self._file = open(path, 'r+b' if path.exists() else 'w+b')
+            if os.fstat(self._file.fileno()).st_size < size:
+                self._file.truncate(size)
+            self.map = mmap.mmap(self._file.fileno(), size)
+            if self.map[:len(_MAGIC)] != _MAGIC:
+                self.map[:len(_MAGIC)] = _MAGIC
+        if self.map[:len(_MAGIC)] != _MAGIC:
+            raise ValueError(f'{path} is not a journal segment.')
+
+    def records(self) -> Iterator[Tuple[int, int, memoryview]]:
+        """
+        Read the records in the segment.
+
+        :return: a generator of each record's position, channel and data
+        """
+        view = memoryview(self.map)
+        size = len(view)
+        pos = len(_MAGIC)
+        unpack = _HEADER.unpack_from
+        crc32 = zlib.crc32
+        try:
+            while pos + _HEADER.size <= size:
+                length, crc, channel = unpack(view, pos)
+                # A zero length means we've reached the unused part of the
+                # segment; a bad checksum means the record is incomplete.
+                if length < _HEADER.size or pos + length > size:
+                    return
+                data = view[pos + _HEADER.size:pos + length]
+                if crc32(data) != crc:
+                    return
+                yield pos, channel, data
+                pos += length
+        finally:
+            view.release()
+
+    def end(self) -> int:
+        """
+        Find the end of the segment's records.
+
+        :return: the position after the last record
+        """
+        end = len(_MAGIC)
+        records = self.records()
+        for pos, _, data in records:
+            end = pos + _HEADER.size + len(data)
+            data.release()
+        records.close()
+        return end
+
+    def close(self):
+        """
+        Close the segment.
+        """
+        self.map.close()
+        self._file.close()
+
+
+class Journal(object):
+    """
+    A journal records events' triggers in a segmented, append-only log.
+    """
+    def __init__(
+            self,
+            directory: Union[str, Path],
+            segment_size: int = 64 * 1024 * 1024,
+            sync: str = GROUP,
+            group_size: int = 1024,
+            interval: float = 1.0
+    ):
+        """
+
+        :param directory: the directory that holds the log's segments
+        :param segment_size: the size of each segment file (in bytes)
+        :param sync: when the records are written to disk (:py:data:`NEVER`,
+            :py:data:`ALWAYS`, :py:data:`GROUP` or :py:data:`INTERVAL`)
+        :param group_size: with :py:data:`GROUP`, write the records to disk
+            after this many have been recorded
+        :param interval: with :py:data:`INTERVAL`, write the records to disk
+            this often (in seconds)
+
+        .. note::
+
+            Whatever the policy, the records are written to disk when you
+            :py:meth:`commit` and when the journal is closed.
+        """
+        if sync not in (NEVER, ALWAYS, GROUP, INTERVAL):
+            raise ValueError(f'{sync!r} is not a sync policy.')
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._segment_size = segment_size
+        self._sync = sync
+        # This is how many records we append before we write them to disk.
+        # (With the other policies, it's never.)
+        self._group_size = {ALWAYS: 1, GROUP: group_size}.get(
+            sync, float('inf')
+        )
+        self._lock = threading.RLock()
+        # These are the channels (by name), and their names and codecs (by
+        # number).
+        self._channels: Dict[str, int] = {}
+        self._definitions: Dict[int, Tuple[str, Any, bool]] = {}
+        # (A thread that's replaying triggers doesn't record them again, but
+        # the other threads' triggers are still recorded.)
+        self._replaying = threading.local()
+        # These are the events we're recording (and their handlers).
+        self._attached: List[Tuple[Event, Callable]] = []
+        # Find the last segment (and where its records end).
+        self._index = 0
+        self._segment: Optional[_Segment] = None
+        self._map: Optional[mmap.mmap] = None
+        self._pos = 0
+        self._synced = 0
+        self._pending = 0
+        self._load()
+        self._closed = threading.Event()
+        self._syncer: Optional[threading.Thread] = None
+        if sync == INTERVAL:
+            self._syncer = threading.Thread(
+                target=self._sync_every, args=(interval,), daemon=True
+            )
+            self._syncer.start()
+
+    def _segments(self) -> List[Path]:
+        """
+        Get the paths to the segment files (in order).
+
+        :return: the paths
+        """
+        return sorted(self._directory.glob(_SEGMENT.replace('{:08d}', '*')))
+
+    def _load(self):
+        """
+        Read the channel definitions from the log and open the last segment.
+        """
+        paths = self._segments()
+        for path in paths:
+            segment = _Segment(path)
+            records = segment.records()
+            try:
+                for _, channel, data in records:
+                    if channel == _DEFINITION:
+                        self._define(bytes(data))
+                    data.release()
+            finally:
+                records.close()
+                segment.close()
+        if paths:
+            self._index = int(paths[-1].stem)
+            self._segment = _Segment(paths[-1], self._segment_size)
+            self._map = self._segment.map
+            self._pos = self._synced = self._segment.end()
+        else:
+            self._roll()
+
+    def _define(self, data: bytes):
+        """
+        Add a channel definition read from the log.
+
+        :param data: the definition
+        """
+        number, keyed, spec, name_ = pickle.loads(data)
+        self._channels[name_] = number
+        self._definitions[number] = (name_, _codec(spec), keyed)
+
+    def _roll(self):
+        """
+        Start a new segment.
+        """
+        if self._segment is not None:
+            self._segment.map.flush()
+            self._segment.close()
+        self._index += 1
+        self._segment = _Segment(
+            self._directory / _SEGMENT.format(self._index), self._segment_size
+        )
+        self._map = self._segment.map
+        self._pos = self._synced = len(_MAGIC)
+        self._pending = 0
+
+    def _append(self, channel: int, data: bytes):
+        """
+        Append a record to the log.
+
+        :param channel: the channel
+        :param data: the record's data
+        """
+        length = _HEADER_SIZE + len(data)
+        with self._lock:
+            pos = self._pos
+            end = pos + length
+            if end > self._segment_size:
+                if length > self._segment_size - len(_MAGIC):
+                    raise ValueError('The record is larger than a segment.')
+                self._roll()
+                pos = self._pos
+                end = pos + length
+            m = self._map
+            m[pos + _HEADER_SIZE:end] = data
+            # The header goes in last, so a record isn't there until it's
+            # complete.
+            _pack_header(m, pos, length, _crc32(data), channel)
+            self._pos = end
+            self._pending += 1
+            if self._pending >= self._group_size:
+                self._flush()
+
+    def _flush(self):
+        """
+        Write the records appended since the last flush to disk.
+        """
+        # The memory we flush has to start on a page boundary.
+        start = self._synced - self._synced % mmap.PAGESIZE
+        if self._pos > start:
+            self._segment.map.flush(start, self._pos - start)
+        self._synced = self._pos
+        self._pending = 0
+
+    def _sync_every(self, interval: float):
+        """
+        Write the records to disk every so often (until the journal is
+        closed).
+
+        :param interval: how often (in seconds)
+        """
+        while not self._closed.wait(interval):
+            with self._lock:
+                if self._pending:
+                    self._flush()
+
+    def commit(self):
+        """
+        Write the records to disk now.
+        """
+        with self._lock:
+            if self._segment is not None:
+                self._flush()
+
+    def channel(
+            self,
+            name: str,
+            codec: Any = None,
+            keyed: bool = False
+    ) -> Callable[..., None]:
+        """
+        Get a function that records triggers in a channel.  (This is what
+        :py:meth:`attach` subscribes to events.)
+
+        :param name: the name of the channel
+        :param codec: the codec for the arguments (by default, a
+            :py:class:`PickleCodec`)
+        :param keyed: ``True`` if the first argument identifies the sender
+        :return: the function
+        """
+        codec = codec if codec is not None else PickleCodec()
+        with self._lock:
+            number = self._channels.get(name)
+            if number is None:
+                number = max(self._definitions, default=_DEFINITION) + 1
+                definition = pickle.dumps((number, keyed, codec.spec, name))
+                self._append(_DEFINITION, definition)
+                self._define(definition)
+            elif self._definitions[number][1].spec != codec.spec:
+                raise ValueError(
+                    f"The '{name}' channel was recorded with another codec."
+                )
+        encode = codec.encode
+        append = self._append
+        replaying = self._replaying
+
+        def record(*args, **kwargs):
+            # We don't record the triggers we're replaying.
+            if not getattr(replaying, 'active', False):
+                append(number, encode(args, kwargs))
+        return record
+
+    def attach(
+            self,
+            target: Any,
+            name: str = None,
+            codec: Any = None,
+            key: Callable[[Any], Any] = None
+    ):
+        """
+        Record an event's triggers.
+
+        :param target: an :py:class:`evenz.events.Event`, a function decorated
+            with :py:func:`evenz.events.event`, or a class decorated with
+            :py:func:`evenz.events.observable` (in which case all the events
+            of all its instances are recorded)
+        :param name: the name of the channel (by default, the event's name);
+            for a class, the names of the events are appended to it
+        :param codec: the codec for the arguments
+        :param key: for events that have senders, a function that returns a
+            value identifying the sender (which is recorded, too)
+        :return: the journal
+        :raises ValueError: if there's a key and an event has no sender
+        """
+        channels = [
+            # pylint: disable=protected-access
+            (channel_, e, isinstance(e, _EventMember) or e._sender is not None)
+            for channel_, e in _channels(target, name)
+        ]
+        # Only a sender can be keyed.
+        if key is not None:
+            for channel_, _, sends in channels:
+                if not sends:
+                    raise ValueError(
+                        f"The '{channel_}' event has no sender to key."
+                    )
+        for channel_, e, sends in channels:
+            record = self.channel(channel_, codec=codec, keyed=key is not None)
+            if sends:
+                # The handler receives the sender first.
+                record = _keyed(record, key)
+            e.subscribe(record)
+            self._attached.append((e, record))
+        return self
+
+    def detach(self, target: Any = None, name: str = None):
+        """
+        Stop recording an event's triggers.
+
+        :param target: the event (see :py:meth:`attach`), or ``None`` to stop
+            recording all of them
+        :param name: the name of the channel (see :py:meth:`attach`)
+        :return: the journal
+        """
+        events = None if target is None else {
+            id(e) for _, e in _channels(target, name)
+        }
+        attached = []
+        for e, record in self._attached:
+            if events is None or id(e) in events:
+                e.unsubscribe(record)
+            else:
+                attached.append((e, record))
+        self._attached = attached
+        return self
+
+    def records(self, channels: List[str] = None) -> Iterator[Record]:
+        """
+        Read the triggers back from the journal.
+
+        :param channels: the names of the channels to read (or ``None`` for
+            all of them)
+        :return: a generator of the records (in the order they were recorded)
+
+        .. note::
+
+            The generator stops at the records that were there when it was
+            created, so the triggers recorded while it runs (for example,
+            during a :py:meth:`replay`) aren't read.
+        """
+        with self._lock:
+            self.commit()
+            paths = self._segments()
+            end = self._pos
+        wanted = None if channels is None else set(channels)
+        for path in paths:
+            segment = _Segment(path)
+            records = segment.records()
+            # (The last segment is the one we're writing.)
+            last = path == paths[-1]
+            try:
+                for pos, channel, data in records:
+                    if last and pos >= end:
+                        data.release()
+                        break
+                    try:
+                        if channel == _DEFINITION:
+                            continue
+                        name_, codec, keyed = self._definitions[channel]
+                        if wanted is not None and name_ not in wanted:
+                            continue
+                        args, kwargs = codec.decode(data)
+                    finally:
+                        data.release()
+                    if keyed:
+                        yield Record(name_, args[0], args[1:], kwargs)
+                    else:
+                        yield Record(name_, None, args, kwargs)
+            finally:
+                # (The segment can't be closed while we're reading it.)
+                records.close()
+                segment.close()
+
+    def replay(
+            self,
+            target: Any,
+            name: str = None,
+            resolve: Callable[[Any], Any] = None
+    ) -> int:
+        """
+        Replay the recorded triggers of an event through its handlers.  (The
+        replayed triggers aren't recorded again.)
+
+        :param target: the event (see :py:meth:`attach`)
+        :param name: the name of the channel (see :py:meth:`attach`)
+        :param resolve: for a class, a function that returns the instance a
+            recorded key identifies (without it, the triggers go to the
+            class-level handlers with no sender)
+        :return: the number of triggers replayed
+        """
+        events = {channel_: e for channel_, e in _channels(target, name)}
+        count = 0
+        self._replaying.active = True
+        try:
+            for r in self.records(list(events)):
+                e = events[r.channel]
+                if isinstance(e, _EventMember):
+                    if resolve is not None:
+                        getattr(resolve(r.key), e.name).trigger(
+                            *r.args, **r.kwargs
+                        )
+                    else:
+                        e.trigger(None, *r.args, **r.kwargs)
+                else:
+                    e.trigger(*r.args, **r.kwargs)
+                count += 1
+        finally:
+            self._replaying.active = False
+        return count
+
+    def close(self):
+        """
+        Stop recording, write the records to disk, and close the journal.
+        """
+        self.detach()
+        self._closed.set()
+        if self._syncer is not None:
+            self._syncer.join()
+        with self._lock:
+            if self._segment is not None:
+                self._flush()
+                self._segment.close()
+                self._segment = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def _keyed(record: Callable, key: Optional[Callable[[Any], Any]]) -> Callable:
+    """
+    Wrap a channel's recording function for an event that has a sender.
+
+    :param record: the function
+    :param key: the function that identifies the sender (or ``None`` if the
+        sender isn't recorded)
+    :return: the wrapped function
+    """
+    if key is None:
+        def keyed(sender, *args, **kwargs):  # pylint: disable=unused-argument
+            record(*args, **kwargs)
+    else:
+        def keyed(sender, *args, **kwargs):
+            record(key(sender), *args, **kwargs)
+    return keyed
+
+
+def _channels(target: Any, name: str = None) -> List[Tuple[str, Event]]:
+    """
+    Get the events a target refers to (and their channels' names).
+
+    :param target: the target (see :py:meth:`Journal.attach`)
+    :param name: the name of the channel (or the prefix for a class)
+    :return: the events
+    """
+    if isinstance(getattr(target, 'event', None), Event):
+        target = target.event
+    if isinstance(target, _EventMember):
+        return [(name or f'{target.owner.__qualname__}.{target.name}', target)]
+    if isinstance(target, Event):
+        # An observable instance's event is named like the class' event (so
+        # that its channel is found again after a restart).
+        parent = target._parent  # pylint: disable=protected-access
+        if isinstance(parent, _EventMember):
+            return [(name or _channels(parent)[0][0], target)]
+        f = target._f  # pylint: disable=protected-access
+        return [(name or getattr(f, '__qualname__', None) or repr(f), target)]
+    if isinstance(target, type):
+        prefix = name or target.__qualname__
+        return [
+            (f'{prefix}.{name_}', getattr(target, name_))
+            for name_, _ in _event_table(target)
+        ]
+    raise TypeError(f'{target!r} is not an event or an observable class.')
@@ -0,0 +1,438 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: evenz.observables
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+This module holds the machinery behind :py:func:`evenz.events.observable`:
+the descriptors it installs in place of a class' :py:func:`evenz.events.event`
+methods, and the hooks that give subclasses (and classes with ``__slots__``)
+the same treatment.
+"""
+
+import inspect
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, Union
+import weakref
+from .errors import ErrorPolicy, resolve as _error_policy
+from .events import Event, _event_type
+
+# The descriptors create and look after the events of the classes' instances.
+# pylint: disable=protected-access
+
+
+class _EventMember(Event):
+    """
+    This is the descriptor :py:func:`observable` installs in place of each
+    :py:func:`event` method.  It creates an instance's :py:class:`Event` the
+    first time it's accessed.
+
+    It's also the *class-level* event: handlers subscribed to it (for example,
+    ``Dog.barked += handler``) are called whenever the event is triggered on
+    any instance of the class (or its subclasses), with the instance as the
+    sender.
+
+    .. note::
+
+        Subscribing to the class doesn't touch the instances.  The only
+        exception is the class' (or a base class') first class-level handler:
+        instances' events that were already compiled without class-level
+        handlers are told to compile again.
+    """
+    __is_event__ = True  #: this member is an event
+
+    def __init__(
+            self,
+            name: str,
+            function: Callable,
+            owner: type,
+            base: '_EventMember' = None
+    ):
+        """
+
+        :param name: the name of the event
+        :param function: the function decorated with :py:func:`event`
+        :param owner: the class to which this member belongs
+        :param base: the member for the same event on the nearest base class
+            (if there is one)
+        """
+        # Class-level events are shared by everybody, so they're thread-safe.
+        # (They handle their handlers' exceptions like the instances' events
+        # do.)
+        options = {
+            **getattr(owner, '__evenz_options__', {}),
+            **getattr(function, '__evenz_options__', {})
+        }
+        super().__init__(
+            f=function.__func__, threadsafe=True,
+            errors=options.get('errors')
+        )
+        self.name = name
+        self.function = function
+        self.owner = owner
+        self._base = base
+        # The class-level event is what `Owner.name` returns, so it stands in
+        # for the method (and its documentation).
+        self.__doc__ = function.__doc__
+        self.__wrapped__ = function
+        self.__name__ = function.__name__
+        self.__qualname__ = f'{owner.__qualname__}.{name}'
+        self.__module__ = owner.__module__
+        # We keep track of the members on subclasses so that we can tell them
+        # when our handlers change...
+        self._subclasses = weakref.WeakSet()
+        if base is not None:
+            base._subclasses.add(self)
+        # ...and likewise for the instances' events that were compiled when
+        # there were no class-level handlers...
+        self._dependents = weakref.WeakSet()
+        # ...and for all the instances' events that were compiled (which only
+        # need to be compiled again when a profiler starts or stops watching).
+        self._compiled = weakref.WeakSet()
+        # The class-level event is triggered with the sender first, so the
+        # argument filters examine comes second.
+        self._where_at = 1
+
+    def _values(self) -> Tuple[Callable, ...]:
+        # The class-level handlers include the ones subscribed to the base
+        # classes.
+        values = super()._values()
+        if self._base is not None:
+            values += self._base._values()
+        return values
+
+    def _subscribed_to(self, handler: Callable) -> Optional[Event]:
+        # The handler may have been subscribed to a base class' event.
+        if self._key(handler) is not None:
+            return self
+        if self._base is not None:
+            return self._base._subscribed_to(handler)
+        return None
+
+    def _invalidate(self):
+        super()._invalidate()
+        for member in tuple(self._subclasses):
+            member._invalidate()
+        # The instances' events that didn't bother to call the class-level
+        # handlers need to be compiled again.  (An instance's event that adds
+        # itself to the old set after we swap it out checks our handlers again
+        # afterwards.)
+        dependents, self._dependents = self._dependents, weakref.WeakSet()
+        for e in tuple(dependents):
+            e._invalidate()
+
+    def _profiling(self):
+        # The class-level event is watched if a base class' event is.
+        if self._profiler is None and self._base is not None:
+            return self._base._profiling()
+        return self._profiler
+
+    def _invalidate_instances(self):
+        """
+        Discard the compiled dispatch functions of this event, the events on
+        subclasses, and all their instances' events.
+        """
+        self._invalidate()
+        for e in tuple(self._compiled):
+            e._invalidate()
+        for member in tuple(self._subclasses):
+            member._invalidate_instances()
+
+    def _create(self, instance) -> 'Event':
+        """
+        Create the event for an instance.
+
+        :param instance: the instance
+        :return: the new event
+        """
+        # Create a new event with a new function that passes this instance in
+        # as the first positional (i.e. the "self" parameter).
+        f = partial(self.function.__func__, instance)
+        # The event's options come from the class (and its bases), then from
+        # the event function itself.
+        e = _event_type(f)(
+            f=f,
+            sender=instance,
+            **{
+                **getattr(type(instance), '__evenz_options__', {}),
+                **getattr(self.function, '__evenz_options__', {})
+            }
+        )
+        e._parent = self
+        return e
+
+    def _owned(self, owner: type) -> '_EventMember':
+        """
+        Get the member for this event that belongs to a class.
+
+        :param owner: the class
+        :return: the member
+        """
+        if owner is self.owner:
+            return self
+        # The class inherited this member without getting its own (which can
+        # happen if the hook that installs them was bypassed).
+        _install_events(owner)
+        return owner.__dict__[self.name]
+
+    def __get__(self, instance, owner):
+        # If we're being accessed through the class, return the class-level
+        # event.
+        if instance is None:
+            return self._owned(owner)
+        e = self._owned(type(instance))._create(instance)
+        # Keep the event in the instance's __dict__.  (This is a non-data
+        # descriptor, so from now on the instance's attribute is found without
+        # coming back here.)  If another thread got here first, we use its
+        # event so that nobody's subscriptions are lost.
+        try:
+            return instance.__dict__.setdefault(self.name, e)
+        except AttributeError:
+            raise TypeError(
+                f'{type(instance).__name__} defines __slots__ and has no room '
+                f"for the '{self.name}' event.  Decorate it with @observable."
+            ) from None
+
+
+class _SlotEventMember(_EventMember):
+    """
+    This is the descriptor :py:func:`observable` installs for events on
+    classes whose instances keep their events in slots.
+    """
+    def __init__(
+            self,
+            name: str,
+            function: Callable,
+            owner: type,
+            base: _EventMember,
+            slot: Any
+    ):
+        """
+
+        :param name: the name of the event
+        :param function: the function decorated with :py:func:`event`
+        :param owner: the class to which this member belongs
+        :param base: the member for the same event on the nearest base class
+            (if there is one)
+        :param slot: the slot (member descriptor) in which instances keep the
+            event
+        """
+        super().__init__(name, function, owner, base)
+        self.slot = slot
+
+    def __get__(self, instance, owner):
+        # If we're being accessed through the class, return the class-level
+        # event.
+        if instance is None:
+            return self._owned(owner)
+        # The instance may already have its event.
+        try:
+            return self.slot.__get__(instance, owner)
+        except AttributeError:
+            e = self._owned(type(instance))._create(instance)
+        # If another thread filled the slot in the meantime, we use its event
+        # so that nobody's subscriptions are lost.
+        with self._lock:
+            try:
+                return self.slot.__get__(instance, owner)
+            except AttributeError:
+                self.slot.__set__(instance, e)
+                return e
+
+    def __set__(self, instance, value):
+        # This lets the += and -= operators work on the instance's event.
+        self.slot.__set__(instance, value)
+
+
+def _event_table(cls) -> Tuple[Tuple[str, Any], ...]:
+    """
+    Get the table of event members declared on a class (or any of its bases).
+
+    :param cls: the class
+    :return: a tuple of ``(name, member)`` pairs in which each member is either
+        a function decorated with :py:func:`event` or the descriptor that
+        :py:func:`observable` installed in its place
+
+    .. note::
+
+        The table is computed once per class and cached on the class itself.
+        It is computed again for subclasses and whenever the class' method
+        resolution order changes (for example, if ``__bases__`` is assigned).
+    """
+    # If we've already computed the table for this class (and the MRO hasn't
+    # changed since we did), we can just hand it back.  (We look in the
+    # class' own __dict__ so that subclasses don't pick up their parents'
+    # tables.)
+    cached = cls.__dict__.get('__evenz_events__')
+    if cached is not None and cached[0] is cls.__mro__:
+        return cached[1]
+    # Walk the MRO from the base classes down so that names defined on
+    # subclasses take precedence over (or hide) the same names on the bases.
+    # We only look at the class dictionaries so that we never evaluate
+    # properties or other descriptors along the way.
+    members: Dict[str, Any] = {}
+    for klass in reversed(cls.__mro__):
+        for name_, value in vars(klass).items():
+            if getattr(value, '__is_event__', False):
+                members[name_] = value
+            else:
+                members.pop(name_, None)
+    table = tuple(members.items())
+    # Cache the table (along with the MRO it was computed for) on the class.
+    setattr(cls, '__evenz_events__', (cls.__mro__, table))
+    return table
+
+
+def _slot_name(name: str) -> str:
+    """
+    Get the name of the slot in which an instance keeps an event.
+
+    :param name: the name of the event
+    :return: the name of the slot
+    """
+    return f'_evenz_{name}'
+
+
+def _base_member(cls, name: str) -> Optional[_EventMember]:
+    """
+    Find the member for an event on the nearest base class that has one.
+
+    :param cls: the class
+    :param name: the name of the event
+    :return: the member (or ``None`` if there isn't one)
+    """
+    for klass in cls.__mro__[1:]:
+        member = vars(klass).get(name)
+        if isinstance(member, _EventMember):
+            return member
+    return None
+
+
+def _install_events(cls):
+    """
+    Replace the :py:func:`event` functions a class declares (or inherits) with
+    descriptors that create each instance's events on demand and hold the
+    class' own class-level handlers.
+
+    :param cls: the class
+    """
+    installed = False
+    for name_, member in _event_table(cls):
+        # If the class already has its own descriptor, leave it alone.
+        if isinstance(member, _EventMember):
+            if member.owner is cls:
+                continue
+            member = member.function
+        # If the class has a slot for this event, the descriptor should use it.
+        slot = getattr(cls, _slot_name(name_), None)
+        base = _base_member(cls, name_)
+        setattr(
+            cls,
+            name_,
+            _EventMember(name_, member, cls, base)
+            if not inspect.ismemberdescriptor(slot)
+            else _SlotEventMember(name_, member, cls, base, slot)
+        )
+        installed = True
+    # If we changed the class, the cached table is out of date.
+    if installed:
+        delattr(cls, '__evenz_events__')
+        _event_table(cls)
+
+
+def _add_slots(cls, names: Iterable[str]):
+    """
+    Re-create a class that defines ``__slots__`` with some additional slots.
+
+    :param cls: the class
+    :param names: the names of the additional slots
+    :return: the new class
+    """
+    namespace = dict(cls.__dict__)
+    slots = namespace['__slots__']
+    slots = (slots,) if isinstance(slots, str) else tuple(slots)
+    # The new class will create its own member descriptors for the slots.
+    for name_ in slots + ('__dict__', '__weakref__', '__evenz_events__'):
+        namespace.pop(name_, None)
+    # The new class will get its own event descriptors, too.
+    for name_, value in list(namespace.items()):
+        if isinstance(value, _EventMember):
+            namespace[name_] = value.function
+    namespace['__slots__'] = slots + tuple(names)
+    new_cls = type(cls)(cls.__name__, cls.__bases__, namespace)
+    new_cls.__qualname__ = cls.__qualname__
+    # Methods that use the zero-argument form of super() close over the
+    # original class, so we point them at the new one.
+    for value in namespace.values():
+        if isinstance(value, (classmethod, staticmethod)):
+            value = value.__func__
+        elif isinstance(value, property):
+            value = value.fget
+        for cell in getattr(value, '__closure__', None) or ():
+            try:
+                if cell.cell_contents is cls:
+                    cell.cell_contents = new_cls
+            except ValueError:  # The cell is empty.
+                pass
+    return new_cls
+
+
+def _hook_subclasses(cls):
+    """
+    Make sure subclasses of an observable class get descriptors for any new
+    events they declare.
+
+    :param cls: the observable class
+    """
+    original = cls.__dict__.get('__init_subclass__')
+    # If the class inherits the hook from an observable base class, that's
+    # good enough.
+    if original is None and getattr(
+            cls.__init_subclass__, '__evenz_hook__', False):
+        return
+
+    def __init_subclass__(subcls, **kwargs):
+        if original is not None:
+            original.__get__(None, subcls)(**kwargs)
+        else:
+            super(cls, subcls).__init_subclass__(**kwargs)
+        _install_events(subcls)
+    __init_subclass__.__evenz_hook__ = True
+    cls.__init_subclass__ = classmethod(__init_subclass__)
+
+
+def _observe(cls, errors: Union[str, ErrorPolicy, None]) -> type:
+    """
+    Install the descriptors that create the events of an observable class'
+    instances (see :py:func:`evenz.events.observable`).
+
+    :param cls: the class (whose options have already been recorded)
+    :param errors: the error policy the class was given (if any)
+    :return: the class (or, if it needed more slots, its replacement)
+    """
+    # If instances of the class have no __dict__, they'll need slots in which
+    # to keep their events.
+    if '__slots__' in cls.__dict__ and not cls.__dictoffset__:
+        missing = [
+            _slot_name(name_) for name_, _ in _event_table(cls)
+            if not hasattr(cls, _slot_name(name_))
+        ]
+        if missing:
+            cls = _add_slots(cls, missing)
+    # Install the descriptors that create the events.
+    _install_events(cls)
+    # If the class is a subclass of an observable class, its class-level
+    # events were installed before we got here, so they need its error
+    # policy now.
+    if errors is not None:
+        for _, member in _event_table(cls):
+            if isinstance(member, _EventMember) and member.owner is cls:
+                member._errors = _error_policy({
+                    **cls.__evenz_options__,
+                    **getattr(member.function, '__evenz_options__', {})
+                }.get('errors'))
+                member._invalidate()
+    # Make sure subclasses get the same treatment.
+    _hook_subclasses(cls)
+    return cls
@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: evenz.payloads
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+This module helps you keep the cost of your events' arguments down when
+events fire at high rates.
+
+* :py:func:`record` creates compact (slotted) classes for event arguments.
+* A :py:class:`Pool` recycles records, so synchronous triggers don't allocate
+  a new one every time.
+* :py:class:`Columns` keeps a batch of numeric arguments in arrays (one for
+  each argument) that batch handlers can read without copying (see
+  :py:meth:`evenz.events.Event.batch`).
+"""
+
+from array import array
+from functools import lru_cache
+import keyword
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+try:
+    import numpy
+except ImportError:  # NumPy is optional.
+    numpy = None
+
+
+class Record(object):
+    """
+    This is the base class for the classes :py:func:`record` creates.
+    """
+    __slots__ = ()
+    _fields: Tuple[str, ...] = ()  #: the names of the record's fields
+
+    def _assign(self, *values):
+        """
+        Assign all the record's fields.
+
+        :param values: the values (in the order of the fields)
+        """
+        raise NotImplementedError
+
+    def __iter__(self) -> Iterator[Any]:
+        return (getattr(self, field) for field in self._fields)
+
+    def __eq__(self, other):
+        return type(other) is type(self) and tuple(self) == tuple(other)
+
+    __hash__ = None  # Records are mutable.
+
+    def __repr__(self):
+        values = ', '.join(
+            f'{field}={getattr(self, field)!r}' for field in self._fields
+        )
+        return f'{type(self).__name__}({values})'
+
+    def copy(self) -> 'Record':
+        """
+        Copy the record.  (A handler that needs to keep a pooled record after
+        it returns should keep a copy.)
+
+        :return: the copy
+        """
+        return type(self)(*self)
+
+
+def record(name: str, *fields: str) -> type:
+    """
+    Create a compact class for an event's arguments.  Its instances have a
+    slot for each field (and no ``__dict__``).
+
+    :param name: the name of the class
+    :param fields: the names of the fields
+    :return: the class
+
+    .. code-block:: python
+
+        Moved = record('Moved', 'x', 'y')
+        moved = Moved(1.0, 2.0)
+    """
+    for field in fields:
+        if not field.isidentifier() or keyword.iskeyword(field) \
+                or field.startswith('_'):
+            raise ValueError(f'{field!r} is not a valid field name.')
+    if len(set(fields)) != len(fields):
+        raise ValueError('The field names must be unique.')
+    # We generate the function that assigns the fields (like namedtuple
+    # does), so creating a record is as cheap as it can be.
+    parameters = ', '.join(fields)
+    body = ''.join(f'\n    self.{field} = {field}' for field in fields) \
+        or '\n    pass'
+    namespace: Dict[str, Any] = {}
+    exec(  # pylint: disable=exec-used
+        f'def _assign(self, {parameters}):{body}', namespace
+    )
+    assign = namespace['_assign']
+    return type(name, (Record,), {
+        '__slots__': fields,
+        '_fields': fields,
+        '_assign': assign,
+        '__init__': assign
+    })
+
+
+class Pool(object):
+    """
+    A pool recycles the records for an event's arguments.
+
+    .. code-block:: python
+
+        pool = Pool(Moved)
+        pool.fire(robot.moved, 1.0, 2.0)
+
+    .. warning::
+
+        A pooled record is only valid while the trigger that received it is
+        running, so use pools for events whose handlers are called
+        synchronously (and have handlers that need to keep the arguments keep
+        a :py:meth:`Record.copy`).
+    """
+    def __init__(self, cls: type, size: int = 16):
+        """
+
+        :param cls: the record class (see :py:func:`record`)
+        :param size: the most records the pool keeps for reuse
+        """
+        self._cls = cls
+        self._size = size
+        self._free: List[Record] = []
+
+    def acquire(self, *values) -> Record:
+        """
+        Get a record from the pool (or a new one if the pool is empty).
+
+        :param values: the values of the record's fields
+        :return: the record
+        """
+        free = self._free
+        if free:
+            r = free.pop()
+            r._assign(*values)  # pylint: disable=protected-access
+            return r
+        return self._cls(*values)
+
+    def release(self, r: Record):
+        """
+        Return a record to the pool.
+
+        :param r: the record
+        """
+        if len(self._free) < self._size:
+            self._free.append(r)
+
+    def fire(self, trigger: Callable, *values):
+        """
+        Call a trigger (like an event) with a pooled record, then return the
+        record to the pool.
+
+        :param trigger: the trigger
+        :param values: the values of the record's fields
+        :return: whatever the trigger returns
+        """
+        # This does what acquire() and release() do (without the calls).
+        free = self._free
+        if free:
+            r = free.pop()
+            r._assign(*values)  # pylint: disable=protected-access
+        else:
+            r = self._cls(*values)
+        try:
+            return trigger(r)
+        finally:
+            if len(free) < self._size:
+                free.append(r)
+
+
+@lru_cache(maxsize=None)
+def _appender(count: int) -> Callable:
+    """
+    Generate the function that creates the function that appends a row to a
+    set of columns.  (Appending a row is then just a few calls, and unpacking
+    the row checks its length.)
+
+    :param count: the number of columns
+    :return: a function that takes each column's ``append`` method and
+        returns the function that appends a row
+    """
+    appends = ', '.join(f'a{i}' for i in range(count))
+    values = ''.join(f'v{i}, ' for i in range(count))
+    calls = ''.join(f'\n        a{i}(v{i})' for i in range(count))
+    namespace: Dict[str, Any] = {}
+    exec(  # pylint: disable=exec-used
+        f'def make({appends}):'
+        f'\n    def append(row):'
+        f'\n        {values}= row{calls}'
+        f'\n    return append',
+        namespace
+    )
+    return namespace['make']
+
+
+class Columns(object):
+    """
+    This is a batch of triggers whose (numeric) arguments are kept in arrays,
+    one for each argument.  It behaves like a :py:class:`evenz.events.Batch`
+    (it's a collection of rows), but it can also give you each column as a
+    :py:class:`memoryview` (or a NumPy array) without copying it.
+    """
+    def __init__(self, fields: Dict[str, str]):
+        """
+
+        :param fields: the names of the arguments mapped to their
+            :py:mod:`array` type codes (for example, ``{'x': 'd', 'y': 'd'}``)
+        """
+        if not fields:
+            raise ValueError('The batch needs at least one column.')
+        self.fields: Tuple[str, ...] = tuple(fields)
+        self._arrays: Tuple[array, ...] = tuple(
+            array(typecode) for typecode in fields.values()
+        )
+        #: Add a trigger's arguments (a tuple) to the batch.
+        self.append: Callable[[Tuple[Any, ...]], None] = _appender(
+            len(self._arrays)
+        )(*(a.append for a in self._arrays))
+
+    def extend(self, rows: Iterable[Tuple[Any, ...]]):
+        """
+        Add many triggers' arguments.
+
+        :param rows: the arguments for each trigger
+        """
+        for row in rows:
+            self.append(row)
+
+    def __len__(self):
+        return len(self._arrays[0])
+
+    def __iter__(self) -> Iterator[Tuple[Any, ...]]:
+        return zip(*self._arrays)
+
+    def column(self, name: str) -> memoryview:
+        """
+        Get a column.
+
+        :param name: the name of the argument
+        :return: a view of the column's memory
+        """
+        return memoryview(self._arrays[self.fields.index(name)])
+
+    def columns(self) -> Tuple[memoryview, ...]:
+        """
+        Get all the columns.
+
+        :return: a view of each column's memory
+        """
+        return tuple(memoryview(a) for a in self._arrays)
+
+    def numpy(self, name: str):
+        """
+        Get a column as a NumPy array (that shares the column's memory).
+
+        :param name: the name of the argument
+        :return: the NumPy array
+        :raises RuntimeError: if NumPy isn't installed
+        """
+        if numpy is None:
+            raise RuntimeError('NumPy is not installed.')
+        a = self._arrays[self.fields.index(name)]
+        return numpy.frombuffer(a, dtype=a.typecode)
@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: evenz.policies
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Delivery policies control *when* an event's triggers reach its handlers.
+They're useful for high-frequency events (like position or progress updates)
+whose handlers only care about the latest value.
+
+.. code-block:: python
+
+    @observable
+    class Download(object):
+
+        @event(policy=Throttle(0.25))
+        def progressed(self, percent: float):
+            \"\"\"
+            This event is raised (at most four times a second) as the download
+            progresses.
+            \"\"\"
+
+Each policy can use a thread-based timer (the default) or the running
+:py:mod:`asyncio` event loop to schedule deliveries.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+THREAD = 'thread'  #: schedule deliveries with :py:class:`threading.Timer`
+ASYNCIO = 'asyncio'  #: schedule deliveries on the running event loop
+
+
+class _ThreadTimers(object):
+    """
+    This backend schedules deliveries with :py:class:`threading.Timer`.
+    (Delivery happens on the timer's thread.)
+    """
+    @staticmethod
+    def schedule(delay: float, fn: Callable) -> threading.Timer:
+        """
+        Call a function after a delay.
+
+        :param delay: the delay (in seconds)
+        :param fn: the function
+        :return: the timer
+        """
+        timer = threading.Timer(delay, fn)
+        timer.daemon = True
+        timer.start()
+        return timer
+
+    @staticmethod
+    def cancel(handle: threading.Timer):
+        """
+        Cancel a scheduled call.
+
+        :param handle: the timer
+        """
+        handle.cancel()
+
+
+class _LoopTimers(object):
+    """
+    This backend schedules deliveries on the running :py:mod:`asyncio` event
+    loop.  (The event must be triggered from within the loop.)
+    """
+    @staticmethod
+    def schedule(delay: float, fn: Callable) -> asyncio.TimerHandle:
+        """
+        Call a function after a delay.
+
+        :param delay: the delay (in seconds)
+        :param fn: the function
+        :return: the loop's handle for the call
+        """
+        return asyncio.get_running_loop().call_later(delay, fn)
+
+    @staticmethod
+    def cancel(handle: asyncio.TimerHandle):
+        """
+        Cancel a scheduled call.
+
+        :param handle: the loop's handle for the call
+        """
+        handle.cancel()
+
+
+_BACKENDS = {
+    THREAD: _ThreadTimers,
+    ASYNCIO: _LoopTimers
+}  #: the scheduling backends
+
+
+class Gate(object):
+    """
+    A gate sits between an event's trigger and its handlers and decides when
+    (and with which arguments) the handlers are called.  Each event gets its
+    own gate from its :py:class:`Policy`.
+    """
+    def __init__(self, policy: 'Policy', current: Callable[[], Callable]):
+        """
+
+        :param policy: the policy
+        :param current: a function that returns the event's current (ungated)
+            dispatch function
+        """
+        self._policy = policy
+        self._current = current
+        self._timers = _BACKENDS[policy.backend]
+        self._lock = threading.Lock()
+        self._pending: Optional[Tuple[Tuple[Any, ...], Dict[str, Any]]] = None
+        self._handle: Any = None
+        self._last = float('-inf')
+
+    def submit(self, *args, **kwargs):
+        """
+        The event calls this (instead of its handlers) when it's triggered.
+        """
+        raise NotImplementedError
+
+    def _fire(self):
+        """
+        Deliver the pending arguments (if there are any).
+        """
+        with self._lock:
+            pending, self._pending = self._pending, None
+            self._handle = None
+            if pending is None:
+                return
+            self._last = time.monotonic()
+        args, kwargs = pending
+        self._current()(*args, **kwargs)
+
+    def flush(self):
+        """
+        Deliver the pending arguments now (instead of waiting).
+        """
+        with self._lock:
+            if self._handle is not None:
+                self._timers.cancel(self._handle)
+        self._fire()
+
+
+class _CoalesceGate(Gate):
+    def submit(self, *args, **kwargs):
+        with self._lock:
+            self._pending = (args, kwargs)
+            # If a delivery is already scheduled, it'll pick up these
+            # arguments.
+            if self._handle is None:
+                self._handle = self._timers.schedule(
+                    self._policy.delay, self._fire
+                )
+
+
+class _DebounceGate(Gate):
+    def submit(self, *args, **kwargs):
+        with self._lock:
+            self._pending = (args, kwargs)
+            # Start waiting for quiet all over again.
+            if self._handle is not None:
+                self._timers.cancel(self._handle)
+            self._handle = self._timers.schedule(
+                self._policy.delay, self._fire
+            )
+
+
+class _ThrottleGate(Gate):
+    def submit(self, *args, **kwargs):
+        with self._lock:
+            now = time.monotonic()
+            wait = self._last + self._policy.delay - now
+            # If we haven't delivered anything for long enough (and nothing
+            # is waiting), we can deliver right away.
+            if wait <= 0 and self._handle is None:
+                self._last = now
+                deliver = True
+            else:
+                # Otherwise the latest arguments are delivered at the end of
+                # the interval.
+                self._pending = (args, kwargs)
+                if self._handle is None:
+                    self._handle = self._timers.schedule(
+                        max(wait, 0), self._fire
+                    )
+                deliver = False
+        if deliver:
+            self._current()(*args, **kwargs)
+
+
+class Policy(object):
+    """
+    This is the base class for delivery policies.
+    """
+    _gate_type = Gate
+
+    def __init__(self, delay: float, backend: str = THREAD):
+        """
+
+        :param delay: the policy's delay (in seconds)
+        :param backend: how deliveries are scheduled (:py:data:`THREAD` or
+            :py:data:`ASYNCIO`)
+        """
+        if backend not in _BACKENDS:
+            raise ValueError(f'{backend!r} is not a scheduling backend.')
+        self.delay = delay  #: the policy's delay (in seconds)
+        self.backend = backend  #: how deliveries are scheduled
+
+    def gate(self, current: Callable[[], Callable]) -> Gate:
+        """
+        Create a gate for an event.
+
+        :param current: a function that returns the event's current (ungated)
+            dispatch function
+        :return: the gate
+        """
+        return self._gate_type(self, current)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.delay!r}, {self.backend!r})'
+
+
+class Coalesce(Policy):
+    """
+    Deliver only the latest arguments since the last delivery.  Deliveries
+    are scheduled (after ``delay`` seconds) when the first trigger arrives.
+    """
+    _gate_type = _CoalesceGate
+
+    def __init__(self, delay: float = 0, backend: str = THREAD):
+        super().__init__(delay, backend)
+
+
+class Debounce(Policy):
+    """
+    Deliver the latest arguments once the event has been quiet for ``delay``
+    seconds.
+    """
+    _gate_type = _DebounceGate
+
+
+class Throttle(Policy):
+    """
+    Deliver at most once every ``delay`` seconds.  A trigger that arrives too
+    soon is held (replacing any other held trigger) until the end of the
+    interval.
+    """
+    _gate_type = _ThrottleGate
@@ -0,0 +1,442 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: evenz.profiling
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+A profiler counts the triggers of the events it's watching and times their
+handlers, so you can find the handlers that are slowing your events down.
+
+.. code-block:: python
+
+    with Profiler(Dog, budget=0.001) as profiler:
+        run_the_kennel()
+    for stats in profiler.slowest(percentile=99):
+        print(stats.event, stats.handler, stats.percentile(99))
+
+.. note::
+
+    Watching an event swaps in a dispatch function that times the handlers,
+    so events that aren't being watched don't pay anything at all.
+"""
+
+import inspect
+import threading
+import time
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Tuple
+
+from .batches import _BatchHandler
+from .dispatch import _WeakHandler, _ref, _unwrap
+from .events import Event
+from .filters import _Filter
+from .observables import _EventMember, _event_table
+
+BUCKETS = 64  #: the number of buckets in a latency histogram
+
+
+class HandlerStats(NamedTuple):
+    """
+    These are the statistics for a handler (as of a
+    :py:meth:`Profiler.snapshot`).
+    """
+    event: str  #: the name of the event
+    handler: str  #: the name of the handler
+    calls: int  #: the number of calls
+    total: float  #: the total time spent in the handler (in seconds)
+    max: float  #: the longest call (in seconds)
+    slow: int  #: the number of calls that were over the budget
+    #: the number of calls in each bucket (calls in bucket *n* took less than
+    #: 2\ :sup:`n` nanoseconds)
+    histogram: Tuple[int, ...]
+
+    @property
+    def mean(self) -> float:
+        """
+        Get the average time of a call (in seconds).
+        """
+        return self.total / self.calls if self.calls else 0.0
+
+    def percentile(self, p: float) -> float:
+        """
+        Estimate a percentile of the handler's latency from the histogram.
+
+        :param p: the percentile (for example, 99)
+        :return: the upper bound of the bucket in which the percentile falls
+            (in seconds)
+        """
+        if not self.calls:
+            return 0.0
+        rank = self.calls * p / 100.0
+        seen = 0
+        for bucket, count in enumerate(self.histogram):
+            seen += count
+            if count and seen >= rank:
+                return min((1 << bucket) / 1e9, self.max)
+        return self.max
+
+
+class EventStats(NamedTuple):
+    """
+    These are the statistics for an event (as of a
+    :py:meth:`Profiler.snapshot`).
+    """
+    event: str  #: the name of the event
+    fires: int  #: the number of times the event was triggered
+    handlers: Tuple[HandlerStats, ...]  #: the statistics for the handlers
+
+
+class _Timer(object):
+    """
+    This accumulates the timings for a handler.
+    """
+    __slots__ = ('event', 'handler', 'calls', 'total', 'max', 'slow',
+                 'histogram')
+
+    def __init__(self, event_: str, handler: str):
+        self.event = event_
+        self.handler = handler
+        self.calls = 0
+        self.total = 0
+        self.max = 0
+        self.slow = 0
+        self.histogram = [0] * BUCKETS
+
+    def stats(self) -> HandlerStats:
+        """
+        Take a snapshot of the timings.
+
+        :return: the snapshot
+        """
+        return HandlerStats(
+            event=self.event,
+            handler=self.handler,
+            calls=self.calls,
+            total=self.total / 1e9,
+            max=self.max / 1e9,
+            slow=self.slow,
+            histogram=tuple(self.histogram)
+        )
+
+
+class _Counter(object):
+    """
+    This accumulates the statistics for an event.
+    """
+    __slots__ = ('fires', 'timers')
+
+    def __init__(self):
+        self.fires = 0
+        #: the handlers' timers (by the handlers' identities)
+        self.timers: Dict[Any, _Timer] = {}
+
+
+def _describe(e: Event) -> str:
+    """
+    Get the name under which an event's statistics are kept.  (The events of
+    all the instances of a class share the same name.)
+
+    :param e: the event
+    :return: the name
+    """
+    if isinstance(e, _EventMember):
+        return f'{e.owner.__qualname__}.{e.name}'
+    # pylint: disable=protected-access
+    if e._parent is not None:
+        return _describe(e._parent)
+    f = e._f
+    return getattr(f, '__qualname__', None) or repr(f)
+
+
+def _identity(value: Callable) -> Any:
+    """
+    Get the key under which a handler's timer is kept.  (Handlers that have
+    the same name, like closures from the same function or the bound methods
+    of different instances, have their own timers.)
+
+    :param value: the handler (as the event stores it)
+    :return: the key
+    """
+    if isinstance(value, (_BatchHandler, _Filter)):
+        value = value.handler
+    # The key doesn't keep the handler alive (if it can help it).
+    if isinstance(value, _WeakHandler):
+        return value.ref
+    try:
+        return _ref(value)
+    except TypeError:  # The handler can't be weakly referenced.
+        return value
+
+
+def _name(handler: Callable) -> str:
+    """
+    Get the name under which a handler's statistics are reported.
+
+    :param handler: the handler
+    :return: the name
+    """
+    while isinstance(handler, partial):
+        handler = handler.func
+    return getattr(handler, '__qualname__', None) or repr(handler)
+
+
+class Profiler(object):
+    """
+    A profiler watches events and keeps statistics about them.
+    """
+    def __init__(
+            self,
+            *targets: Any,
+            budget: float = None,
+            on_slow: Callable[[str, str, float], Any] = None
+    ):
+        """
+
+        :param targets: the events to watch when the profiler is used as a
+            context manager (see :py:meth:`watch`)
+        :param budget: the longest a handler should take (in seconds); calls
+            that take longer are counted as slow
+        :param on_slow: a function to call whenever a handler is slow (it
+            receives the names of the event and the handler, and the time the
+            call took in seconds)
+        """
+        self._targets = targets
+        self._budget = None if budget is None else int(budget * 1e9)
+        self._on_slow = on_slow
+        self._counters: Dict[str, _Counter] = {}
+        self._watched: List[Event] = []
+        self._lock = threading.Lock()
+
+    def _counter(self, name: str) -> _Counter:
+        """
+        Get the statistics for an event.
+
+        :param name: the name of the event
+        :return: the statistics
+        """
+        with self._lock:
+            return self._counters.setdefault(name, _Counter())
+
+    def watch(self, target: Any):
+        """
+        Start watching events.
+
+        :param target: an :py:class:`evenz.events.Event`, a function decorated
+            with :py:func:`evenz.events.event`, or a class decorated with
+            :py:func:`evenz.events.observable` (in which case all the events
+            of all its instances are watched)
+        :return: the profiler
+        """
+        for e in self._events(target):
+            # pylint: disable=protected-access
+            e._profiler = self
+            self._watched.append(e)
+            self._refresh(e)
+        return self
+
+    def unwatch(self, target: Any = None):
+        """
+        Stop watching events.  (The statistics are kept.)
+
+        :param target: the events (see :py:meth:`watch`), or ``None`` to stop
+            watching everything
+        :return: the profiler
+        """
+        events = self._watched if target is None else self._events(target)
+        for e in list(events):
+            # pylint: disable=protected-access
+            if e._profiler is self:
+                e._profiler = None
+                self._refresh(e)
+        self._watched = [
+            e for e in self._watched
+            if e._profiler is self  # pylint: disable=protected-access
+        ]
+        return self
+
+    @staticmethod
+    def _events(target: Any) -> Iterable[Event]:
+        """
+        Get the events a target refers to.
+
+        :param target: the target (see :py:meth:`watch`)
+        :return: the events
+        """
+        if isinstance(target, Event):
+            return [target]
+        if isinstance(getattr(target, 'event', None), Event):
+            return [target.event]
+        if inspect.isclass(target):
+            return [
+                getattr(target, name_) for name_, _ in _event_table(target)
+            ]
+        raise TypeError(f'{target!r} is not an event or an observable class.')
+
+    @staticmethod
+    def _refresh(e: Event):
+        """
+        Make an event compile its dispatch function again.
+
+        :param e: the event
+        """
+        # pylint: disable=protected-access
+        if isinstance(e, _EventMember):
+            e._invalidate_instances()
+        else:
+            e._invalidate()
+
+    def instrument(
+            self,
+            e: Event,
+            values: Iterable[Callable]
+    ) -> Tuple[Callable, ...]:
+        """
+        An event calls this when it compiles its handlers (as it stores them)
+        to have them timed.
+
+        :param e: the event
+        :param values: the handlers
+        :return: the timed handlers
+        """
+        counter = self._counter(_describe(e))
+        timed = []
+        for value in values:
+            key = _identity(value)
+            timer = counter.timers.get(key)
+            if timer is None:
+                timer = counter.timers.setdefault(
+                    key, _Timer(_describe(e), _name(_unwrap(value)))
+                )
+            timed.append(self._time(value, timer))
+        return tuple(timed)
+
+    def _time(self, value: Callable, timer: _Timer) -> Callable:
+        """
+        Wrap a handler (as an event stores it) so that it's timed.
+
+        :param value: the handler
+        :param timer: the timer
+        :return: the timed handler
+        """
+        # Batch handlers and filtered handlers are re-wrapped around the timed
+        # handler (so the event still recognizes them).
+        if isinstance(value, _BatchHandler):
+            return _BatchHandler(self._time(value.handler, timer))
+        if isinstance(value, _Filter):
+            return _Filter(
+                self._time(value.handler, timer), value.where, value.at
+            )
+        handler = value
+        if isinstance(handler, _WeakHandler):
+            handler = handler.ref()
+            if handler is None:
+                return value
+        budget = self._budget
+        on_slow = self._on_slow
+        clock = time.perf_counter_ns
+
+        def record(elapsed: int):
+            timer.calls += 1
+            timer.total += elapsed
+            if elapsed > timer.max:
+                timer.max = elapsed
+            timer.histogram[min(elapsed.bit_length(), BUCKETS - 1)] += 1
+            if budget is not None and elapsed > budget:
+                timer.slow += 1
+                if on_slow is not None:
+                    on_slow(timer.event, timer.handler, elapsed / 1e9)
+
+        if inspect.iscoroutinefunction(handler):
+            async def timed(*args, **kwargs):
+                start = clock()
+                try:
+                    return await value(*args, **kwargs)
+                finally:
+                    record(clock() - start)
+        else:
+            def timed(*args, **kwargs):
+                start = clock()
+                try:
+                    return value(*args, **kwargs)
+                finally:
+                    record(clock() - start)
+        return timed
+
+    def counted(self, e: Event, dispatch: Callable) -> Callable:
+        """
+        An event calls this when it compiles its dispatch function to have its
+        triggers counted.
+
+        :param e: the event
+        :param dispatch: the dispatch function
+        :return: the dispatch function that counts triggers
+        """
+        # The class-level events are triggered by the instances' events (which
+        # are already counted).
+        if isinstance(e, _EventMember):
+            return dispatch
+        counter = self._counter(_describe(e))
+
+        def counting(*args, **kwargs):
+            counter.fires += 1
+            return dispatch(*args, **kwargs)
+        return counting
+
+    def snapshot(self) -> Dict[str, EventStats]:
+        """
+        Get the statistics collected so far.
+
+        :return: the statistics for each event (by name)
+        """
+        with self._lock:
+            counters = list(self._counters.items())
+        return {
+            name_: EventStats(
+                event=name_,
+                fires=counter.fires,
+                handlers=tuple(
+                    t.stats() for t in list(counter.timers.values())
+                )
+            ) for name_, counter in counters
+        }
+
+    def slowest(
+            self,
+            n: int = 10,
+            percentile: float = 99
+    ) -> List[HandlerStats]:
+        """
+        Get the slowest handlers.
+
+        :param n: the number of handlers
+        :param percentile: the percentile by which the handlers are ranked
+        :return: the handlers' statistics (slowest first)
+        """
+        handlers = [
+            h for stats in self.snapshot().values() for h in stats.handlers
+        ]
+        handlers.sort(key=lambda h: h.percentile(percentile), reverse=True)
+        return handlers[:n]
+
+    def reset(self):
+        """
+        Discard the statistics collected so far.
+        """
+        with self._lock:
+            for counter in self._counters.values():
+                counter.fires = 0
+                for key, timer in list(counter.timers.items()):
+                    counter.timers[key] = _Timer(timer.event, timer.handler)
+        # The handlers hang on to their timers, so they have to be timed
+        # again.
+        for e in self._watched:
+            self._refresh(e)
+
+    def __enter__(self):
+        for target in self._targets:
+            self.watch(target)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.unwatch()
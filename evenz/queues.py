@@ -0,0 +1,437 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: evenz.queues
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+A queued subscription puts a bounded queue between an event and a slow
+handler: triggering the event only puts the trigger in the queue, and a
+consumer (a thread, or a task on an event loop) calls the handler.
+
+.. code-block:: python
+
+    queue = dog.barked.queued(on_bark, capacity=1024, overflow=DROP_OLDEST)
+    queue.start()  # Call the handler on a thread...
+    ...
+    queue.close()
+
+    # ...or on an event loop.
+    asyncio.create_task(queue.consume())
+
+When the queue is full, its overflow policy decides what happens to the next
+trigger:
+
+* :py:data:`BLOCK` waits until the consumer makes room,
+* :py:data:`DROP_OLDEST` discards the oldest trigger in the queue,
+* :py:data:`DROP_NEWEST` discards the new trigger, and
+* :py:data:`COALESCE` replaces a waiting trigger with the new one (the one
+  with the same key if there is one, otherwise the newest).
+
+.. note::
+
+    The queue's slots are allocated when it's created, so its memory stays
+    flat no matter how bursty the triggers are.  Don't use :py:data:`BLOCK`
+    for a queue that's consumed on the same event loop that triggers the
+    event (the trigger would wait for a consumer that can't run).
+"""
+
+import asyncio
+import threading
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+BLOCK = 'block'  #: wait until there's room in the queue
+DROP_OLDEST = 'drop-oldest'  #: discard the oldest trigger in the queue
+DROP_NEWEST = 'drop-newest'  #: discard the new trigger
+COALESCE = 'coalesce'  #: replace a waiting trigger with the new one
+
+_OVERFLOWS = (BLOCK, DROP_OLDEST, DROP_NEWEST, COALESCE)
+_TAKE = 64  #: the most triggers a consumer takes out of a queue at once
+
+
+class QueueStats(NamedTuple):
+    """
+    These are the statistics for a queue (as of a :py:meth:`Queue.stats`).
+    """
+    depth: int  #: the number of triggers waiting in the queue
+    capacity: int  #: the most triggers the queue holds
+    high_water: int  #: the deepest the queue has been
+    enqueued: int  #: the number of triggers put in the queue
+    delivered: int  #: the number of triggers taken out for the handler
+    dropped: int  #: the number of triggers discarded
+    coalesced: int  #: the number of triggers replaced by later ones
+    errors: int  #: the number of exceptions the handler raised
+
+
+class Queue(object):
+    """
+    A queue holds an event's triggers until a consumer passes them to a
+    handler.  (Calling the queue puts a trigger in it, so the queue itself is
+    what's subscribed to the event.)
+    """
+    def __init__(
+            self,
+            handler: Callable,
+            capacity: int = 1024,
+            overflow: str = BLOCK,
+            key: Callable[..., Any] = None,
+            on_error: Callable[[BaseException], Any] = None
+    ):
+        """
+
+        :param handler: the handler
+        :param capacity: the most triggers the queue holds
+        :param overflow: what to do with a trigger when the queue is full
+            (:py:data:`BLOCK`, :py:data:`DROP_OLDEST`, :py:data:`DROP_NEWEST`
+            or :py:data:`COALESCE`)
+        :param key: for :py:data:`COALESCE`, a function that receives a
+            trigger's arguments and returns a key; a trigger replaces the
+            waiting trigger with the same key (even if the queue isn't full)
+        :param on_error: a function to call with the exceptions the handler
+            raises (otherwise they're only counted)
+        """
+        if capacity < 1:
+            raise ValueError('The capacity must be at least 1.')
+        if overflow not in _OVERFLOWS:
+            raise ValueError(f'{overflow!r} is not an overflow policy.')
+        if key is not None and overflow != COALESCE:
+            raise ValueError('Only coalescing queues have keys.')
+        self.handler = handler  #: the handler
+        self.capacity = capacity  #: the most triggers the queue holds
+        self.overflow = overflow  #: the overflow policy
+        self._key = key
+        self._on_error = on_error
+        # The triggers' arguments go in preallocated slots: `_head` is the
+        # position (not the index) of the oldest trigger and `_tail` the
+        # position after the newest.
+        self._args: list = [None] * capacity
+        self._kwargs: list = [None] * capacity
+        # (For coalescing by key, we also keep each slot's key.)
+        self._slot_keys: Optional[list] = (
+            [None] * capacity if key is not None else None
+        )
+        self._keys: Dict[Any, int] = {}  # waiting keys -> their positions
+        self._head = 0
+        self._tail = 0
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._waiter: Optional[Tuple[asyncio.AbstractEventLoop,
+                                     asyncio.Event]] = None
+        self._closed = False
+        self._getting = 0  # the number of threads waiting for triggers
+        self._putting = 0  # the number of triggers waiting for room
+        self._thread: Optional[threading.Thread] = None
+        self._detach: Optional[Callable[[], Any]] = None
+        self._high_water = 0
+        self._enqueued = 0
+        self._delivered = 0
+        self._dropped = 0
+        self._coalesced = 0
+        self._errors = 0
+
+    @property
+    def depth(self) -> int:
+        """
+        Get the number of triggers waiting in the queue.
+        """
+        return self._tail - self._head
+
+    def stats(self) -> QueueStats:
+        """
+        Get the queue's statistics.
+
+        :return: the statistics
+        """
+        with self._lock:
+            return QueueStats(
+                depth=self._tail - self._head,
+                capacity=self.capacity,
+                high_water=self._high_water,
+                enqueued=self._enqueued,
+                delivered=self._delivered,
+                dropped=self._dropped,
+                coalesced=self._coalesced,
+                errors=self._errors
+            )
+
+    def __call__(self, *args, **kwargs):
+        # The event calls this: put the trigger in the queue.
+        with self._lock:
+            if self._closed:
+                return
+            capacity = self.capacity
+            keys = self._keys
+            k = None
+            if self._key is not None:
+                k = self._key(*args, **kwargs)
+                pos = keys.get(k)
+                if pos is not None:
+                    # A trigger with the same key is waiting, so the new one
+                    # takes its place.
+                    self._args[pos % capacity] = args
+                    self._kwargs[pos % capacity] = kwargs or None
+                    self._enqueued += 1
+                    self._coalesced += 1
+                    return
+            if self._tail - self._head >= capacity:
+                overflow = self.overflow
+                if overflow == BLOCK:
+                    self._putting += 1
+                    try:
+                        while self._tail - self._head >= capacity \
+                                and not self._closed:
+                            self._not_full.wait()
+                    finally:
+                        self._putting -= 1
+                    if self._closed:
+                        return
+                elif overflow == DROP_NEWEST:
+                    self._enqueued += 1
+                    self._dropped += 1
+                    return
+                elif overflow == DROP_OLDEST:
+                    # The new trigger takes the oldest one's slot.
+                    self._head += 1
+                    self._dropped += 1
+                else:
+                    # Coalesce: the new trigger replaces the newest one.
+                    pos = self._tail - 1
+                    i = pos % capacity
+                    self._args[i] = args
+                    self._kwargs[i] = kwargs or None
+                    if k is not None:
+                        del keys[self._slot_keys[i]]
+                        self._slot_keys[i] = k
+                        keys[k] = pos
+                    self._enqueued += 1
+                    self._coalesced += 1
+                    return
+            pos = self._tail
+            i = pos % capacity
+            self._args[i] = args
+            self._kwargs[i] = kwargs or None
+            if k is not None:
+                self._slot_keys[i] = k
+                keys[k] = pos
+            self._tail = pos + 1
+            self._enqueued += 1
+            depth = self._tail - self._head
+            if depth > self._high_water:
+                self._high_water = depth
+            if self._getting:
+                self._not_empty.notify()
+            waiter = self._waiter
+            if waiter is not None:
+                # Wake the task that's consuming the queue.
+                self._waiter = None
+                waiter[0].call_soon_threadsafe(waiter[1].set)
+
+    def _pop(self) -> Tuple[Tuple[Any, ...], Optional[Dict[str, Any]]]:
+        """
+        Take the oldest trigger out of the queue.  (The caller holds the lock
+        and knows the queue isn't empty.)
+
+        :return: the trigger's positional and keyword arguments
+        """
+        pos = self._head
+        i = pos % self.capacity
+        args, kwargs = self._args[i], self._kwargs[i]
+        # Let go of the arguments (so the slot doesn't keep them alive).
+        self._args[i] = self._kwargs[i] = None
+        if self._slot_keys is not None:
+            del self._keys[self._slot_keys[i]]
+            self._slot_keys[i] = None
+        self._head = pos + 1
+        return args, kwargs
+
+    def _take(
+            self,
+            limit: int,
+            timeout: Optional[float] = 0.0
+    ) -> List[Tuple[Tuple[Any, ...], Optional[Dict[str, Any]]]]:
+        """
+        Take the oldest triggers out of the queue.
+
+        :param limit: the most triggers to take
+        :param timeout: the longest to wait (in seconds) if the queue is
+            empty, or ``None`` to wait until a trigger arrives or the queue is
+            closed
+        :return: the triggers' positional and keyword arguments
+        """
+        with self._lock:
+            if self._tail == self._head and not self._closed \
+                    and timeout != 0:
+                self._getting += 1
+                try:
+                    self._not_empty.wait_for(
+                        lambda: self._tail != self._head or self._closed,
+                        timeout
+                    )
+                finally:
+                    self._getting -= 1
+            count = min(limit, self._tail - self._head)
+            items = [self._pop() for _ in range(count)]
+            self._delivered += count
+            # Only wake the triggers that are waiting for room (if any are).
+            if count and self._putting:
+                self._not_full.notify(count)
+            return items
+
+    def get(
+            self,
+            timeout: float = None
+    ) -> Optional[Tuple[Tuple[Any, ...], Optional[Dict[str, Any]]]]:
+        """
+        Take the oldest trigger out of the queue (waiting for one if the
+        queue is empty).
+
+        :param timeout: the longest to wait (in seconds), or ``None`` to wait
+            until a trigger arrives or the queue is closed
+        :return: the trigger's positional and keyword arguments, or ``None``
+            if there wasn't one
+        """
+        items = self._take(1, timeout)
+        return items[0] if items else None
+
+    def drain(self, limit: int = None) -> int:
+        """
+        Pass the triggers waiting in the queue to the handler.
+
+        :param limit: the most triggers to pass
+        :return: the number of triggers passed
+        """
+        handler = self.handler
+        count = 0
+        while limit is None or count < limit:
+            items = self._take(
+                _TAKE if limit is None else min(_TAKE, limit - count)
+            )
+            if not items:
+                break
+            for args, kwargs in items:
+                self._deliver(handler, args, kwargs)
+            count += len(items)
+        return count
+
+    def _deliver(
+            self,
+            handler: Callable,
+            args: Tuple[Any, ...],
+            kwargs: Optional[Dict[str, Any]]
+    ):
+        """
+        Pass a trigger to the handler.
+
+        :param handler: the handler
+        :param args: the positional arguments
+        :param kwargs: the keyword arguments
+        """
+        try:
+            if kwargs:
+                handler(*args, **kwargs)
+            else:
+                handler(*args)
+        except Exception as ex:  # pylint: disable=broad-except
+            self._errors += 1
+            if self._on_error is not None:
+                self._on_error(ex)
+
+    def start(self) -> 'Queue':
+        """
+        Start a thread that passes the triggers to the handler.
+
+        :return: the queue
+        """
+        if self._thread is not None:
+            raise RuntimeError('The queue already has a consumer thread.')
+        self._thread = threading.Thread(
+            target=self._consume, name=f'evenz-queue-{id(self):x}',
+            daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def _consume(self):
+        """
+        Pass the triggers to the handler until the queue is closed.  (This is
+        what the consumer thread runs.)
+        """
+        handler = self.handler
+        deliver = self._deliver
+        while True:
+            # Take the triggers a few at a time (so the consumer and the
+            # triggers contend for the lock less often).
+            items = self._take(_TAKE, None)
+            if not items:
+                return
+            for args, kwargs in items:
+                deliver(handler, args, kwargs)
+
+    async def consume(self):
+        """
+        Pass the triggers to the handler (on the running event loop) until
+        the queue is closed.  If the handler is ``async``, each call is
+        awaited before the next trigger is passed.
+        """
+        loop = asyncio.get_running_loop()
+        handler = self.handler
+        while True:
+            with self._lock:
+                if self._tail == self._head:
+                    if self._closed:
+                        return
+                    # Ask the next trigger to wake us up.
+                    waiter = asyncio.Event()
+                    self._waiter = (loop, waiter)
+                    item = None
+                else:
+                    item = self._pop()
+                    self._delivered += 1
+                    if self._putting:
+                        self._not_full.notify()
+            if item is None:
+                await waiter.wait()
+                continue
+            args, kwargs = item
+            try:
+                result = handler(*args, **(kwargs or {}))
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as ex:  # pylint: disable=broad-except
+                self._errors += 1
+                if self._on_error is not None:
+                    self._on_error(ex)
+
+    def close(self, drain: bool = True):
+        """
+        Stop putting triggers in the queue (and unsubscribe it from the
+        event), then stop the consumers.
+
+        :param drain: ``True`` to let the consumers pass the triggers that are
+            already waiting before they stop; ``False`` to discard them
+        """
+        if self._detach is not None:
+            self._detach()
+            self._detach = None
+        with self._lock:
+            if not drain:
+                while self._tail != self._head:
+                    self._pop()
+                    self._dropped += 1
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+            waiter, self._waiter = self._waiter, None
+        if waiter is not None:
+            waiter[0].call_soon_threadsafe(waiter[1].set)
+        if self._thread is not None \
+                and self._thread is not threading.current_thread():
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
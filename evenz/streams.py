@@ -0,0 +1,507 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: evenz.streams
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+A stream transforms an event's triggers on their way to a handler.
+
+.. code-block:: python
+
+    (
+        thermometer.measured.stream()
+        .filter(lambda reading: reading.valid)
+        .map(lambda reading: reading.celsius)
+        .window(10)
+        .map(lambda temperatures: sum(temperatures) / 10)
+        .subscribe(on_average)
+    )
+
+Each value in a stream is a trigger's argument (or, if the trigger has more
+than one argument, a tuple of the arguments in the order of the event's
+parameters, however they were passed).  The stream of an event that has a
+sender (like an observable instance's event) leaves the sender out, since it's
+the same for every trigger; the stream of a class-level event includes it
+(as the first argument).
+
+.. note::
+
+    Subscribing to a stream compiles its operators into a single handler for
+    each event: runs of :py:meth:`Stream.map` and :py:meth:`Stream.filter`
+    are fused into one function, and the operators that keep state
+    (:py:meth:`Stream.window`, :py:meth:`Stream.scan` and
+    :py:meth:`Stream.zip`) are called directly, so a trigger is dispatched
+    once no matter how many operators there are.
+
+    That doesn't make a stream faster than handlers that do the same work
+    (the operators' functions are still called one by one), but a long
+    pipeline costs no more than the handlers would.
+
+    The operators that keep state aren't thread-safe: trigger a stream's
+    events from one thread at a time.
+"""
+
+import inspect
+from collections import deque
+from typing import (
+    Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+)
+
+_MAP = 'map'  #: a stage that transforms values
+_FILTER = 'filter'  #: a stage that drops values
+_WINDOW = 'window'  #: a stage that collects values into windows
+_SCAN = 'scan'  #: a stage that accumulates values
+
+#: the stages that don't keep state (and can be fused)
+_STATELESS = (_MAP, _FILTER)
+
+_NOTHING = object()  #: stands in for an argument a trigger didn't supply
+
+
+def _value(
+        values: Tuple[Any, ...],
+        args: Tuple[Any, ...] = (),
+        kwargs: Dict[str, Any] = None
+) -> Any:
+    """
+    Get the value of a trigger that didn't supply exactly one argument.
+
+    :param values: the arguments for the event's parameters (or
+        :py:data:`_NOTHING` for the ones that weren't supplied)
+    :param args: the other positional arguments
+    :param kwargs: the other keyword arguments
+    :return: the value
+    """
+    values = tuple(v for v in values if v is not _NOTHING) + args
+    if kwargs:
+        values += tuple(kwargs.values())
+    if not values:
+        return None
+    return values[0] if len(values) == 1 else values
+
+
+def _parameters(e: Any) -> Tuple[List[str], bool]:
+    """
+    Get the parameters of an event's function.
+
+    :param e: the event
+    :return: the names of the parameters that may be passed by position,
+        and whether the function takes other keyword arguments
+    """
+    try:
+        signature = inspect.signature(e._f)  # pylint: disable=protected-access
+    except (AttributeError, TypeError, ValueError):
+        return [], True
+    names = [
+        p.name for p in signature.parameters.values()
+        if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)
+    ]
+    return names, any(
+        p.kind in (p.KEYWORD_ONLY, p.VAR_KEYWORD)
+        for p in signature.parameters.values()
+    )
+
+
+def _head(e: Any) -> List[str]:
+    """
+    Get the first lines of a function that receives an event's triggers and
+    turns their arguments into a value.
+
+    :param e: the event
+    :return: the lines
+    """
+    # The function takes the event's own parameters, so keyword arguments go
+    # where they belong without costing anything.  (The names that are ours
+    # start with underscores, so they can't clash with the parameters.)
+    names, keywords = _parameters(e)
+    params = ['__sender'] if getattr(e, '_sender', None) is not None else []
+    params += [f'{name_}=__nothing' for name_ in names] + ['*__args']
+    if keywords:
+        params.append('**__kwargs')
+    lines = [f'def fused({", ".join(params)}):']
+    values = f'({", ".join(names)}{"," if len(names) == 1 else ""})'
+    rest = '__args, __kwargs' if keywords else '__args'
+    if len(names) == 1 and not keywords:
+        # (A trigger with the one argument the event expects doesn't pay for
+        # anything else.)
+        lines += [
+            f'    __value = {names[0]}',
+            '    if __args or __value is __nothing:',
+            f'        __value = __shape({values}, {rest})'
+        ]
+    elif len(names) > 1 and not keywords:
+        missing = ' or '.join(f'{name_} is __nothing' for name_ in names)
+        lines += [
+            f'    __value = {values}',
+            f'    if __args or {missing}:',
+            f'        __value = __shape(__value, {rest})'
+        ]
+    else:
+        lines.append(f'    __value = __shape({values}, {rest})')
+    return lines
+
+
+def _fuse(
+        stages: Iterable[tuple],
+        push: Callable[[Any], Any],
+        head: Optional[Any]
+) -> Callable:
+    """
+    Fuse a run of stateless stages (and windows that don't overlap) into a
+    single function.
+
+    :param stages: the stages
+    :param push: the function that receives the values that come out
+    :param head: if the function receives a trigger's arguments (rather than
+        a value), the event that's triggered (otherwise ``None``)
+    :return: the function
+    """
+    namespace: Dict[str, Any] = {
+        '__push': push, '__nothing': _NOTHING, '__shape': _value
+    }
+    lines = ['def fused(__value):'] if head is None else _head(head)
+    for i, (kind, *params) in enumerate(stages):
+        if kind == _WINDOW:
+            # The window fills a buffer that's allocated once (and counts the
+            # values in it), and each time it's full, the buffer's values move
+            # on as a tuple.  (The count is a global of the fused function's
+            # own namespace.)
+            namespace[f'__s{i}'] = [None] * params[0]
+            namespace[f'__n{i}'] = 0
+            lines.insert(1, f'    global __n{i}')
+            lines.extend([
+                f'    __s{i}[__n{i}] = __value',
+                f'    __n{i} += 1',
+                f'    if __n{i} < {params[0]}:',
+                '        return',
+                f'    __n{i} = 0',
+                f'    __value = tuple(__s{i})'
+            ])
+            continue
+        namespace[f'__s{i}'] = params[0]
+        if kind == _MAP:
+            lines.append(f'    __value = __s{i}(__value)')
+        else:
+            lines.extend([f'    if not __s{i}(__value):', '        return'])
+    lines.append('    __push(__value)')
+    exec('\n'.join(lines), namespace)  # pylint: disable=exec-used
+    return namespace['fused']
+
+
+def _window(size: int, step: int, push: Callable[[Any], Any]) -> Callable:
+    """
+    Create a stage that collects values into windows that overlap (or have
+    gaps between them).  (Windows that don't overlap are fused; see
+    :py:func:`_fuse`.)
+
+    :param size: the number of values in a window
+    :param step: the number of values between the starts of windows
+    :param push: the function that receives the windows
+    :return: the stage
+    """
+    # The values go into a ring that's allocated once.
+    ring = [None] * size
+    count = 0
+
+    def sliding(value):
+        nonlocal count
+        ring[count % size] = value
+        count += 1
+        if count >= size and (count - size) % step == 0:
+            start = count % size
+            push(
+                tuple(ring) if start == 0
+                else tuple(ring[start:]) + tuple(ring[:start])
+            )
+    return sliding
+
+
+def _scan(
+        f: Callable[[Any, Any], Any],
+        initial: Any,
+        push: Callable[[Any], Any]
+) -> Callable:
+    """
+    Create a stage that accumulates values.
+
+    :param f: the function that combines the accumulated value with the next
+        value
+    :param initial: the initial accumulated value
+    :param push: the function that receives the accumulated values
+    :return: the stage
+    """
+    accumulated = initial
+
+    def scan(value):
+        nonlocal accumulated
+        accumulated = f(accumulated, value)
+        push(accumulated)
+    return scan
+
+
+def _zipper(n: int, push: Callable[[Any], Any]) -> List[Callable]:
+    """
+    Create the functions that receive the values of zipped streams.
+
+    :param n: the number of streams
+    :param push: the function that receives the tuples of values
+    :return: a function for each stream
+    """
+    pending = [deque() for _ in range(n)]
+
+    def branch(waiting: deque) -> Callable:
+        def zipped(value):
+            waiting.append(value)
+            if all(pending):
+                push(tuple(p.popleft() for p in pending))
+        return zipped
+    return [branch(waiting) for waiting in pending]
+
+
+def _compile(
+        stages: Tuple[tuple, ...],
+        push: Callable[[Any], Any],
+        head: Optional[Any]
+) -> Callable:
+    """
+    Compile a stream's stages into a single function.
+
+    :param stages: the stages
+    :param push: the function that receives the values that come out
+    :param head: if the function receives a trigger's arguments, the event
+        that's triggered (otherwise ``None``)
+    :return: the function
+    """
+    # Work back from the end, fusing each run of stateless stages (and the
+    # windows that don't overlap, which only need a buffer and a count).
+    run: List[tuple] = []
+    for stage in reversed(stages):
+        if stage[0] in _STATELESS or (
+                stage[0] == _WINDOW and stage[1] == stage[2]):
+            run.insert(0, stage)
+            continue
+        if run:
+            push = _fuse(run, push, head=None)
+            run = []
+        if stage[0] == _WINDOW:
+            push = _window(stage[1], stage[2], push)
+        else:
+            push = _scan(stage[1], stage[2], push)
+    if run or head is not None:
+        push = _fuse(run, push, head=head)
+    return push
+
+
+def _source(source: Any) -> Union['Stream', Any]:
+    """
+    Get the stream or event a source refers to.
+
+    :param source: a :py:class:`Stream`, an :py:class:`evenz.events.Event`,
+        or a function decorated with :py:func:`evenz.events.event`
+    :return: the stream or event
+    """
+    if isinstance(source, Stream):
+        return source
+    e = getattr(source, 'event', source)
+    if not callable(getattr(e, 'subscribe', None)):
+        raise TypeError(f'{source!r} is not a stream or an event.')
+    return e
+
+
+class Stream(object):
+    """
+    A stream is a pipeline of operators between events and handlers.  (Each
+    operator returns a new stream, so a stream can be the start of several
+    pipelines.)
+    """
+    def __init__(
+            self,
+            *sources: Any,
+            stages: Tuple[tuple, ...] = (),
+            zipped: bool = False
+    ):
+        """
+
+        :param sources: the events (or streams) whose values come into the
+            stream
+        :param stages: the operators
+        :param zipped: ``True`` to combine the sources' values into tuples
+            (see :py:meth:`zip`) rather than interleaving them
+        """
+        self._sources = tuple(_source(s) for s in sources)
+        self._stages = stages
+        self._zipped = zipped
+        # The handlers that subscribed, and the events (and functions)
+        # through which they did.
+        self._subscriptions: Dict[Callable, List[Tuple[Any, Callable]]] = {}
+
+    def _then(self, *stage: Any) -> 'Stream':
+        """
+        Create a stream that adds an operator to this one.
+
+        :param stage: the operator
+        :return: the new stream
+        """
+        return Stream(
+            *self._sources, stages=self._stages + (stage,),
+            zipped=self._zipped
+        )
+
+    def map(self, f: Callable[[Any], Any]) -> 'Stream':
+        """
+        Transform the values.
+
+        :param f: a function that receives a value and returns the new value
+        :return: the new stream
+        """
+        return self._then(_MAP, f)
+
+    def filter(self, predicate: Callable[[Any], Any]) -> 'Stream':
+        """
+        Keep only some of the values.
+
+        :param predicate: a function that receives a value and returns
+            ``True`` to keep it
+        :return: the new stream
+        """
+        return self._then(_FILTER, predicate)
+
+    def window(self, size: int, step: int = None) -> 'Stream':
+        """
+        Collect the values into windows (tuples of consecutive values).
+
+        :param size: the number of values in a window
+        :param step: the number of values between the starts of windows (by
+            default, the size, so the windows don't overlap)
+        :return: the new stream
+        """
+        step = size if step is None else step
+        if size < 1 or step < 1:
+            raise ValueError('The size and the step must be at least 1.')
+        return self._then(_WINDOW, size, step)
+
+    def scan(
+            self,
+            f: Callable[[Any, Any], Any],
+            initial: Any = None
+    ) -> 'Stream':
+        """
+        Accumulate the values (like :py:func:`functools.reduce`, but every
+        accumulated value comes out of the stream).
+
+        :param f: a function that receives the accumulated value and the next
+            value, and returns the new accumulated value
+        :param initial: the initial accumulated value
+        :return: the new stream
+        """
+        return self._then(_SCAN, f, initial)
+
+    def merge(self, *others: Any) -> 'Stream':
+        """
+        Interleave this stream's values with others'.
+
+        :param others: the other streams (or events)
+        :return: the new stream
+        """
+        return Stream(self, *others)
+
+    def zip(self, *others: Any) -> 'Stream':
+        """
+        Combine this stream's values with others' into tuples (the first
+        values from each, then the second values, and so on).
+
+        :param others: the other streams (or events)
+        :return: the new stream
+        """
+        return Stream(self, *others, zipped=True)
+
+    def _connect(
+            self,
+            push: Callable[[Any], Any],
+            connections: List[Tuple[Any, Callable]]
+    ):
+        """
+        Subscribe a compiled pipeline to the stream's events.
+
+        :param push: the function that receives the values that come out
+        :param connections: the list to which the events (and the functions
+            subscribed to them) are added
+        """
+        # If the values come straight from an event, the event can call the
+        # compiled stages directly.
+        direct = len(self._sources) == 1 and not isinstance(
+            self._sources[0], Stream
+        )
+        push = _compile(
+            self._stages, push, head=self._sources[0] if direct else None
+        )
+        pushes = (
+            _zipper(len(self._sources), push) if self._zipped
+            else [push] * len(self._sources)
+        )
+        for source, push_ in zip(self._sources, pushes):
+            if isinstance(source, Stream):
+                # pylint: disable=protected-access
+                source._connect(push_, connections)
+                continue
+            handler = push_ if direct else _compile((), push_, head=source)
+            source.subscribe(handler, weak=False)
+            connections.append((source, handler))
+
+    def subscribe(self, handler: Callable[[Any], Any]) -> 'Stream':
+        """
+        Subscribe a handler to the stream.
+
+        :param handler: the handler (which receives each value that comes out
+            of the stream)
+        :return: the stream
+
+        .. note::
+
+            You can also use the += operator.
+        """
+        if not callable(handler):
+            raise ValueError(f'{type(handler)} is not callable.')
+        if handler in self._subscriptions:
+            return self
+        connections: List[Tuple[Any, Callable]] = []
+        self._connect(handler, connections)
+        self._subscriptions[handler] = connections
+        return self
+
+    def unsubscribe(self, handler: Callable[[Any], Any]) -> 'Stream':
+        """
+        Unsubscribe a handler from the stream.
+
+        :param handler: the handler
+        :return: the stream
+
+        .. note::
+
+            You can also use the -= operator.
+        """
+        connections = self._subscriptions.pop(handler, None)
+        if connections is None:
+            raise ValueError(f'{handler} is not subscribed.')
+        for e, compiled in connections:
+            e.unsubscribe(compiled)
+        return self
+
+    def __iadd__(self, other):
+        # Subscribe to the handler.
+        return self.subscribe(other)
+
+    def __isub__(self, other):
+        # Unsubscribe from the handler.
+        return self.unsubscribe(other)
+
+
+def merge(*sources: Any) -> Stream:
+    """
+    Interleave the values of streams (or events).
+
+    :param sources: the streams or events
+    :return: the stream
+    """
+    return Stream(*sources)
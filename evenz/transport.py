@@ -0,0 +1,735 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: evenz.transport
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+This module carries events to subscribers in other processes on the same
+host.
+
+A :py:class:`Publisher` attaches to events (or whole observable classes) and
+writes their triggers as frames into a ring buffer in shared memory (or, if
+shared memory isn't available, onto Unix-domain sockets).  A
+:py:class:`Subscriber` in another process reads the frames and triggers local
+events by name.
+
+.. code-block:: python
+
+    # In the process that has the dogs...
+    publisher = Publisher('kennel')
+    publisher.attach(Dog, key=lambda dog: dog.name)
+
+    # ...and in another process.
+    subscriber = Subscriber('kennel')
+    subscriber.event('Dog.barked').subscribe(on_bark)
+    while True:
+        subscriber.poll(timeout=1.0)
+
+.. note::
+
+    The ring buffer is a broadcast ring: the publisher never waits for the
+    subscribers.  A subscriber that falls more than a ring's worth of frames
+    behind skips ahead (and counts the bytes it missed in
+    :py:attr:`Subscriber.dropped`).  Sockets don't make the publisher wait
+    either: a subscriber that isn't ready for more has the frames wait for it
+    (up to a ring's worth) and misses the ones that don't fit.  Triggers
+    arrive with the key that identifies the sender (if the publisher was given
+    a ``key`` function) followed by the event's arguments.
+"""
+
+import os
+import selectors
+import socket
+import struct
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from .dispatch import _noop
+from .events import Event
+from .journal import PickleCodec, _channels, _keyed
+from .observables import _EventMember
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Shared memory isn't available (so we use sockets).
+    shared_memory = None
+
+SHARED_MEMORY = 'shm'  #: transport frames through a shared-memory ring buffer
+SOCKET = 'socket'  #: transport frames over Unix-domain sockets
+AUTO = 'auto'  #: use shared memory if it's available, otherwise sockets
+
+#: each frame starts with its length (including this header) and the length
+#: of the channel's name
+_FRAME = struct.Struct('<IB')
+_ALIGN = 8  #: frames in the ring start on multiples of this
+#: the ring's header: a magic number, the capacity, the write position (up
+#: to which frames are published) and the reserved position (up to which the
+#: publisher may be overwriting the ring)
+_RING = struct.Struct('<QQQQ')
+_RING_MAGIC = 0x45565a52494e4702  # 'EVZRING' and the format's version
+_RING_HEADER = 64  #: the size of the ring's header (the data comes after it)
+_WRITE_AT = 16  #: the offset of the write position in the ring's header
+_RESERVED_AT = 24  #: the offset of the reserved position in the ring's header
+_POSITION = struct.Struct('<Q')
+
+
+def _frame(name: bytes, payload: bytes) -> bytes:
+    """
+    Create a frame.
+
+    :param name: the (encoded) name of the channel
+    :param payload: the encoded arguments
+    :return: the frame
+    """
+    return _FRAME.pack(_FRAME.size + len(name) + len(payload), len(name)) \
+        + name + payload
+
+
+def _parse(frame: bytes) -> Tuple[bytes, bytes]:
+    """
+    Take a frame apart.
+
+    :param frame: the frame
+    :return: the (encoded) name of the channel and the encoded arguments
+    """
+    end = _FRAME.size + frame[_FRAME.size - 1]
+    return frame[_FRAME.size:end], frame[end:]
+
+
+def _socket_path(name: str) -> str:
+    """
+    Get the path of the Unix-domain socket for a publisher.
+
+    :param name: the name of the publisher
+    :return: the path
+    """
+    return os.path.join(tempfile.gettempdir(), f'{name}.sock')
+
+
+def _shared_memory(name: str, size: int = 0):
+    """
+    Open (or create) shared memory that the resource tracker leaves alone.
+    (Otherwise, the tracker of whichever process exits first removes it, and
+    processes that share a tracker trip over each other's bookkeeping.  The
+    publisher removes the memory when it's closed.)
+
+    :param name: the name of the shared memory
+    :param size: the size of new shared memory (or 0 to open existing memory)
+    :return: the shared memory
+    """
+    # Python 3.13 lets us say the memory isn't tracked...
+    if sys.version_info >= (3, 13):
+        # (The keyword is unknown to linters running on older versions.)
+        # pylint: disable=unexpected-keyword-arg
+        return shared_memory.SharedMemory(
+            name=name, create=size > 0, size=size, track=False
+        )
+    # ...before that, we tell the tracker to forget it.
+    shm = shared_memory.SharedMemory(name=name, create=size > 0, size=size)
+    # pylint: disable=import-outside-toplevel
+    from multiprocessing import resource_tracker
+    resource_tracker.unregister(
+        shm._name, 'shared_memory'  # pylint: disable=protected-access
+    )
+    return shm
+
+
+class _RingWriter(object):
+    """
+    This writes frames into a ring buffer in shared memory.
+    """
+    def __init__(self, name: str, size: int):
+        """
+
+        :param name: the name of the shared memory
+        :param size: the capacity of the ring (in bytes)
+        """
+        size -= size % _ALIGN
+        self._shm = _shared_memory(name, size=_RING_HEADER + size)
+        self._buf = self._shm.buf
+        self._capacity = size
+        self._pos = 0  # the position after the last frame we wrote
+        self._published = 0  # the position up to which frames are published
+        _RING.pack_into(self._buf, 0, _RING_MAGIC, size, 0, 0)
+
+    def write(self, frame: bytes):
+        """
+        Write a frame.  (The subscribers don't see it until :py:meth:`flush`
+        is called, unless the frames waiting to be published would otherwise
+        fill the ring.)
+
+        :param frame: the frame
+        """
+        capacity = self._capacity
+        length = len(frame)
+        padded = length + -length % _ALIGN
+        if padded > capacity // 2:
+            raise ValueError('The frame is too large for the ring.')
+        pos = self._pos
+        offset = pos % capacity
+        # If the frame doesn't fit before the end of the ring, we skip the
+        # rest of the ring and start again at the beginning.
+        skip = capacity - offset if offset + padded > capacity else 0
+        end = pos + skip + padded
+        # Frames we haven't published must never overwrite one another, so
+        # we publish what we have before that can happen.
+        if end - self._published > capacity:
+            self.flush()
+        # Tell the subscribers which part of the ring we're about to
+        # overwrite *before* we overwrite it.  (A subscriber that read
+        # something from there checks afterwards and discards it.)
+        _POSITION.pack_into(self._buf, _RESERVED_AT, end)
+        if skip:
+            _FRAME.pack_into(self._buf, _RING_HEADER + offset, 0, 0)
+            offset = 0
+        start = _RING_HEADER + offset
+        self._buf[start:start + length] = frame
+        self._pos = end
+
+    def flush(self):
+        """
+        Publish the frames written so far.
+        """
+        _POSITION.pack_into(self._buf, _WRITE_AT, self._pos)
+        self._published = self._pos
+
+    def close(self):
+        """
+        Close (and remove) the ring.
+        """
+        self._buf = None
+        self._shm.close()
+        if getattr(self._shm, '_track', True):
+            # Before Python 3.13, removing the memory tells the tracker to
+            # forget it (again), so we remind the tracker of it first.
+            # pylint: disable=import-outside-toplevel
+            from multiprocessing import resource_tracker
+            # pylint: disable=protected-access
+            resource_tracker.register(self._shm._name, 'shared_memory')
+        self._shm.unlink()
+
+
+class _RingReader(object):
+    """
+    This reads frames from a ring buffer in shared memory.
+    """
+    def __init__(self, name: str):
+        """
+
+        :param name: the name of the shared memory
+        """
+        self._shm = _shared_memory(name)
+        self._buf = self._shm.buf
+        magic, self._capacity, self._pos, _ = _RING.unpack_from(self._buf, 0)
+        if magic != _RING_MAGIC:
+            raise ValueError(f'{name} is not an event ring.')
+        #: the number of bytes we skipped (because we fell behind)
+        self.dropped = 0
+
+    def read(self) -> List[bytes]:
+        """
+        Read the frames that have been published since the last read.
+
+        :return: the frames
+        """
+        buf = self._buf
+        capacity = self._capacity
+        end, = _POSITION.unpack_from(buf, _WRITE_AT)
+        start = pos = self._pos
+        frames = []
+        # (If the publisher has already lapped us, what we'd read is garbage,
+        # so we don't bother.)
+        if end - start <= capacity:
+            while pos < end:
+                offset = pos % capacity
+                length, _ = _FRAME.unpack_from(buf, _RING_HEADER + offset)
+                if length == 0:
+                    # The rest of the ring is unused.
+                    pos += capacity - offset
+                    continue
+                if length < _FRAME.size or offset + length > capacity:
+                    break  # The frame was overwritten while we read it.
+                at = _RING_HEADER + offset
+                frames.append(bytes(buf[at:at + length]))
+                pos += length + -length % _ALIGN
+        # Everything the publisher may have started overwriting is more than
+        # a ring behind the reserved position.  If we read anything from
+        # there, we can't trust any of it.
+        reserved, = _POSITION.unpack_from(buf, _RESERVED_AT)
+        if reserved - start > capacity or pos != end:
+            # We skip ahead to the (published) frames we haven't missed.
+            self.dropped += end - start
+            frames = []
+        self._pos = end
+        return frames
+
+    def close(self):
+        """
+        Close the ring.
+        """
+        self._buf = None
+        self._shm.close()
+
+
+class _SocketWriter(object):
+    """
+    This writes frames to the subscribers connected to a Unix-domain socket.
+    The sockets never block: the bytes a subscriber isn't ready for wait in
+    its backlog (which a thread sends when the subscriber is ready), and a
+    subscriber whose backlog is full misses frames (and is told how many
+    bytes it missed) rather than holding up the publisher.
+    """
+    def __init__(
+            self,
+            name: str,
+            batch_bytes: int = 65536,
+            backlog: int = 1 << 22
+    ):
+        """
+
+        :param name: the name of the publisher
+        :param batch_bytes: send the frames whenever this many bytes are
+            waiting
+        :param backlog: the most bytes that may wait for a subscriber
+        """
+        self._path = _socket_path(name)
+        if os.path.exists(self._path):
+            os.unlink(self._path)
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(self._path)
+        self._server.listen()
+        self._server.setblocking(False)
+        # Each subscriber's backlog, and the bytes it has missed since it
+        # was last told.
+        self._clients: Dict[socket.socket, bytearray] = {}
+        self._missed: Dict[socket.socket, int] = {}
+        self._pending = bytearray()
+        self._batch_bytes = batch_bytes
+        self._backlog = backlog
+        # The thread that sends the backlogs waits for this when there are
+        # none.
+        self._lock = threading.Lock()
+        self._waiting = threading.Event()
+        self._closed = False
+        self._sender = threading.Thread(target=self._send_backlogs, daemon=True)
+        self._sender.start()
+
+    def _accept(self):
+        """
+        Accept the subscribers that have connected.
+        """
+        while True:
+            try:
+                client, _ = self._server.accept()
+            except BlockingIOError:
+                return
+            client.setblocking(False)
+            self._clients[client] = bytearray()
+            self._missed[client] = 0
+
+    def _drop(self, client: socket.socket):
+        """
+        Disconnect a subscriber.
+
+        :param client: the subscriber's socket
+        """
+        del self._clients[client]
+        del self._missed[client]
+        client.close()
+
+    def _send(self, client: socket.socket, out: bytearray):
+        """
+        Send as much of a subscriber's backlog as it's ready for.
+
+        :param client: the subscriber's socket
+        :param out: the subscriber's backlog
+        """
+        try:
+            while out:
+                sent = client.send(out)
+                del out[:sent]
+        except BlockingIOError:  # The subscriber isn't ready for more.
+            self._waiting.set()
+        except OSError:  # The subscriber went away.
+            self._drop(client)
+
+    def _send_backlogs(self):
+        """
+        Send the backlogs as the subscribers become ready for them.  (This
+        runs on its own thread.)
+        """
+        with selectors.DefaultSelector() as selector:
+            while not self._closed:
+                self._waiting.wait()
+                with self._lock:
+                    self._waiting.clear()
+                    waiting = [c for c, out in self._clients.items() if out]
+                if not waiting:
+                    continue
+                for client in waiting:
+                    selector.register(client, selectors.EVENT_WRITE)
+                ready = selector.select(timeout=0.1)
+                for client in waiting:
+                    selector.unregister(client)
+                with self._lock:
+                    for key, _ in ready:
+                        out = self._clients.get(key.fileobj)
+                        if out is not None:
+                            self._send(key.fileobj, out)
+                    if len(ready) < len(waiting):
+                        self._waiting.set()
+
+    def write(self, frame: bytes):
+        """
+        Write a frame.
+
+        :param frame: the frame
+        """
+        self._pending += frame
+        if len(self._pending) >= self._batch_bytes:
+            self.flush()
+
+    def flush(self):
+        """
+        Send the frames that are waiting (as much of them as each subscriber
+        is ready for).
+        """
+        with self._lock:
+            self._accept()
+            data, self._pending = self._pending, bytearray()
+            for client, out in list(self._clients.items()):
+                if data:
+                    if len(out) + len(data) > self._backlog:
+                        # The subscriber can't keep up, so it misses these.
+                        self._missed[client] += len(data)
+                    else:
+                        if self._missed[client]:
+                            # (A frame without a name tells the subscriber
+                            # how many bytes it missed.)
+                            out += _frame(
+                                b'', _POSITION.pack(self._missed[client])
+                            )
+                            self._missed[client] = 0
+                        out += data
+                self._send(client, out)
+
+    def close(self, timeout: float = 1.0):
+        """
+        Close the socket (and disconnect the subscribers).
+
+        :param timeout: how long to wait for each subscriber to take what's
+            left in its backlog (in seconds)
+        """
+        self.flush()
+        self._closed = True
+        self._waiting.set()
+        self._sender.join()
+        for client, out in list(self._clients.items()):
+            try:
+                client.settimeout(timeout)
+                client.sendall(out)
+            except OSError:  # The subscriber is gone (or too slow).
+                pass
+            self._drop(client)
+        self._server.close()
+        if os.path.exists(self._path):
+            os.unlink(self._path)
+
+
+class _SocketReader(object):
+    """
+    This reads frames from a publisher's Unix-domain socket.
+    """
+    def __init__(self, name: str):
+        """
+
+        :param name: the name of the publisher
+        """
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.connect(_socket_path(name))
+        self._socket.setblocking(False)
+        self._buffer = bytearray()
+        #: the number of bytes the publisher skipped (because we fell behind)
+        self.dropped = 0
+
+    def read(self) -> List[bytes]:
+        """
+        Read the frames that have arrived.
+
+        :return: the frames
+        """
+        while True:
+            try:
+                data = self._socket.recv(1 << 20)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            self._buffer += data
+        frames = []
+        buffer = self._buffer
+        pos = 0
+        while len(buffer) - pos >= _FRAME.size:
+            length, _ = _FRAME.unpack_from(buffer, pos)
+            if len(buffer) - pos < length:
+                break
+            if buffer[pos + _FRAME.size - 1] == 0:
+                # The publisher is telling us what we missed.
+                self.dropped += _POSITION.unpack_from(
+                    buffer, pos + _FRAME.size
+                )[0]
+            else:
+                frames.append(bytes(buffer[pos:pos + length]))
+            pos += length
+        del buffer[:pos]
+        return frames
+
+    def fileno(self) -> int:
+        """
+        Get the socket's file descriptor (so we can wait for it).
+        """
+        return self._socket.fileno()
+
+    def close(self):
+        """
+        Close the socket.
+        """
+        self._socket.close()
+
+
+def _transport(transport: str) -> str:
+    """
+    Decide which transport to use.
+
+    :param transport: the transport that was asked for
+    :return: the transport to use
+    """
+    if transport == AUTO:
+        return SHARED_MEMORY if shared_memory is not None else SOCKET
+    if transport not in (SHARED_MEMORY, SOCKET):
+        raise ValueError(f'{transport!r} is not a transport.')
+    if transport == SHARED_MEMORY and shared_memory is None:
+        raise RuntimeError('Shared memory is not available.')
+    return transport
+
+
+class Publisher(object):
+    """
+    A publisher sends events' triggers to subscribers in other processes.
+    """
+    def __init__(
+            self,
+            name: str,
+            transport: str = AUTO,
+            size: int = 1 << 22,
+            batch_bytes: int = 65536
+    ):
+        """
+
+        :param name: the name subscribers use to find the publisher
+        :param transport: :py:data:`SHARED_MEMORY`, :py:data:`SOCKET` or
+            :py:data:`AUTO`
+        :param size: the capacity of the shared-memory ring (or, with
+            sockets, the most bytes that may wait for a subscriber)
+        :param batch_bytes: with sockets, send the frames whenever this many
+            bytes are waiting
+        """
+        self.transport = _transport(transport)  #: the transport in use
+        self._writer = (
+            _RingWriter(name, size) if self.transport == SHARED_MEMORY
+            else _SocketWriter(name, batch_bytes, backlog=size)
+        )
+        self._lock = threading.Lock()
+        self._batching = 0
+        self._attached: List[Tuple[Event, Callable]] = []
+
+    def channel(self, name: str, codec: Any = None) -> Callable[..., None]:
+        """
+        Get a function that publishes triggers under a name.
+
+        :param name: the name subscribers use for the event
+        :param codec: the codec for the arguments (see
+            :py:mod:`evenz.journal`); subscribers need to use the same one
+        :return: the function
+        """
+        encode = (codec if codec is not None else PickleCodec()).encode
+        name_ = name.encode('utf-8')
+        if len(name_) > 255:
+            raise ValueError('The name is too long.')
+        write = self._writer.write
+        flush = self._writer.flush
+        lock = self._lock
+
+        def publish(*args, **kwargs):
+            frame = _frame(name_, encode(args, kwargs))
+            with lock:
+                write(frame)
+                # Unless we're in a batch, the subscribers see the frame
+                # right away.
+                if not self._batching:
+                    flush()
+        return publish
+
+    def attach(
+            self,
+            target: Any,
+            name: str = None,
+            codec: Any = None,
+            key: Callable[[Any], Any] = None
+    ):
+        """
+        Publish an event's triggers.
+
+        :param target: an :py:class:`evenz.events.Event`, a function decorated
+            with :py:func:`evenz.events.event`, or a class decorated with
+            :py:func:`evenz.events.observable`
+        :param name: the name of the event (by default, the event's own name);
+            for a class, the names of the events are appended to it
+        :param codec: the codec for the arguments
+        :param key: for events that have senders, a function that returns a
+            value identifying the sender (which subscribers receive first)
+        :return: the publisher
+        """
+        for name_, e in _channels(target, name):
+            publish = self.channel(name_, codec)
+            # pylint: disable=protected-access
+            if isinstance(e, _EventMember) or e._sender is not None:
+                # The handler receives the sender first.
+                publish = _keyed(publish, key)
+            e.subscribe(publish)
+            self._attached.append((e, publish))
+        return self
+
+    @contextmanager
+    def batch(self) -> Iterator['Publisher']:
+        """
+        Publish the triggers in a batch: the subscribers see them all at once
+        when the batch ends.
+
+        :return: a context manager
+        """
+        with self._lock:
+            self._batching += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batching -= 1
+                if not self._batching:
+                    self._writer.flush()
+
+    def close(self):
+        """
+        Stop publishing and close the transport.
+        """
+        for e, publish in self._attached:
+            e.unsubscribe(publish)
+        self._attached = []
+        with self._lock:
+            self._writer.flush()
+            self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class Subscriber(object):
+    """
+    A subscriber receives the triggers a :py:class:`Publisher` in another
+    process sends, and triggers local events with them.
+    """
+    def __init__(self, name: str, transport: str = AUTO):
+        """
+
+        :param name: the name of the publisher
+        :param transport: the publisher's transport
+        """
+        self.transport = _transport(transport)  #: the transport in use
+        self._reader = (
+            _RingReader(name) if self.transport == SHARED_MEMORY
+            else _SocketReader(name)
+        )
+        # The events (and their codecs) by their encoded names.
+        self._events: Dict[bytes, Tuple[Event, Any]] = {}
+
+    @property
+    def dropped(self) -> int:
+        """
+        Get the number of bytes of frames the subscriber missed because it
+        fell too far behind.
+        """
+        return self._reader.dropped
+
+    def event(self, name: str, codec: Any = None) -> Event:
+        """
+        Get the local event that's triggered when a trigger arrives from the
+        publisher.
+
+        :param name: the name of the event
+        :param codec: the codec the publisher uses for the arguments
+        :return: the event
+        """
+        name_ = name.encode('utf-8')
+        entry = self._events.get(name_)
+        if entry is None:
+            entry = (
+                Event(f=_noop),
+                codec if codec is not None else PickleCodec()
+            )
+            self._events[name_] = entry
+        return entry[0]
+
+    def poll(self, timeout: float = 0.0) -> int:
+        """
+        Trigger the local events with the triggers that have arrived.
+
+        :param timeout: how long to wait for triggers (in seconds) if none
+            have arrived
+        :return: the number of triggers
+        """
+        deadline = time.monotonic() + timeout
+        delay = 0.0001
+        while True:
+            frames = self._reader.read()
+            if frames or time.monotonic() >= deadline:
+                break
+            # Wait a little (and a little longer each time).
+            if isinstance(self._reader, _SocketReader):
+                with selectors.DefaultSelector() as selector:
+                    selector.register(self._reader, selectors.EVENT_READ)
+                    selector.select(max(deadline - time.monotonic(), 0))
+            else:
+                time.sleep(min(delay, max(deadline - time.monotonic(), 0)))
+                delay = min(delay * 2, 0.01)
+        events = self._events
+        count = 0
+        for frame in frames:
+            name_, payload = _parse(frame)
+            entry = events.get(name_)
+            if entry is None:
+                continue
+            e, codec = entry
+            args, kwargs = codec.decode(payload)
+            e.trigger(*args, **kwargs)
+            count += 1
+        return count
+
+    def close(self):
+        """
+        Close the transport.
+        """
+        self._reader.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
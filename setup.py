@@ -51,11 +51,15 @@ setup(
         # Include dependencies here
         'click>=7.0,<8'
     ],
+    extras_require={
+        # NumPy lets batch handlers read columns as arrays.
+        'numpy': ['numpy']
+    },
     # entry_points="""
     # [console_scripts]
     # evenz=evenz.cli:cli
     # """,
-    python_requires=">=0.0.1",
+    python_requires=">=3.8",
     license='MIT',  # noqa
     author='Pat Daburu',
     author_email='pat@daburu.net',
@@ -87,7 +91,7 @@ setup(
 
       # Specify the Python versions you support here. In particular, ensure
       # that you indicate whether you support Python 2, Python 3 or both.
-      'Programming Language :: Python :: 3.6',
+      'Programming Language :: Python :: 3.8',
     ],
     include_package_data=True
 )
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import time
+
+from evenz.events import AsyncEvent, Event, HandlerErrors, observable, event
+
+
+@observable
+class Cat(object):
+    """
+    This is a cat that meows asynchronously.
+    """
+
+    __test__ = False  # Don't test the class.
+
+    def __init__(self, name: str):
+        self.name = name
+        self.meows = 0
+
+    @event
+    async def meowed(self, count: int):
+        """
+        This event is raised when the cat meows.
+
+        :param count: how many times did the cat meow?
+        """
+        self.meows += count
+
+
+@event
+async def purred(volume: int):
+    """
+    This event is raised when something purrs.
+
+    :param volume: how loud was the purr?
+    """
+
+
+def test_atrigger_asyncHandlers_overlap():
+    calls = []
+
+    async def slow(sender, count: int):
+        await asyncio.sleep(0.1)
+        calls.append('slow')
+
+    async def slower(sender, count: int):
+        await asyncio.sleep(0.1)
+        calls.append('slower')
+
+    def quick(sender, count: int):
+        calls.append('quick')
+
+    cat = Cat('Tom')
+    assert isinstance(cat.meowed, AsyncEvent)
+    cat.meowed += slow
+    cat.meowed += quick
+    cat.meowed += slower
+    start = time.perf_counter()
+    asyncio.run(cat.meowed(2))
+    elapsed = time.perf_counter() - start
+    # The async handlers ran at the same time.
+    assert elapsed < 0.19
+    assert sorted(calls) == ['quick', 'slow', 'slower']
+    # The event's own function was awaited, too.
+    assert cat.meows == 2
+
+
+def test_atrigger_errors_aggregated():
+    calls = []
+
+    async def fails(count: int):
+        raise KeyError(count)
+
+    def also_fails(count: int):
+        raise ValueError(count)
+
+    async def succeeds(count: int):
+        calls.append(count)
+
+    e = Event(f=lambda count: None)
+    e += fails
+    e += also_fails
+    e += succeeds
+    try:
+        asyncio.run(e.atrigger(1))
+        assert False, 'Expected HandlerErrors.'
+    except HandlerErrors as errors:
+        assert sorted(type(ex).__name__ for ex in errors.errors) == [
+            'KeyError', 'ValueError'
+        ]
+    # The handler that didn't fail still ran.
+    assert calls == [1]
+
+
+def test_trigger_asyncHandler_scheduled():
+    calls = []
+
+    async def on_purr(volume: int):
+        calls.append(volume)
+
+    async def main():
+        purred.event.subscribe(on_purr)
+        try:
+            # A synchronous trigger schedules the async handler...
+            purred.event.trigger(3)
+            assert calls == []
+            # ...which runs when we give the loop a chance.
+            await asyncio.sleep(0)
+            assert calls == [3]
+            # The decorated function itself is awaitable.
+            await purred(5)
+            assert calls == [3, 5]
+        finally:
+            purred.event.unsubscribe(on_purr)
+
+    asyncio.run(main())
+
+
+def test_trigger_weakAsyncHandler_scheduled():
+
+    class Owner(object):
+        def __init__(self):
+            self.calls = []
+
+        async def on_purr(self, volume: int):
+            self.calls.append(volume)
+
+        async def on_filtered(self, sender, args):
+            self.calls.append(args.real)
+
+    owner = Owner()
+    cat = Cat('tom')
+    e = Event(f=lambda volume: None)
+
+    async def main():
+        # Weakly-subscribed async handlers (bound to a sender, or filtered)
+        # are scheduled, too.
+        e.subscribe(owner.on_purr, weak=True)
+        cat.meowed.subscribe(owner.on_filtered, weak=True, where={'real': 2})
+        e.trigger(3)
+        cat.meowed.trigger(2)
+        cat.meowed.trigger(1)
+        await asyncio.sleep(0)
+        assert sorted(owner.calls) == [2, 3]
+
+    asyncio.run(main())
+
+
+def test_atrigger_executor_waitsForHandlers():
+    e = AsyncEvent(f=lambda count: None, executor='thread')
+
+    def slow(count: int):
+        time.sleep(0.05)
+        return count
+
+    e += slow
+    dispatch = asyncio.run(e.atrigger(3))
+    assert dispatch.done()
+    assert dispatch.result() == [3]
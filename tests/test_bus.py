@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from evenz.bus import Bus
+from evenz.events import observable, event
+
+
+def test_bus_wildcards():
+    bus = Bus()
+    received = {}
+
+    def recorder(name):
+        def handler(*args):
+            received.setdefault(name, []).append(args)
+        return handler
+
+    bus.subscribe('kennel.fido.barked', recorder('exact'))
+    bus.subscribe('kennel.*.barked', recorder('star'))
+    bus.subscribe('kennel.**', recorder('globstar'))
+    bus.subscribe('**.barked', recorder('suffix'))
+    bus.subscribe('kennel.*', recorder('shallow'))
+    bus.publish('kennel.fido.barked', 3)
+    bus.publish('kennel.rex.barked', 4)
+    bus.publish('kennel', 5)
+    assert received == {
+        'exact': [(3,)],
+        'star': [(3,), (4,)],
+        'globstar': [(3,), (4,), (5,)],
+        'suffix': [(3,), (4,)]
+    }
+
+
+def test_bus_routes_are_cached_and_invalidated():
+    bus = Bus()
+    calls = []
+
+    def first(count):
+        calls.append(('first', count))
+
+    def second(count):
+        calls.append(('second', count))
+
+    bus.subscribe('a.*', first)
+    bus.subscribe('a.**', first)  # This handler is only called once...
+    assert bus.route('a.b') == (first,)
+    assert bus.route('a.b') is bus.route('a.b')
+    bus.subscribe('*.b', second)  # ...and the cached route is forgotten.
+    bus.publish('a.b', 1)
+    bus.unsubscribe('a.*', first)
+    bus.unsubscribe('a.**', first)
+    bus.publish('a.b', 2)
+    assert calls == [('first', 1), ('second', 1), ('second', 2)]
+    with pytest.raises(ValueError):
+        bus.unsubscribe('a.*', first)
+    assert bus.route('a.c') == ()
+
+
+def test_observable_bus():
+    bus = Bus()
+    barks = []
+    bus.subscribe('Dog.*', lambda sender, count: barks.append((sender, count)))
+
+    @observable(bus=bus)
+    class Dog(object):
+        @event
+        def barked(self, count: int):
+            """
+            This event is raised when the dog barks.
+            """
+
+    fido = Dog()
+    fido.barked(3)
+    # Attaching a class with a custom topic also works.
+    other = Bus()
+    other.attach(Dog, topic=lambda sender, name: f'kennel.{id(sender)}.{name}')
+    other.subscribe(
+        f'kennel.{id(fido)}.barked',
+        lambda sender, count: barks.append(('kennel', count))
+    )
+    fido.barked(4)
+    assert barks == [(fido, 3), (fido, 4), ('kennel', 4)]
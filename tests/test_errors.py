@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import logging
+
+import pytest
+
+from evenz.errors import COLLECT, LOG, CircuitBreaker, HandlerErrors
+from evenz.events import STOP, Event, observable, event
+
+
+@observable(errors=COLLECT)
+class Dog(object):
+    """
+    This dog barks (and its handlers' exceptions are collected).
+    """
+
+    __test__ = False  # Don't test the class.
+
+    def __init__(self, name: str):
+        self.name = name
+
+    @event
+    def barked(self, count: int):
+        """
+        This event is raised when the dog barks.
+        """
+
+
+def fail(*args):
+    raise ValueError(args)
+
+
+def test_errors_propagateByDefault():
+    e = Event(f=lambda x: None)
+    calls = []
+    e += fail
+    e += calls.append
+    with pytest.raises(ValueError):
+        e.trigger(1)
+    assert calls == []
+
+
+def test_errors_collect():
+    e = Event(f=lambda x: None, errors=COLLECT)
+    calls = []
+    e += calls.append
+    e += fail
+    e += lambda x: calls.append(x * 10)
+    e += lambda x: 1 / 0
+    with pytest.raises(HandlerErrors) as info:
+        e.trigger(1)
+    # Every handler was called, and both exceptions were collected.
+    assert calls == [1, 10]
+    assert len(info.value.errors) == 2
+    # A handler can still stop the others.
+    e.subscribe(lambda x: STOP, priority=1)
+    assert e.trigger(2) is STOP
+    assert calls == [1, 10]
+
+
+def test_errors_log(caplog):
+    e = Event(f=lambda x: None, errors=LOG)
+    calls = []
+    e += fail
+    e.subscribe(calls.append, where={'real': 1.0})
+    with caplog.at_level(logging.ERROR, logger='evenz'):
+        e.trigger(1)
+    assert calls == [1]
+    assert 'raised an exception' in caplog.text
+
+
+def test_errors_circuitBreaker():
+    tripped = []
+    breaker = CircuitBreaker(
+        failures=2, on_trip=lambda e, h: tripped.append(h)
+    )
+    e = Event(f=lambda x: None, errors=breaker)
+    calls = []
+    e += fail
+    e += calls.append
+    e.trigger(1)
+    assert breaker.count(e, fail) == 1
+    e.trigger(2)
+    # The handler failed twice, so it's been unsubscribed.
+    assert tripped == [fail]
+    assert fail not in list(e.handlers)
+    assert len(e.snapshot()) == 1
+    e.trigger(3)
+    assert calls == [1, 2, 3]
+
+
+def test_errors_observableClassAndInstances():
+    dog = Dog('fido')
+    calls = []
+    dog.barked += fail
+    dog.barked += lambda sender, count: calls.append(('instance', count))
+    Dog.barked += fail
+    Dog.barked += lambda sender, count: calls.append(('class', count))
+    try:
+        with pytest.raises(HandlerErrors):
+            dog.barked(1)
+        assert calls == [('instance', 1), ('class', 1)]
+    finally:
+        Dog.barked -= fail
+
+
+def test_errors_circuitBreakerBaseClassHandler():
+    breaker = CircuitBreaker(failures=2)
+
+    @observable(errors=breaker)
+    class Puppy(Dog):
+        """
+        This puppy barks like a dog.
+        """
+
+    handler = lambda sender, count: 1 / 0  # noqa: E731
+    Dog.barked += handler
+    try:
+        puppy = Puppy('rex')
+        puppy.barked(1)
+        puppy.barked(2)
+        # The handler was subscribed to the base class' event, so that's
+        # where it was unsubscribed.
+        assert handler not in list(Dog.barked.handlers)
+    finally:
+        if handler in list(Dog.barked.handlers):
+            Dog.barked -= handler
+
+
+def test_errors_atrigger(caplog):
+    e = Event(f=lambda x: None, errors=LOG)
+    calls = []
+
+    async def afail(x):
+        raise KeyError(x)
+
+    e += fail
+    e += afail
+    e += calls.append
+    with caplog.at_level(logging.ERROR, logger='evenz'):
+        asyncio.run(e.atrigger(1))
+    assert calls == [1]
+    assert caplog.text.count('raised an exception') == 2
+
+
+def test_errors_executor():
+    breaker = CircuitBreaker(failures=1)
+    e = Event(f=lambda x: None, executor='thread', errors=breaker)
+    e += fail
+    e += lambda x: x
+    with pytest.raises(HandlerErrors):
+        e.trigger(1).result(timeout=5)
+    assert fail not in list(e.handlers)
+    assert e.trigger(2).result(timeout=5) == [2]
+
+
+def test_errors_filteredHandlerPriority():
+    e = Event(f=lambda x: None, errors=COLLECT)
+    calls = []
+    e.subscribe(lambda x: calls.append('plain'))
+    e.subscribe(lambda x: calls.append('filtered'), where={'real': 1.0},
+                priority=1)
+    e.subscribe(fail, where={'real': 1.0})
+    with pytest.raises(HandlerErrors):
+        e.trigger(1)
+    assert calls == ['filtered', 'plain']
+
+
+def test_errors_filteredHandlersAreIndexed():
+
+    class Change(object):
+        """
+        This change counts how many times its kind is examined.
+        """
+        looks = 0
+
+        @property
+        def kind(self):
+            Change.looks += 1
+            return 'insert'
+
+    e = Event(f=lambda x: None, errors=COLLECT)
+    calls = []
+    for i in range(10):
+        e.subscribe(lambda x, i=i: calls.append(i), where={'kind': f'k{i}'})
+    e.subscribe(fail, where={'kind': 'insert'})
+    e.subscribe(lambda x: calls.append('insert'), where={'kind': 'insert'})
+    with pytest.raises(HandlerErrors):
+        e.trigger(Change())
+    # The handlers were looked up in the index (which examines the field
+    # once), and the one after the handler that failed was still called.
+    assert Change.looks == 1
+    assert calls == ['insert']
@@ -1,7 +1,17 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-from evenz.events import observable, event
+import inspect
+import tracemalloc
+import types
+from typing import NamedTuple
+import weakref
+
+import pytest
+
+from evenz.events import (
+    Batch, Event, STOP, batch_handler, document, observable, event
+)
 
 
 @observable
@@ -130,3 +140,752 @@ def test_init2sub2_raise_count():
     dog1.bark(barks)
     dog2.bark(barks)
     assert barks * 2 == bark_count['value']
+
+
+def test_construct_doesNotEvaluateProperties():
+    # We're going to keep count of the number of times the property is read.
+    reads = {'value': 0}
+
+    @observable
+    class Puppy(Dog):
+        @property
+        def expensive(self):
+            reads['value'] += 1
+            return reads['value']
+
+    # Create a few puppies.
+    for name in ['Fido', 'Rover', 'Spot']:
+        Puppy(name)
+    # Constructing the puppies shouldn't have touched the property.
+    assert reads['value'] == 0
+
+
+def test_subclass_events_discovered():
+    class Puppy(Dog):
+        @event
+        def whined(self):
+            """
+            This event is raised when the puppy whines.
+            """
+    # The subclass inherits the observable initializer, so it should pick up
+    # both its own events and the events it inherited.
+    puppy = Puppy('Spot')
+    whines = {'value': 0}
+
+    def on_whine(sender):
+        assert sender is puppy
+        whines['value'] += 1
+
+    puppy.whined += on_whine
+    puppy.whined()
+    assert whines['value'] == 1
+    assert puppy.barked is not Dog('Fido').barked
+    # The subclass gets its own table; the base class' table is unaffected.
+    assert [name for name, _ in Puppy.__evenz_events__[1]] == [
+        'barked', 'whined'
+    ]
+    assert [name for name, _ in Dog.__evenz_events__[1]] == ['barked']
+
+
+def test_events_created_lazily():
+    dog = Dog('Fido')
+    # The dog shouldn't have an event until somebody asks for it...
+    assert 'barked' not in vars(dog)
+    barked = dog.barked
+    # ...and after that, it should keep the same one.
+    assert vars(dog)['barked'] is barked
+    assert dog.barked is barked
+
+
+@observable
+class SlottedDog(object):
+    """
+    This is a dog that uses slots.
+    """
+    __slots__ = ('name',)
+
+    def __init__(self, name: str):
+        super().__init__()
+        self.name = name
+
+    @event
+    def barked(self, count: int):
+        """
+        This event is raised when the dog barks.
+
+        :param count: how many times did the dog bark?
+        """
+
+
+def test_slots_raise_count():
+    barks = 5
+    dog = SlottedDog('Fido')
+    assert not hasattr(dog, '__dict__')
+    bark_count = {'value': 0}
+
+    def on_bark(sender, count: int):
+        assert sender is dog
+        bark_count['value'] += count
+
+    dog.barked += on_bark
+    dog.barked(barks)
+    dog.barked -= on_bark
+    dog.barked(barks)
+    assert barks == bark_count['value']
+    # Each slotted dog gets its own event.
+    assert SlottedDog('Rover').barked is not dog.barked
+
+
+def test_slots_undecoratedSubclass_raises():
+    class SlottedPuppy(SlottedDog):
+        __slots__ = ()
+
+        @event
+        def whined(self):
+            """
+            This event is raised when the puppy whines.
+            """
+    puppy = SlottedPuppy('Spot')
+    # The inherited event has a slot...
+    assert puppy.barked is puppy.barked
+    # ...but the new one doesn't.
+    try:
+        puppy.whined
+        assert False, 'Expected a TypeError.'
+    except TypeError:
+        pass
+    # Decorating the subclass gives it room for the new event.
+    SlottedPuppy = observable(SlottedPuppy)
+    puppy = SlottedPuppy('Spot')
+    assert puppy.whined is puppy.whined
+
+
+def test_trigger_handlerCounts_callsInOrder():
+    # Try the event with each number of handlers (since each gets its own
+    # dispatch function).
+    for count in range(0, 5):
+        dog = Dog('Fido')
+        calls = []
+        for i in range(0, count):
+            dog.barked += (
+                lambda sender, n, i=i: calls.append((sender.name, n, i))
+            )
+        dog.bark(3)
+        assert calls == [('Fido', 3, i) for i in range(0, count)]
+
+
+def test_trigger_noSender():
+    calls = []
+    e = Event(f=lambda *args, **kwargs: None)
+    e += lambda *args, **kwargs: calls.append((args, kwargs))
+    e.trigger(1, two=2)
+    e(3)
+    assert calls == [((1,), {'two': 2}), ((3,), {})]
+
+
+def test_trigger_afterUnsubscribe_recompiles():
+    calls = []
+    dog = Dog('Fido')
+
+    def first(sender, count: int):
+        calls.append('first')
+
+    def second(sender, count: int):
+        calls.append('second')
+
+    dog.barked += first
+    dog.barked += second
+    dog.bark(1)
+    dog.barked -= first
+    dog.bark(1)
+    assert calls == ['first', 'second', 'second']
+
+
+def test_trigger_reentrantUnsubscribe_usesSnapshot():
+    calls = []
+    dog = Dog('Fido')
+
+    def first(sender, count: int):
+        calls.append('first')
+        # Unsubscribe both handlers while the event is being triggered.
+        dog.barked -= first
+        dog.barked -= second
+
+    def second(sender, count: int):
+        calls.append('second')
+
+    dog.barked += first
+    dog.barked += second
+    # The second handler was subscribed when the trigger started, so it's
+    # still called this time...
+    dog.bark(1)
+    assert calls == ['first', 'second']
+    # ...but not next time.
+    dog.bark(1)
+    assert calls == ['first', 'second']
+
+
+def test_trigger_reentrantSubscribe_usesSnapshot():
+    calls = []
+    dog = Dog('Fido')
+
+    def first(sender, count: int):
+        calls.append('first')
+        dog.barked += second
+
+    def second(sender, count: int):
+        calls.append('second')
+        dog.barked -= second
+
+    dog.barked += first
+    # The second handler wasn't subscribed when the trigger started, so it
+    # isn't called until the next trigger.
+    dog.bark(1)
+    assert calls == ['first']
+    dog.bark(1)
+    assert calls == ['first', 'first', 'second']
+
+
+def test_trigger_reentrantTrigger_seesChanges():
+    calls = []
+    dog = Dog('Fido')
+
+    def first(sender, count: int):
+        calls.append(('first', count))
+        if count:
+            # Subscribe another handler, then trigger the event again from
+            # within this handler.  The nested trigger sees the new handler.
+            dog.barked += second
+            dog.bark(count - 1)
+
+    def second(sender, count: int):
+        calls.append(('second', count))
+
+    dog.barked += first
+    dog.bark(1)
+    assert calls == [('first', 1), ('first', 0), ('second', 0)]
+
+
+def test_subscribe_duplicate_calledOnce():
+    calls = []
+    dog = Dog('Fido')
+
+    def first(sender, count: int):
+        calls.append('first')
+
+    def second(sender, count: int):
+        calls.append('second')
+
+    dog.barked += first
+    dog.barked += second
+    # Subscribing the first handler again doesn't change anything.
+    dog.barked += first
+    dog.bark(1)
+    assert calls == ['first', 'second']
+    # One unsubscription is enough to remove it.
+    dog.barked -= first
+    dog.bark(1)
+    assert calls == ['first', 'second', 'second']
+
+
+def test_unsubscribe_notSubscribed_raises():
+    dog = Dog('Fido')
+    try:
+        dog.barked -= lambda sender, count: None
+        assert False, 'Expected a ValueError.'
+    except ValueError:
+        pass
+
+
+def test_and_or_keepOrder():
+    def a(sender, count): pass
+
+    def b(sender, count): pass
+
+    def c(sender, count): pass
+
+    dog = Dog('Fido')
+    dog.barked += a
+    dog.barked += b
+    # Adding handlers puts the new ones after the existing ones.
+    dog.barked | [c, a]
+    assert list(dog.barked.handlers) == [a, b, c]
+    # Intersecting keeps the existing order.
+    dog.barked & [c, a]
+    assert list(dog.barked.handlers) == [a, c]
+    # The other collection can be another event.
+    other = Dog('Rover')
+    other.barked += c
+    dog.barked & other.barked
+    assert list(dog.barked.handlers) == [c]
+
+
+class Listener(object):
+    """
+    This object listens for barks.
+    """
+    __test__ = False  # Don't test the class.
+
+    def __init__(self):
+        self.barks = 0
+
+    def on_bark(self, sender, count: int):
+        self.barks += count
+
+
+def test_subscribe_weak_doesNotKeepListenerAlive():
+    dog = Dog('Fido')
+    listener = Listener()
+    dog.barked.subscribe(listener.on_bark, weak=True)
+    dog.bark(2)
+    assert listener.barks == 2
+    assert list(dog.barked.handlers) == [listener.on_bark]
+    # Once the listener is gone, so is its handler.
+    listener_ref = weakref.ref(listener)
+    del listener
+    assert listener_ref() is None
+    assert list(dog.barked.handlers) == []
+    dog.bark(2)
+
+
+def test_subscribe_weak_unsubscribe():
+    dog = Dog('Fido')
+    listener = Listener()
+    dog.barked.subscribe(listener.on_bark, weak=True)
+    # Subscribing again (strongly or weakly) doesn't change anything.
+    dog.barked += listener.on_bark
+    dog.bark(2)
+    dog.barked -= listener.on_bark
+    dog.bark(2)
+    assert listener.barks == 2
+    assert list(dog.barked.handlers) == []
+
+
+def test_event_weak_memoryDoesNotGrow():
+    e = Event(f=lambda count: None, weak=True)
+    # Warm up (so one-time allocations don't count).
+    for _ in range(0, 1000):
+        e += Listener().on_bark
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for i in range(0, 20000):
+            # The listener goes away as soon as we subscribe it.
+            e += Listener().on_bark
+            if i % 1000 == 0:
+                e.trigger(1)
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert list(e.handlers) == []
+    assert after - before < 64 * 1024
+
+
+def test_batch_deliversBatchesAndIndividualCalls():
+    counts = []
+    batches = []
+
+    def on_bark(sender, count: int):
+        counts.append(count)
+
+    @batch_handler
+    def on_barks(sender, batch: Batch):
+        assert sender is dog
+        batches.append(batch.columns())
+
+    dog = Dog('Fido')
+    dog.barked += on_bark
+    dog.barked += on_barks
+    with dog.barked.batch():
+        for i in range(0, 5):
+            dog.bark(i)
+        # Nothing is delivered until the batch is done.
+        assert counts == [] and batches == []
+    assert counts == [0, 1, 2, 3, 4]
+    assert batches == [((0, 1, 2, 3, 4),)]
+    # Outside of a batch, the batch handler gets batches of one.
+    dog.bark(5)
+    assert counts == [0, 1, 2, 3, 4, 5]
+    assert batches == [((0, 1, 2, 3, 4),), ((5,),)]
+
+
+def test_batch_maxSize_flushes():
+    batches = []
+    e = Event(f=lambda x: None)
+    e.subscribe(lambda batch: batches.append(list(batch)), batch=True)
+    with e.batch(max_size=2):
+        for i in range(0, 5):
+            e(i)
+        # Subscribing in the middle of a batch doesn't stop it.
+        e += lambda x: None
+        assert batches == [[(0,), (1,)], [(2,), (3,)]]
+    assert batches == [[(0,), (1,)], [(2,), (3,)], [(4,)]]
+
+
+def test_batch_nested_raises():
+    e = Event(f=lambda x: None)
+    with e.batch():
+        try:
+            with e.batch():
+                pass
+            assert False, 'Expected a RuntimeError.'
+        except RuntimeError:
+            pass
+
+
+def test_batch_extend():
+    batches = []
+    e = Event(f=lambda x, y: None)
+    e.subscribe(lambda batch: batches.append(batch.columns()), batch=True)
+    with e.batch() as batch:
+        batch.extend([(1, 'a'), (2, 'b')])
+        e.trigger(3, 'c')
+    assert batches == [((1, 2, 3), ('a', 'b', 'c'))]
+
+
+def test_classSubscription_firesForEveryInstance():
+    calls = []
+
+    def on_any_bark(sender, count: int):
+        calls.append((sender.name, count))
+
+    def on_fido_bark(sender, count: int):
+        calls.append(('fido only', count))
+
+    class Kennel(Dog):
+        pass
+
+    fido = Kennel('Fido')
+    # Fido's event exists (and has compiled its handlers) before we subscribe
+    # to the class.
+    fido.barked += on_fido_bark
+    fido.bark(1)
+    Kennel.barked += on_any_bark
+    # The class keeps the same event.
+    assert isinstance(Kennel.barked, Event)
+    assert Kennel.barked is Kennel.barked
+    rover = Kennel('Rover')
+    fido.bark(2)
+    rover.bark(3)
+    # The instance's handlers are called first, then the class' handlers.
+    assert calls == [
+        ('fido only', 1), ('fido only', 2), ('Fido', 2), ('Rover', 3)
+    ]
+    # Instances of the base class aren't affected...
+    Dog('Spot').bark(4)
+    assert calls[-1] == ('Rover', 3)
+    Kennel.barked -= on_any_bark
+    fido.bark(5)
+    assert calls[-1] == ('fido only', 5)
+
+
+def test_classSubscription_keepsTheMethodsDocumentation():
+    # (Sphinx documents the class' events through the class-level events.)
+    assert Dog.barked.__doc__.startswith('⚡ :py:class:`evenz.events.Event`')
+    assert 'This event is raised when the dog barks.' in Dog.barked.__doc__
+    assert Dog.barked.__name__ == 'barked'
+    assert Dog.barked.__qualname__ == 'Dog.barked'
+    assert inspect.signature(Dog.barked).parameters['count'].annotation is int
+
+
+def test_classSubscription_inheritedBySubclasses():
+    calls = []
+
+    @observable
+    class Hound(object):
+        @event
+        def howled(self, volume: int):
+            """
+            This event is raised when the hound howls.
+            """
+
+    class Beagle(Hound):
+        pass
+
+    def on_hound(sender, volume: int):
+        calls.append(('hound', type(sender).__name__))
+
+    def on_beagle(sender, volume: int):
+        calls.append(('beagle', type(sender).__name__))
+
+    beagle = Beagle()
+    beagle.howled(1)
+    Hound.howled += on_hound
+    Beagle.howled += on_beagle
+    beagle.howled(1)
+    Hound().howled(1)
+    # The subclass' own handlers come before the ones it inherited.
+    assert calls == [
+        ('beagle', 'Beagle'), ('hound', 'Beagle'), ('hound', 'Hound')
+    ]
+
+
+class Change(NamedTuple):
+    """
+    These are the arguments for a change.
+    """
+    kind: str
+    table: str
+
+
+def test_subscribe_where_callsMatchingHandlers():
+    calls = []
+
+    @event
+    def changed(args: Change):
+        """
+        This event is raised when something changes.
+        """
+
+    changed.event.subscribe(lambda args: calls.append(('any', args.kind)))
+    changed.event.subscribe(
+        lambda args: calls.append(('insert', args.kind)),
+        where={'kind': 'insert'}
+    )
+    changed.event.subscribe(
+        lambda args: calls.append(('write', args.kind)),
+        where={'kind': {'insert', 'update'}}
+    )
+    changed.event.subscribe(
+        lambda args: calls.append(('users', args.kind)),
+        where={'kind': ['delete'], 'table': 'users'}
+    )
+    changed(Change('insert', 'users'))
+    changed(Change('update', 'users'))
+    changed(Change('delete', 'users'))
+    changed(Change('delete', 'groups'))
+    assert calls == [
+        ('any', 'insert'), ('insert', 'insert'), ('write', 'insert'),
+        ('any', 'update'), ('write', 'update'),
+        ('any', 'delete'), ('users', 'delete'),
+        ('any', 'delete')
+    ]
+    with pytest.raises(ValueError):
+        changed.event.subscribe(
+            lambda batch_: None, batch=True, where={'kind': 1}
+        )
+
+
+def test_subscribe_where_observable():
+    calls = []
+
+    @observable
+    class Table(object):
+        @event
+        def changed(self, args: Change):
+            """
+            This event is raised when the table changes.
+            """
+
+    users = Table()
+    users.changed.subscribe(
+        lambda sender, args: calls.append(('instance', args.kind)),
+        where={'kind': 'insert'}
+    )
+    Table.changed.subscribe(
+        lambda sender, args: calls.append(('class', args.kind)),
+        where={'kind': 'update'}
+    )
+    users.changed(Change('insert', 'users'))
+    users.changed(Change('update', 'users'))
+    users.changed(Change('delete', 'users'))
+    assert calls == [('instance', 'insert'), ('class', 'update')]
+
+
+def test_subscribe_priority_stop():
+    calls = []
+    cache = {'fido': 'woof'}
+
+    @event
+    def looked_up(key: str):
+        """
+        This event is raised to look something up.
+        """
+
+    def from_database(key: str):
+        calls.append(('database', key))
+
+    def from_cache(key: str):
+        if key in cache:
+            calls.append(('cache', key))
+            return STOP
+        return None
+
+    def audit(key: str):
+        calls.append(('audit', key))
+
+    looked_up.event.subscribe(from_database)
+    looked_up.event.subscribe(audit, priority=-1)
+    looked_up.event.subscribe(from_cache, priority=10)
+    assert list(looked_up.event.handlers) == [from_cache, from_database, audit]
+    assert looked_up('fido') is STOP
+    looked_up('rex')
+    assert calls == [
+        ('cache', 'fido'), ('database', 'rex'), ('audit', 'rex')
+    ]
+    # Unsubscribing (and subscribing again) forgets the priority.
+    looked_up.event -= from_cache
+    looked_up.event += from_cache
+    assert list(looked_up.event.handlers) == [from_database, from_cache, audit]
+
+
+def test_stop_skipsClassHandlers():
+    calls = []
+
+    @observable
+    class Door(object):
+        @event
+        def opened(self):
+            """
+            This event is raised when the door opens.
+            """
+
+    Door.opened += lambda sender: calls.append('class')
+    door = Door()
+    door.opened += lambda sender: STOP
+    door.opened()
+    Door().opened()
+    assert calls == ['class']
+
+
+def test_results_lazy_first_reduce():
+    calls = []
+
+    @event
+    def asked(question: str):
+        """
+        This event is raised to ask the handlers a question.
+        """
+
+    def nobody(question: str):
+        calls.append('nobody')
+
+    def somebody(question: str):
+        calls.append('somebody')
+        return 2
+
+    def everybody(question: str):
+        calls.append('everybody')
+        return 3
+
+    for h in (nobody, somebody, everybody):
+        asked.event += h
+    results = asked.results('why?')
+    assert calls == []  # Nothing has been called yet.
+    assert next(results) is None
+    assert calls == ['nobody']
+    assert list(results) == [2, 3]
+    del calls[:]
+    assert asked.first('why?') == 2
+    assert calls == ['nobody', 'somebody']  # 'everybody' wasn't asked.
+    assert asked.reduce(lambda a, b: (a or 0) + b, 'why?') == 5
+    asked.event.subscribe(lambda question: STOP, priority=1)
+    assert asked.first('why?') is None
+    assert list(asked.results('why?')) == []
+
+
+def test_results_observable():
+
+    @observable
+    class Pet(object):
+        @event
+        def asked(self, question: str):
+            """
+            This event is raised to ask the pet a question.
+            """
+
+    Pet.asked += lambda sender, question: 'class'
+    pet = Pet()
+    pet.asked += lambda sender, question: sender
+    pet.asked.subscribe(
+        lambda sender, question: 'filtered', where={'upper': 'never'}
+    )
+    assert list(pet.asked.results('sit')) == [pet, 'class']
+    assert Pet().asked.first('sit') == 'class'
+
+
+def test_document_listsModuleEvents():
+    module_ = types.ModuleType('kennel', 'This is the kennel.')
+
+    def fed(dog: str):
+        """
+        This event is raised when a dog is fed.
+        """
+
+    fed.__module__ = 'kennel'
+    module_.fed = event(fed)
+    # Decorating the function didn't touch the module...
+    assert module_.__doc__ == 'This is the kennel.'
+    # ...until we ask.
+    expected = (
+        'This is the kennel.\n'
+        '⚡ :py:class:`evenz.events.Event` :py:func:`fed`'
+    )
+    assert document(module_) == expected
+    assert document(module_) == expected
+
+
+def test_subscribe_where_priority():
+    calls = []
+
+    @event
+    def changed(args: Change):
+        """
+        This event is raised when something changes.
+        """
+
+    changed.event.subscribe(lambda args: calls.append('low'), priority=-1)
+    changed.event.subscribe(
+        lambda args: calls.append('filtered'),
+        where={'kind': 'insert'}, priority=1
+    )
+    changed.event.subscribe(lambda args: calls.append('plain'))
+    changed.event.subscribe(
+        lambda args: calls.append('late'), where={'kind': 'insert'}
+    )
+    changed(Change('insert', 'users'))
+    # Filtered handlers are called in the order of their priorities, too.
+    assert calls == ['filtered', 'plain', 'late', 'low']
+    calls.clear()
+    changed.event.subscribe(lambda args: STOP, where={'kind': 'insert'},
+                            priority=2)
+    changed(Change('insert', 'users'))
+    assert calls == []
+    calls.clear()
+    changed(Change('delete', 'users'))
+    assert calls == ['plain', 'low']
+
+
+def test_trigger_returnsOnlyStop():
+
+    @event
+    def asked(question: str):
+        """
+        This event is raised when somebody asks a question.
+        """
+
+    # However many handlers there are, their results stay with them...
+    for i in range(4):
+        assert asked('why?') is None
+        asked.event.subscribe(lambda question, i=i: f'h{i}')
+    # ...unless one of them stops the others.
+    asked.event.subscribe(lambda question: STOP)
+    assert asked('why?') is STOP
+    assert asked.event.trigger('why?') is STOP
+
+
+def test_subscribe_where_unhashableValue():
+    calls = []
+    e = Event(f=lambda args: None)
+    e.subscribe(lambda args: calls.append('insert'), where={'kind': 'insert'})
+    e.subscribe(
+        lambda args: calls.append('users'),
+        where={'table': 'users', 'kind': 'insert'}
+    )
+    e.subscribe(lambda args: calls.append('any'))
+    e.subscribe(lambda args: calls.append('last'), priority=-1)
+    # A value that can't be hashed doesn't match (and doesn't stop the
+    # trigger).
+    e.trigger(Change(['insert'], 'users'))
+    e.trigger(Change('insert', ['users']))
+    assert calls == ['any', 'last', 'any', 'insert', 'last']
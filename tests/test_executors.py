@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+import time
+
+from evenz.errors import HandlerErrors
+from evenz.events import Event, observable, event
+from evenz.executors import Dispatch
+
+
+@observable(executor='thread')
+class Mailbox(object):
+    """
+    This mailbox lets us know when mail arrives.
+    """
+
+    __test__ = False  # Don't test the class.
+
+    @event
+    def delivered(self, letter: str):
+        """
+        This event is raised when a letter is delivered.
+
+        :param letter: the letter
+        """
+
+
+@observable(executor='process')
+class Job(object):
+    """
+    This job's handlers run in other processes.
+    """
+
+    __test__ = False  # Don't test the class.
+
+    def __init__(self, name: str):
+        self.name = name
+
+    @event
+    def done(self, result: int):
+        """
+        This event is raised when the job is done.
+
+        :param result: the result
+        """
+
+
+def describe(job: Job, result: int) -> tuple:
+    """
+    This handler tells us what it received (and where).
+    """
+    return job.name, result, os.getpid()
+
+
+def square(x: int) -> int:
+    """
+    This handler runs in another process.
+    """
+    return x * x
+
+
+def pid(x: int) -> int:
+    """
+    This handler tells us which process it ran in.
+    """
+    return os.getpid()
+
+
+def test_trigger_threadExecutor_runsConcurrently():
+    threads = set()
+
+    def slow(sender, letter: str):
+        threads.add(threading.get_ident())
+        time.sleep(0.1)
+        return letter.upper()
+
+    mailbox = Mailbox()
+    for _ in range(0, 4):
+        # (Each handler has to be a distinct function.)
+        mailbox.delivered += lambda sender, letter: slow(sender, letter)
+    start = time.perf_counter()
+    dispatch = mailbox.delivered('hello')
+    # The emitter doesn't wait for the handlers...
+    assert time.perf_counter() - start < 0.05
+    assert isinstance(dispatch, Dispatch)
+    # ...but we can.
+    assert dispatch.result(timeout=5) == ['HELLO'] * 4
+    assert time.perf_counter() - start < 0.35
+    assert threading.get_ident() not in threads
+
+
+def test_trigger_executorErrors_collected():
+    def fails(letter: str):
+        raise KeyError(letter)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        e = Event(f=lambda letter: None, executor=pool)
+        e += fails
+        e += lambda letter: letter
+        dispatch = e.trigger('x')
+        assert dispatch.wait(timeout=5)
+        assert dispatch.done()
+        try:
+            dispatch.result()
+            assert False, 'Expected HandlerErrors.'
+        except HandlerErrors as errors:
+            assert [type(ex) for ex in errors.errors] == [KeyError]
+
+
+def test_trigger_processExecutor():
+    e = Event(f=square, executor='process')
+    e += square
+    e += pid
+    results = e.trigger(7).result(timeout=30)
+    assert results[0] == 49
+    assert results[1] != os.getpid()
+
+
+def test_trigger_processExecutor_observable():
+    job = Job('build')
+    job.done += describe
+    Job.done += describe
+    try:
+        results = job.done(42).result(timeout=30)
+        assert [r[:2] for r in results] == [('build', 42)] * 2
+        assert all(r[2] != os.getpid() for r in results)
+    finally:
+        Job.done -= describe
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+from typing import NamedTuple
+
+import pytest
+
+from evenz.events import observable, event
+from evenz.journal import ALWAYS, Journal, StructCodec
+
+
+class Fed(NamedTuple):
+    """
+    These are the arguments for feeding a dog.
+    """
+    food: str
+    grams: int
+
+
+@observable
+class Dog(object):
+    """
+    This dog gets fed.
+    """
+
+    __test__ = False  # Don't test the class.
+
+    def __init__(self, name: str):
+        self.name = name
+
+    @event
+    def fed(self, args: Fed):
+        """
+        This event is raised when the dog is fed.
+        """
+
+
+def test_journal_recordsAndReplays(tmp_path):
+    kennel = {name: Dog(name) for name in ('fido', 'rex')}
+    with Journal(tmp_path) as journal:
+        journal.attach(Dog, key=lambda dog: dog.name)
+        kennel['fido'].fed(Fed('kibble', 100))
+        kennel['rex'].fed(Fed('bones', 200))
+        records = list(journal.records())
+    assert [(r.channel, r.key, r.args) for r in records] == [
+        ('Dog.fed', 'fido', (Fed('kibble', 100),)),
+        ('Dog.fed', 'rex', (Fed('bones', 200),))
+    ]
+    # Later (with new dogs)...
+    kennel = {name: Dog(name) for name in ('fido', 'rex')}
+    replayed = []
+    Dog.fed += lambda sender, args: replayed.append((sender.name, args))
+    with Journal(tmp_path) as journal:
+        journal.attach(Dog, key=lambda dog: dog.name)
+        assert journal.replay(Dog, resolve=kennel.__getitem__) == 2
+        # The replayed triggers weren't recorded again.
+        assert len(list(journal.records())) == 2
+    assert replayed == [
+        ('fido', Fed('kibble', 100)), ('rex', Fed('bones', 200))
+    ]
+
+
+def test_journal_segmentsAndStructCodec(tmp_path):
+
+    @event
+    def moved(x: float, y: float):
+        """
+        This event is raised when something moves.
+        """
+
+    # The segments are small, so the journal needs several of them.
+    with Journal(tmp_path, segment_size=4096, sync=ALWAYS) as journal:
+        journal.attach(moved, codec=StructCodec('dd'))
+        for i in range(1000):
+            moved(float(i), -float(i))
+    assert len(list(tmp_path.glob('*.evz'))) > 1
+    received = []
+    moved.event += lambda x, y: received.append((x, y))
+    with Journal(tmp_path) as journal:
+        journal.replay(moved)
+    assert received == [(float(i), -float(i)) for i in range(1000)]
+
+
+def test_journal_ignoresIncompleteRecord(tmp_path):
+
+    @event
+    def ticked(n: int):
+        """
+        This event is raised when the clock ticks.
+        """
+
+    with Journal(tmp_path) as journal:
+        journal.attach(ticked)
+        for n in range(3):
+            ticked(n)
+    # Damage the last record (as if the process died while writing it).
+    path, = tmp_path.glob('*.evz')
+    data = bytearray(path.read_bytes())
+    end = data.rstrip(b'\0')
+    data[len(end) - 1] ^= 0xff
+    path.write_bytes(bytes(data))
+    with Journal(tmp_path) as journal:
+        assert [r.args for r in journal.records()] == [(0,), (1,)]
+        journal.attach(ticked)
+        ticked(3)
+        assert [r.args for r in journal.records()] == [(0,), (1,), (3,)]
+
+
+def test_journal_instanceEventAfterRestart(tmp_path):
+    with Journal(tmp_path) as journal:
+        fido = Dog('fido')
+        journal.attach(fido.fed)
+        fido.fed(Fed('kibble', 100))
+        # The channel is named like the class' event (not after the instance).
+        assert [r.channel for r in journal.records()] == ['Dog.fed']
+    # After a restart, the new instance's event finds the channel again.
+    fido = Dog('fido')
+    replayed = []
+    fido.fed += lambda sender, args: replayed.append(args)
+    with Journal(tmp_path) as journal:
+        assert journal.replay(fido.fed) == 1
+    assert replayed == [Fed('kibble', 100)]
+
+
+def test_journal_recordsOtherThreadsDuringReplay(tmp_path):
+    with Journal(tmp_path) as journal:
+        journal.attach(Dog, key=lambda dog: dog.name)
+        Dog('fido').fed(Fed('kibble', 100))
+    rex = Dog('rex')
+
+    def feed(sender, args):
+        # While the replay is going on, another thread feeds rex.
+        if sender is rex:
+            return
+        thread = threading.Thread(target=rex.fed, args=(Fed('bones', 1),))
+        thread.start()
+        thread.join()
+
+    Dog.fed += feed
+    try:
+        with Journal(tmp_path) as journal:
+            journal.attach(Dog, key=lambda dog: dog.name)
+            assert journal.replay(Dog, resolve=Dog) == 1
+            # The other thread's trigger was recorded (and the replayed one
+            # wasn't).
+            assert [r.key for r in journal.records()] == ['fido', 'rex']
+    finally:
+        Dog.fed -= feed
+
+
+def test_journal_keyNeedsASender(tmp_path):
+
+    @event
+    def walked(minutes: int):
+        """
+        This event is raised when somebody walks the dog.
+        """
+
+    with Journal(tmp_path) as journal:
+        with pytest.raises(ValueError):
+            journal.attach(walked, key=lambda sender: sender)
+        # Nothing was attached.
+        walked(10)
+        assert list(journal.records()) == []
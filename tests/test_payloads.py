@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from evenz.events import Batch, batch_handler, event
+from evenz.payloads import Columns, Pool, record
+
+Moved = record('Moved', 'x', 'y')
+
+
+def test_record():
+    moved = Moved(1.0, y=2.0)
+    assert (moved.x, moved.y) == (1.0, 2.0)
+    assert tuple(moved) == (1.0, 2.0)
+    assert moved == Moved(1.0, 2.0) and moved != Moved(1.0, 3.0)
+    assert repr(moved) == 'Moved(x=1.0, y=2.0)'
+    assert not hasattr(moved, '__dict__')
+    with pytest.raises(AttributeError):
+        moved.z = 3.0
+    with pytest.raises(ValueError):
+        record('Bad', 'x', 'x')
+    with pytest.raises(ValueError):
+        record('Bad', 'class')
+
+
+def test_pool_recyclesRecords():
+    received = []
+
+    @event
+    def moved(args: Moved):
+        """
+        This event is raised when something moves.
+        """
+
+    moved.event += lambda args: received.append((args, args.copy()))
+    pool = Pool(Moved)
+    pool.fire(moved, 1.0, 2.0)
+    pool.fire(moved, 3.0, 4.0)
+    # Both triggers got the same record (so the handler kept copies).
+    assert received[0][0] is received[1][0]
+    assert [c for _, c in received] == [Moved(1.0, 2.0), Moved(3.0, 4.0)]
+
+
+def test_batch_columns():
+    calls = []
+    batches = []
+
+    @event
+    def moved(x: float, y: float):
+        """
+        This event is raised when something moves.
+        """
+
+    moved.event += lambda x, y: calls.append((x, y))
+
+    @batch_handler
+    def on_batch(batch_: Columns):
+        batches.append((
+            batch_.column('x').tolist(), [c.tolist() for c in batch_.columns()]
+        ))
+
+    moved.event += on_batch
+    with moved.event.batch(columns={'x': 'd', 'y': 'd'}) as batcher:
+        moved(1.0, 2.0)
+        batcher.extend([(3.0, 4.0)])
+    assert calls == [(1.0, 2.0), (3.0, 4.0)]
+    assert batches == [([1.0, 3.0], [[1.0, 3.0], [2.0, 4.0]])]
+    # Outside of a batch, the batch handler gets an ordinary batch of one.
+    moved.event -= on_batch
+    moved.event.subscribe(lambda batch_: batches.append(batch_), batch=True)
+    moved(5.0, 6.0)
+    assert batches[-1] == Batch([(5.0, 6.0)])
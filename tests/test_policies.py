@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import time
+
+from evenz.events import Event, observable, event
+from evenz.policies import ASYNCIO, Coalesce, Debounce, Throttle
+
+
+@observable
+class Download(object):
+    """
+    This download reports its progress.
+    """
+
+    __test__ = False  # Don't test the class.
+
+    def __init__(self):
+        self.reported = []
+
+    @event(policy=Coalesce(60))
+    def progressed(self, percent: float):
+        """
+        This event is raised as the download progresses.
+
+        :param percent: how much of the download is done?
+        """
+        self.reported.append(percent)
+
+
+def test_coalesce_thread_deliversLatest():
+    received = []
+    e = Event(f=lambda value: None, policy=Coalesce(0.05))
+    e += received.append
+    for i in range(0, 100):
+        e(i)
+    assert received == []
+    time.sleep(0.3)
+    assert received == [99]
+
+
+def test_event_policy_flush():
+    received = []
+    download = Download()
+    download.progressed += lambda sender, percent: received.append(percent)
+    for percent in (10.0, 20.0, 30.0):
+        download.progressed(percent)
+    # The event's own function is still called every time...
+    assert download.reported == [10.0, 20.0, 30.0]
+    # ...but the handlers only get the latest value (and only when it's
+    # delivered).
+    assert received == []
+    download.progressed.flush()
+    assert received == [30.0]
+    # Each instance gets its own policy state.
+    assert Download().progressed._gate is not download.progressed._gate
+
+
+def test_debounce_asyncio_waitsForQuiet():
+    received = []
+
+    async def main():
+        e = Event(f=lambda value: None, policy=Debounce(0.05, 'asyncio'))
+        e += received.append
+        for i in range(0, 5):
+            e(i)
+            await asyncio.sleep(0.01)
+        # The event hasn't been quiet for long enough yet.
+        assert received == []
+        await asyncio.sleep(0.15)
+        assert received == [4]
+
+    asyncio.run(main())
+
+
+def test_throttle_asyncio_deliversAtMostOncePerInterval():
+    received = []
+
+    async def main():
+        e = Event(f=lambda value: None, policy=Throttle(0.1, 'asyncio'))
+        e += received.append
+        # The first trigger is delivered right away...
+        e(0)
+        assert received == [0]
+        # ...but the next ones have to wait until the end of the interval
+        # (and only the latest one is delivered).
+        e(1)
+        e(2)
+        assert received == [0]
+        await asyncio.sleep(0.2)
+        assert received == [0, 2]
+
+    asyncio.run(main())
+
+
+def test_coalesce_asyncEvent_deliversLatest():
+    received = []
+
+    @event(policy=Coalesce(0.05, ASYNCIO))
+    async def moved(position: int):
+        """
+        This event is raised when something moves.
+        """
+
+    moved.event.subscribe(received.append)
+
+    async def main():
+        for i in range(0, 5):
+            await moved(i)
+        assert received == []
+        await asyncio.sleep(0.15)
+        assert received == [4]
+
+    asyncio.run(main())
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import time
+
+from evenz.events import observable, event
+from evenz.profiling import Profiler
+
+
+@observable
+class Kennel(object):
+    """
+    This kennel reports when the dogs are fed.
+    """
+
+    __test__ = False  # Don't test the class.
+
+    @event
+    def fed(self, dog: str):
+        """
+        This event is raised when a dog is fed.
+        """
+
+
+def test_profiler_countsAndTimes():
+    slow = []
+
+    def quick(sender, dog: str):
+        pass
+
+    def sluggish(sender, dog: str):
+        time.sleep(0.005)
+
+    def on_any(sender, dog: str):
+        pass
+
+    kennel = Kennel()
+    kennel.fed += quick
+    kennel.fed += sluggish
+    kennel.fed('rex')  # This trigger isn't watched.
+    Kennel.fed += on_any
+    with Profiler(
+            Kennel,
+            budget=0.002,
+            on_slow=lambda *args: slow.append(args[:2])
+    ) as profiler:
+        kennel.fed('fido')
+        kennel.fed('spot')
+        Kennel().fed('rover')
+    kennel.fed('max')  # Neither is this one.
+    stats = profiler.snapshot()['Kennel.fed']
+    assert stats.fires == 3
+    calls = {h.handler.split('.')[-1]: h.calls for h in stats.handlers}
+    assert calls == {'quick': 2, 'sluggish': 2, 'on_any': 3}
+    assert slow == [('Kennel.fed', sluggish.__qualname__)] * 2
+    slowest = profiler.slowest(n=1)[0]
+    assert slowest.handler == sluggish.__qualname__ and slowest.slow == 2
+    assert 0.005 <= slowest.percentile(99) <= slowest.max
+    # After the profiler is done, the events are back to normal.
+    assert 'counting' not in repr(kennel.fed.trigger)
+    Kennel.fed -= on_any
+
+
+def test_profiler_functionEvents():
+
+    @event
+    def tick():
+        """
+        This event is raised when the clock ticks.
+        """
+
+    tick.event += lambda: None
+    profiler = Profiler().watch(tick)
+    tick()
+    tick()
+    stats, = profiler.snapshot().values()
+    assert stats.fires == 2 and stats.handlers[0].calls == 2
+    profiler.reset()
+    tick()
+    stats, = profiler.snapshot().values()
+    assert stats.fires == 1 and stats.handlers[0].calls == 1
+    profiler.unwatch()
+    tick()
+    assert profiler.snapshot()[stats.event].fires == 1
+
+
+def test_profiler_handlersWithTheSameName():
+
+    def counter(n: int):
+        # Every handler this returns has the same name.
+        def handler(sender, dog: str):
+            time.sleep(0.001 * n)
+        return handler
+
+    kennel = Kennel()
+    handlers = [counter(0), counter(1)]
+    for h in handlers:
+        kennel.fed += h
+    kennel.fed += lambda sender, dog: None
+    kennel.fed += lambda sender, dog: None
+    with Profiler(Kennel) as profiler:
+        kennel.fed('fido')
+        kennel.fed -= handlers[0]
+        kennel.fed('spot')
+    stats = profiler.snapshot()['Kennel.fed']
+    # Each handler has its own timings (even though the names are shared).
+    assert len(stats.handlers) == 4
+    assert sorted(h.calls for h in stats.handlers) == [1, 2, 2, 2]
+    assert len({h.handler for h in stats.handlers}) == 2
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import threading
+
+import pytest
+
+from evenz.events import Event, observable, event
+from evenz.queues import BLOCK, COALESCE, DROP_NEWEST, DROP_OLDEST
+
+
+@observable
+class Dog(object):
+    """
+    This dog barks.
+    """
+
+    __test__ = False  # Don't test the class.
+
+    def __init__(self, name: str):
+        self.name = name
+
+    @event
+    def barked(self, count: int):
+        """
+        This event is raised when the dog barks.
+        """
+
+
+@pytest.mark.parametrize('overflow, expected, dropped, coalesced', [
+    (DROP_OLDEST, [6, 7, 8, 9], 6, 0),
+    (DROP_NEWEST, [0, 1, 2, 3], 6, 0),
+    (COALESCE, [0, 1, 2, 9], 0, 6),
+])
+def test_queued_overflow(overflow, expected, dropped, coalesced):
+    e = Event(f=lambda x: None)
+    received = []
+    queue = e.queued(received.append, capacity=4, overflow=overflow)
+    for i in range(10):
+        e.trigger(i)
+    stats = queue.stats()
+    assert (stats.depth, stats.high_water, stats.enqueued) == (4, 4, 10)
+    assert (stats.dropped, stats.coalesced) == (dropped, coalesced)
+    assert queue.drain() == 4
+    assert received == expected
+    assert queue.stats().delivered == 4
+
+
+def test_queued_coalesceByKey():
+    e = Event(f=lambda kind, value: None)
+    received = []
+    queue = e.queued(
+        lambda kind, value: received.append((kind, value)),
+        overflow=COALESCE, key=lambda kind, value: kind
+    )
+    for i in range(3):
+        e.trigger('x', i)
+        e.trigger('y', i)
+    queue.drain()
+    assert received == [('x', 2), ('y', 2)]
+    # Once a trigger is taken out, the next one with its key is queued.
+    e.trigger('x', 3)
+    queue.drain()
+    assert received[-1] == ('x', 3)
+
+
+def test_queued_blockWaitsForTheConsumerThread():
+    dog = Dog('fido')
+    gate = threading.Event()
+    received = []
+
+    def slow(sender: Dog, count: int):
+        gate.wait()
+        received.append(count)
+    with Dog.barked.queued(slow, capacity=2, overflow=BLOCK) as queue:
+        queue.start()
+        done = threading.Event()
+
+        def bark():
+            for i in range(10):
+                dog.barked(i)
+            done.set()
+        threading.Thread(target=bark).start()
+        # The consumer can't keep up, so the dog has to wait...
+        assert not done.wait(0.2)
+        assert queue.depth == 2
+        # ...until it catches up.
+        gate.set()
+        assert done.wait(5)
+    # Closing the queue waits for the consumer to pass what's left.
+    assert received == list(range(10))
+    assert queue.stats().high_water == 2
+    # ...and unsubscribes it.
+    dog.barked(10)
+    assert received == list(range(10))
+
+
+def test_queued_consumeOnTheEventLoop():
+    e = Event(f=lambda x: None)
+    received = []
+
+    async def handler(x: int):
+        await asyncio.sleep(0)
+        received.append(x)
+
+    async def run():
+        queue = e.queued(handler, capacity=8, overflow=DROP_NEWEST)
+        consumer = asyncio.create_task(queue.consume())
+        for i in range(5):
+            e.trigger(i)
+            await asyncio.sleep(0)
+        # Triggers from other threads wake the consumer too.
+        thread = threading.Thread(target=e.trigger, args=(5,))
+        thread.start()
+        thread.join()
+        await asyncio.sleep(0.05)
+        queue.close()
+        await asyncio.wait_for(consumer, 5)
+    asyncio.run(run())
+    assert received == list(range(6))
+
+
+def test_queued_handlerErrorsAreCounted():
+    e = Event(f=lambda x: None)
+    errors = []
+
+    def fail(x: int):
+        raise ValueError(x)
+    queue = e.queued(fail, on_error=errors.append)
+    e.trigger(1)
+    queue.drain()
+    assert queue.stats().errors == 1
+    assert isinstance(errors[0], ValueError)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from evenz.events import Event, observable, event
+from evenz.streams import merge
+
+
+@observable
+class Dog(object):
+    """
+    This dog barks.
+    """
+
+    __test__ = False  # Don't test the class.
+
+    def __init__(self, name: str):
+        self.name = name
+
+    @event
+    def barked(self, count: int):
+        """
+        This event is raised when the dog barks.
+        """
+
+
+@event
+def measured(x: float, y: float):
+    """
+    This event is raised when something is measured.
+    """
+
+
+def test_stream_mapFilterWindow():
+    e = Event(f=lambda x: None)
+    received = []
+    e.stream().filter(lambda x: x % 2 == 0).map(lambda x: x * 10).window(
+        3
+    ).subscribe(received.append)
+    for i in range(14):
+        e.trigger(i)
+    assert received == [(0, 20, 40), (60, 80, 100)]
+
+
+def test_stream_fusedIntoOneHandler():
+    e = Event(f=lambda x: None)
+    received = []
+    stream = e.stream().map(lambda x: x + 1).filter(bool).map(str)
+    stream += received.append
+    # However many operators there are, the event has a single handler.
+    assert len(e.snapshot()) == 1
+    e.trigger(-1)
+    e.trigger(1)
+    assert received == ['2']
+    stream -= received.append
+    assert not e.snapshot()
+
+
+def test_stream_slidingWindowAndScan():
+    e = Event(f=lambda x: None)
+    windows = []
+    totals = []
+    e.stream().window(3, step=1).subscribe(windows.append)
+    e.stream().scan(lambda total, x: total + x, 0).subscribe(totals.append)
+    for i in range(5):
+        e.trigger(i)
+    assert windows == [(0, 1, 2), (1, 2, 3), (2, 3, 4)]
+    assert totals == [0, 1, 3, 6, 10]
+
+
+def test_stream_mergeAndZip():
+    fido, rex = Dog('fido'), Dog('rex')
+    merged = []
+    zipped = []
+    # (The dogs' events pass their senders to their handlers, but the streams
+    # leave them out.)
+    merge(
+        fido.barked.stream().map(lambda n: n * 10), rex.barked
+    ).subscribe(merged.append)
+    fido.barked.stream().zip(rex.barked.stream()).map(sum).subscribe(
+        zipped.append
+    )
+    fido.barked(1)
+    fido.barked(2)
+    rex.barked(10)
+    assert merged == [10, 20, 10]
+    assert zipped == [11]
+
+
+def test_stream_classLevelEventIncludesSender():
+    fido = Dog('fido')
+    received = []
+    stream = Dog.barked.stream().filter(lambda sender_n: sender_n[1] > 1)
+    stream += received.append
+    try:
+        fido.barked(1)
+        fido.barked(count=2)
+        assert received == [(fido, 2)]
+    finally:
+        stream -= received.append
+
+
+def test_stream_multipleArguments():
+    received = []
+    measured.stream().map(lambda xy: xy[0] * xy[1]).subscribe(received.append)
+    measured(2.0, 3.0)
+    assert received == [6.0]
+    # A trigger without arguments has no value.
+    ticked = Event(f=lambda: None)
+    ticks = []
+    ticked.stream().subscribe(ticks.append)
+    ticked.trigger()
+    assert ticks == [None]
+    # Keyword arguments go where the event's parameters say they go.
+    received.clear()
+    measured(y=3.0, x=4.0)
+    measured(1.0, y=5.0)
+    assert received == [12.0, 5.0]
+    fido = Dog('fido')
+    counts = []
+    fido.barked.stream().subscribe(counts.append)
+    fido.barked(count=3)
+    assert counts == [3]
+
+
+def test_stream_parameterNamedValue():
+    e = Event(f=lambda value=None, other=None: None)
+    received = []
+    e.stream().window(2).subscribe(received.append)
+    e.trigger(other=5)
+    e.trigger(1, 2)
+    e.trigger(value=3)
+    e.trigger(value=4)
+    # The arguments that weren't supplied are left out of the values.
+    assert received == [(5, (1, 2)), (3, 4)]
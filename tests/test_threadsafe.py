@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import itertools
+import sys
+import threading
+
+from evenz.events import Event, observable, event
+
+EMITTERS = 4
+FIRES = 25000  # per emitter
+
+
+def test_threadsafe_noLostOrDuplicateDeliveries():
+    e = Event(f=lambda n: None, threadsafe=True)
+    stable = []
+    e.subscribe(stable.append)
+    done = threading.Event()
+    churned = []
+    missed = []
+
+    def churn(i: int):
+        # Each pass subscribes a new handler, lets it receive a few triggers,
+        # and unsubscribes it again.
+        for pass_ in itertools.count():
+            if done.is_set():
+                return
+            received = []
+            churned.append(received)
+            handlers = [received.append, (lambda n: None)]
+            for h in handlers:
+                e.subscribe(h, priority=pass_ % 3)
+            # A trigger that starts after the handler subscribed reaches it.
+            marker = -1 - (2 * pass_ + i)
+            e.trigger(marker)
+            if marker not in received:
+                missed.append(marker)
+            for h in reversed(handlers):
+                e.unsubscribe(h)
+
+    def emit(start: int):
+        for n in range(start, start + FIRES):
+            e.trigger(n)
+
+    churners = [threading.Thread(target=churn, args=(i,)) for i in range(2)]
+    emitters = [
+        threading.Thread(target=emit, args=(i * FIRES,))
+        for i in range(EMITTERS)
+    ]
+    # Switch threads as often as possible (so they interfere).
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for t in churners + emitters:
+            t.start()
+        for t in emitters:
+            t.join()
+        done.set()
+        for t in churners:
+            t.join()
+    finally:
+        sys.setswitchinterval(interval)
+    # The handler that was subscribed the whole time got every trigger once.
+    assert sorted(n for n in stable if n >= 0) == list(
+        range(EMITTERS * FIRES)
+    )
+    assert not missed
+    # The others never got a trigger twice.
+    for received in churned:
+        assert len(received) == len(set(received))
+    assert list(e.handlers) == [stable.append]
+
+
+def test_threadsafe_classSubscriptions():
+
+    @observable(threadsafe=True)
+    class Sensor(object):
+        @event
+        def read(self, n: int):
+            """
+            This event is raised when the sensor is read.
+            """
+
+    sensors = [Sensor() for _ in range(EMITTERS)]
+    received = []
+    half = FIRES // 10
+
+    def emit(sensor: Sensor):
+        for n in range(2 * half):
+            sensor.read(n)
+            # Halfway through, somebody starts listening to every sensor.
+            if n == half and sensor is sensors[0]:
+                Sensor.read += lambda sender, n: received.append((sender, n))
+
+    threads = [threading.Thread(target=emit, args=(s,)) for s in sensors]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # Once the class-level handler was subscribed, all the first sensor's
+    # triggers reached it (once).
+    assert [n for s, n in received if s is sensors[0]] == list(
+        range(half + 1, 2 * half)
+    )
+
+
+def test_threadsafe_firstAccessFromManyThreads():
+
+    @observable(threadsafe=True)
+    class Sensor(object):
+        @event
+        def read(self, n: int):
+            """
+            This event is raised when the sensor is read.
+            """
+
+    @observable(threadsafe=True)
+    class SlottedSensor(object):
+        __slots__ = ()
+
+        @event
+        def read(self, n: int):
+            """
+            This event is raised when the sensor is read.
+            """
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for cls in (Sensor, SlottedSensor):
+            for _ in range(200):
+                sensor = cls()
+                received = []
+                start = threading.Barrier(EMITTERS)
+
+                def subscribe(i: int):
+                    start.wait()
+                    sensor.read.subscribe(
+                        lambda sender, n, i=i: received.append(i)
+                    )
+
+                threads = [
+                    threading.Thread(target=subscribe, args=(i,))
+                    for i in range(EMITTERS)
+                ]
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+                # Every thread's subscription ended up on the same event.
+                sensor.read(1)
+                assert sorted(received) == list(range(EMITTERS))
+    finally:
+        sys.setswitchinterval(interval)
@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from evenz.events import observable, event
+from evenz.journal import StructCodec
+from evenz.transport import Publisher, Subscriber, SHARED_MEMORY, SOCKET
+
+
+@observable
+class Dog(object):
+    """
+    This dog barks.
+    """
+
+    __test__ = False  # Don't test the class.
+
+    def __init__(self, name: str):
+        self.name = name
+
+    @event
+    def barked(self, count: int):
+        """
+        This event is raised when the dog barks.
+        """
+
+
+def listen(name: str, transport: str, expected: int, ready, results):
+    """
+    Subscribe to the barks (in another process) and send back what arrives.
+    """
+    subscriber = Subscriber(name, transport=transport)
+    received = []
+    subscriber.event('Dog.barked').subscribe(
+        lambda key, count: received.append((key, count))
+    )
+    ready.set()
+    deadline = time.monotonic() + 10
+    while len(received) < expected and time.monotonic() < deadline:
+        subscriber.poll(timeout=0.1)
+    subscriber.close()
+    results.put(received)
+
+
+@pytest.mark.parametrize('transport', [SHARED_MEMORY, SOCKET])
+def test_publisher_fansOutToOtherProcesses(transport):
+    name = f'evenz-test-{os.getpid()}-{transport}'
+    context = multiprocessing.get_context()
+    publisher = Publisher(name, transport=transport)
+    publisher.attach(Dog, key=lambda dog: dog.name)
+    ready = context.Event()
+    results = context.Queue()
+    listeners = [
+        context.Process(
+            target=listen, args=(name, transport, 200, ready, results)
+        ) for _ in range(2)
+    ]
+    try:
+        for listener in listeners:
+            ready.clear()
+            listener.start()
+            assert ready.wait(10)
+        fido = Dog('fido')
+        for i in range(100):
+            fido.barked(i)
+        with publisher.batch():
+            for i in range(100, 200):
+                fido.barked(i)
+        for received in (results.get(timeout=20), results.get(timeout=20)):
+            assert received == [('fido', i) for i in range(200)]
+    finally:
+        for listener in listeners:
+            listener.join(10)
+        publisher.close()
+
+
+def test_subscriber_skipsAheadWhenItFallsBehind():
+    name = f'evenz-test-{os.getpid()}-behind'
+    publisher = Publisher(name, transport=SHARED_MEMORY, size=1024)
+    subscriber = Subscriber(name, transport=SHARED_MEMORY)
+    try:
+        received = []
+        subscriber.event('count', codec=StructCodec('<q')).subscribe(
+            received.append
+        )
+        publish = publisher.channel('count', codec=StructCodec('<q'))
+        for i in range(1000):
+            publish(i)
+        assert subscriber.poll() == 0
+        assert subscriber.dropped > 0
+        # Once it has caught up, it receives what's published.
+        for i in range(10):
+            publish(i)
+        assert subscriber.poll() == 10
+        assert received == list(range(10))
+    finally:
+        subscriber.close()
+        publisher.close()
+
+
+def test_subscriber_neverReceivesUnpublishedFrames():
+    name = f'evenz-test-{os.getpid()}-unpublished'
+    publisher = Publisher(name, transport=SHARED_MEMORY, size=1024)
+    subscriber = Subscriber(name, transport=SHARED_MEMORY)
+    try:
+        received = []
+        subscriber.event('count', codec=StructCodec('<q')).subscribe(
+            received.append
+        )
+        publish = publisher.channel('count', codec=StructCodec('<q'))
+        for i in range(150):
+            publish(i)
+        with publisher.batch():
+            for i in range(150, 170):
+                publish(i)
+            # The subscriber fell behind, and the frames in the batch aren't
+            # published yet.
+            assert subscriber.poll() == 0
+            assert subscriber.dropped > 0
+        assert subscriber.poll() == 20
+        assert received == list(range(150, 170))
+        # A batch bigger than the ring is published before it overwrites
+        # itself, so the subscriber only ever sees published frames.
+        received.clear()
+        with publisher.batch():
+            for i in range(170, 300):
+                publish(i)
+                subscriber.poll()
+        subscriber.poll()
+        assert received == sorted(set(received))
+        assert received[-1] == 299
+    finally:
+        subscriber.close()
+        publisher.close()
+
+
+def count(name: str, n: int, ready, attached, finished, done):
+    """
+    Publish numbers (in another process) as fast as we can.
+    """
+    publisher = Publisher(name, transport=SHARED_MEMORY, size=1 << 14)
+    publish = publisher.channel('count', codec=StructCodec('<q'))
+    ready.set()
+    attached.wait(10)
+    for i in range(n):
+        publish(i)
+        if i % 500 == 0:
+            time.sleep(0.0001)  # (Give the subscriber a chance to keep up.)
+    finished.set()
+    done.wait(20)
+    publisher.close()
+
+
+def test_subscriber_readsWhileThePublisherWrites():
+    name = f'evenz-test-{os.getpid()}-overlap'
+    n = 200000
+    context = multiprocessing.get_context()
+    ready, attached, finished, done = (context.Event() for _ in range(4))
+    writer = context.Process(
+        target=count, args=(name, n, ready, attached, finished, done)
+    )
+    writer.start()
+    try:
+        assert ready.wait(10)
+        subscriber = Subscriber(name, transport=SHARED_MEMORY)
+        received = []
+        subscriber.event('count', codec=StructCodec('<q')).subscribe(
+            received.append
+        )
+        attached.set()
+        while not finished.is_set():
+            subscriber.poll()
+        subscriber.poll()
+        subscriber.close()
+    finally:
+        done.set()
+        writer.join(10)
+    # Whatever arrived arrived intact and in order, and whatever didn't was
+    # counted.
+    assert received
+    assert all(0 <= a < b < n for a, b in zip(received, received[1:]))
+    assert len(received) == n or subscriber.dropped > 0
+
+
+def test_publisher_doesNotWaitForSlowSubscribers():
+    name = f'evenz-test-{os.getpid()}-slow'
+    publisher = Publisher(name, transport=SOCKET, size=4096)
+    subscriber = Subscriber(name, transport=SOCKET)
+    try:
+        received = []
+        subscriber.event('count', codec=StructCodec('<q')).subscribe(
+            received.append
+        )
+        publish = publisher.channel('count', codec=StructCodec('<q'))
+        # The subscriber doesn't read while (many more bytes than the
+        # socket's buffers hold) are published.
+        started = time.monotonic()
+        for i in range(200000):
+            publish(i)
+        assert time.monotonic() - started < 10
+        publish(-1)
+        while not received or received[-1] != -1:
+            subscriber.poll(timeout=1)
+            publish(-1)
+        assert subscriber.dropped > 0
+        assert received[0] == 0
+        assert all(a < b for a, b in zip(received, received[1:-1]))
+    finally:
+        subscriber.close()
+        publisher.close()
+
+
+def test_subscriber_ignoresEventsNobodySubscribedTo():
+    name = f'evenz-test-{os.getpid()}-ignored'
+    publisher = Publisher(name, transport=SOCKET)
+    subscriber = Subscriber(name, transport=SOCKET)
+    try:
+        received = []
+        subscriber.event('wanted').subscribe(received.append)
+        publisher.channel('unwanted')('nope')
+        publisher.channel('wanted')('yes')
+        assert subscriber.poll(timeout=5) == 1
+        assert received == ['yes']
+    finally:
+        subscriber.close()
+        publisher.close()